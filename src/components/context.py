@@ -0,0 +1,162 @@
+"""Token-aware context assembly for answer generation."""
+from __future__ import annotations
+
+import functools
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Sequence, Set
+
+from ..utils.tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ContextItem:
+    """A candidate piece of context.
+
+    Args:
+        content: Refined text.
+        score: Evaluator (or reranker) score; higher is packed first.
+        source: Source document name or URL.
+        path: Heading path or page title.
+    """
+
+    content: str
+    score: float = 0.0
+    source: str = ""
+    path: str = ""
+
+    @property
+    def header(self) -> str:
+        """Return the ``[source | path]`` line shown above the content ("" if unknown)."""
+        label = " | ".join(part for part in (self.source, self.path) if part)
+        return f"[{label}]" if label else ""
+
+
+@dataclass
+class PackedContext:
+    """Context text and what it cost.
+
+    Args:
+        text: Packed context.
+        tokens_used: Tokens in ``text``.
+        tokens_dropped: Tokens of unique items left out for the budget.
+        items: Items kept, in packing order.
+        duplicates: Items dropped as overlapping a higher-scored item.
+        dropped: Items dropped for the budget.
+    """
+
+    text: str
+    tokens_used: int
+    tokens_dropped: int
+    items: List[ContextItem] = field(default_factory=list)
+    duplicates: int = 0
+    dropped: int = 0
+
+
+@functools.lru_cache(maxsize=None)
+def get_token_counter(model: str) -> Callable[[str], int]:
+    """Return a token counter for a model.
+
+    Uses the model's tiktoken encoding when tiktoken is installed and the
+    encoding can be loaded; otherwise falls back to ``estimate_tokens``.
+
+    Args:
+        model: OpenAI model name.
+
+    Returns:
+        Callable[[str], int]: Token counter.
+    """
+    try:
+        import tiktoken
+
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+    except Exception as exc:
+        # Missing package, or the BPE file cannot be downloaded (offline).
+        logger.info("tiktoken unavailable for %s (%s); using heuristic token counts", model, exc)
+        return estimate_tokens
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def _bigrams(text: str) -> Set[str]:
+    """Return the character bigrams of a whitespace-free text."""
+    compact = "".join(text.split())
+    return {compact[i : i + 2] for i in range(len(compact) - 1)} or {compact}
+
+
+class ContextPacker:
+    """Pack context items into a token budget.
+
+    Items are taken in descending score order. An item whose character
+    bigrams are mostly (``overlap_threshold``) contained in an already kept
+    item is a duplicate (e.g. the same clause from an internal chunk and a
+    web page). Each kept item is rendered with its ``[source | path]`` header;
+    items that do not fit the remaining budget are skipped, so a smaller,
+    lower-scored item may still fill the space.
+
+    Args:
+        max_tokens: Token budget for the whole context (0 disables the limit).
+        token_counter: Function counting tokens in a text.
+        overlap_threshold: Share of an item's bigrams found in a kept item to count as duplicate.
+    """
+
+    separator = "\n\n"
+
+    def __init__(
+        self,
+        max_tokens: int = 0,
+        token_counter: Optional[Callable[[str], int]] = None,
+        overlap_threshold: float = 0.8,
+    ) -> None:
+        """Initialize the packer.
+
+        Args:
+            max_tokens: Token budget for the whole context (0 disables the limit).
+            token_counter: Function counting tokens in a text.
+            overlap_threshold: Share of an item's bigrams found in a kept item to count as duplicate.
+        """
+        self.max_tokens = max_tokens
+        self._count = token_counter or estimate_tokens
+        self.overlap_threshold = overlap_threshold
+
+    def pack(self, items: Sequence[ContextItem]) -> PackedContext:
+        """Select, order and render context items.
+
+        Args:
+            items: Candidate items.
+
+        Returns:
+            PackedContext: Context text and token accounting.
+        """
+        separator_cost = self._count(self.separator)
+        kept: List[ContextItem] = []
+        kept_bigrams: List[Set[str]] = []
+        blocks: List[str] = []
+        used = dropped_tokens = duplicates = dropped = 0
+        for item in sorted((item for item in items if item.content.strip()), key=lambda i: i.score, reverse=True):
+            bigrams = _bigrams(item.content)
+            if any(len(bigrams & other) >= self.overlap_threshold * len(bigrams) for other in kept_bigrams):
+                duplicates += 1
+                continue
+            block = f"{item.header}\n{item.content.strip()}" if item.header else item.content.strip()
+            cost = self._count(block) + (separator_cost if blocks else 0)
+            if self.max_tokens and used + cost > self.max_tokens:
+                dropped += 1
+                dropped_tokens += cost
+                continue
+            kept.append(item)
+            kept_bigrams.append(bigrams)
+            blocks.append(block)
+            used += cost
+        return PackedContext(
+            text=self.separator.join(blocks),
+            tokens_used=used,
+            tokens_dropped=dropped_tokens,
+            items=kept,
+            duplicates=duplicates,
+            dropped=dropped,
+        )
@@ -1,7 +1,10 @@
 """Retrieval evaluator component."""
 from __future__ import annotations
 
+import contextvars
+import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import List, Optional
 
@@ -11,6 +14,11 @@ from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
 
 from ..config import Settings
+from ..utils.hedging import hedge_policy
+from ..utils.http import shared_http_client
+from ..utils.singleflight import SingleFlight
+from ..utils.usage import record_usage
+from .keywords import text_terms
 
 
 @dataclass
@@ -38,9 +46,22 @@ class EvaluationSchema(BaseModel):
     reasoning: str
 
 
+class StripScoresSchema(BaseModel):
+    """Strict schema for batched strip scores.
+
+    Args:
+        scores: One score in [-1, 1] per strip, in input order.
+    """
+
+    scores: List[float]
+
+
 class RetrievalEvaluator:
     """Evaluate relevance between query and documents."""
 
+    # Strips scored per LLM call; larger batches are split and scored concurrently.
+    _STRIPS_PER_CALL = 40
+
     def __init__(self, settings: Settings, logger: Optional[logging.Logger] = None) -> None:
         """Initialize evaluator.
 
@@ -51,11 +72,22 @@ class RetrievalEvaluator:
         self._settings = settings
         self._logger = logger or logging.getLogger(__name__)
         self._llm = (
-            ChatOpenAI(model=settings.eval_model, temperature=0, api_key=settings.openai_api_key)
+            ChatOpenAI(
+                model=settings.eval_model,
+                temperature=0,
+                api_key=settings.openai_api_key,
+                base_url=settings.openai_base_url or None,
+                http_client=shared_http_client(settings),
+                max_retries=settings.http_retries,
+            )
             if settings.openai_api_key
             else None
         )
         self._parser = PydanticOutputParser(pydantic_object=EvaluationSchema)
+        self._strip_parser = PydanticOutputParser(pydantic_object=StripScoresSchema)
+        self._flight = SingleFlight("evaluator", enabled=settings.single_flight)
+        self._hedge = hedge_policy("evaluator", settings)
+        self._pool = ThreadPoolExecutor(max_workers=max(1, settings.eval_concurrency), thread_name_prefix="evaluator")
         self._prompt = ChatPromptTemplate.from_messages(
             [
                 ("system", "You are a strict retrieval evaluator. Assess if the document answers the query."),
@@ -65,10 +97,27 @@ class RetrievalEvaluator:
                 ),
             ]
         )
+        self._strip_prompt = ChatPromptTemplate.from_messages(
+            [
+                (
+                    "system",
+                    "You are a strict retrieval evaluator. Score how well each strip helps answer the query.",
+                ),
+                (
+                    "user",
+                    "Query: {query}\nStrips (JSON array): {strips}\n\n"
+                    "Return exactly one score in [-1, 1] per strip, in the same order.\n{format_instructions}",
+                ),
+            ]
+        )
 
     def score_documents(self, query: str, documents: List[str]) -> List[EvaluationResult]:
         """Score each document for relevance to the query.
 
+        With an LLM, documents are scored concurrently (up to
+        ``settings.eval_concurrency`` calls in flight), so scoring a batch of
+        strips costs about as long as its slowest call.
+
         Args:
             query: User query.
             documents: List of document texts.
@@ -82,15 +131,88 @@ class RetrievalEvaluator:
         if not self._llm:
             return self._fallback_scores(query, documents)
 
+        if len(documents) == 1:
+            scored = [self._score_with_llm(query, documents[0])]
+        else:
+            # Each task runs in a copy of the caller's context so usage tracking follows it.
+            futures = [
+                self._pool.submit(contextvars.copy_context().run, self._score_with_llm, query, doc)
+                for doc in documents
+            ]
+            scored = [future.result() for future in futures]
+        return [EvaluationResult(score=score, rationale=rationale) for score, rationale in scored]
+
+    def score_strips(self, query: str, strips: List[str]) -> List[EvaluationResult]:
+        """Score knowledge strips for one query in a single LLM call.
+
+        Unlike ``score_documents``, all strips share one prompt (split into
+        concurrent calls of ``_STRIPS_PER_CALL`` strips for very long lists),
+        so refining a document costs one call instead of one per sentence.
+
+        Args:
+            query: User query.
+            strips: Strip texts.
+
+        Returns:
+            List[EvaluationResult]: Scores per strip.
+        """
+        if not strips:
+            return []
+
+        if not self._llm:
+            return self._fallback_scores(query, strips)
+
+        size = self._STRIPS_PER_CALL
+        batches = [strips[start : start + size] for start in range(0, len(strips), size)]
+        if len(batches) == 1:
+            scored = self._score_strips_with_llm(query, batches[0])
+        else:
+            futures = [
+                self._pool.submit(contextvars.copy_context().run, self._score_strips_with_llm, query, batch)
+                for batch in batches
+            ]
+            scored = [item for future in futures for item in future.result()]
+        return [EvaluationResult(score=score, rationale=rationale) for score, rationale in scored]
+
+    def lexical_scores(self, query: str, documents: List[str]) -> List[EvaluationResult]:
+        """Score documents by query term coverage (no LLM call).
+
+        Terms are CJK character bigrams and Latin words, so unspaced Chinese
+        queries and snippets are compared term by term; the score is
+        ``2 * coverage - 1`` where coverage is the share of query terms the
+        document contains.
+
+        Args:
+            query: User query.
+            documents: List of document texts.
+
+        Returns:
+            List[EvaluationResult]: Scores per document.
+        """
+        wanted = text_terms(query)
         results: List[EvaluationResult] = []
         for doc in documents:
-            score, rationale = self._score_with_llm(query, doc)
-            results.append(EvaluationResult(score=score, rationale=rationale))
+            coverage = len(wanted & text_terms(doc)) / len(wanted) if wanted else 0.0
+            results.append(EvaluationResult(score=2 * coverage - 1, rationale="term_coverage"))
         return results
 
     def _score_with_llm(self, query: str, document: str) -> tuple[float, str]:
         """Score a document using LLM with strict parsing.
 
+        Concurrent calls with the same query and document share one LLM call.
+
+        Args:
+            query: User query.
+            document: Document text.
+
+        Returns:
+            tuple[float, str]: (score, rationale)
+        """
+        return self._flight.do((query, document), self._invoke_llm, query, document)
+
+    def _invoke_llm(self, query: str, document: str) -> tuple[float, str]:
+        """Run the evaluator chain for one document.
+
         Args:
             query: User query.
             document: Document text.
@@ -99,19 +221,65 @@ class RetrievalEvaluator:
             tuple[float, str]: (score, rationale)
         """
         try:
-            chain = self._prompt | self._llm | self._parser
-            result: EvaluationSchema = chain.invoke(
+            chain = self._prompt | self._llm
+            message = self._hedge.call(
+                chain.invoke,
                 {
                     "query": query,
                     "document": document,
                     "format_instructions": self._parser.get_format_instructions(),
-                }
+                },
             )
+            record_usage("evaluator", message)
+            result: EvaluationSchema = self._parser.invoke(message)
             return result.relevance_score, result.reasoning
         except Exception as exc:
             self._logger.exception("Evaluator parse error: %s", exc)
             return 0.0, "parse_error"
 
+    def _score_strips_with_llm(self, query: str, strips: List[str]) -> List[tuple[float, str]]:
+        """Score a batch of strips using one LLM call with strict parsing.
+
+        Concurrent calls with the same query and strips share one LLM call.
+
+        Args:
+            query: User query.
+            strips: Strip texts.
+
+        Returns:
+            List[tuple[float, str]]: (score, rationale) per strip.
+        """
+        return self._flight.do(("strips", query, tuple(strips)), self._invoke_strip_llm, query, strips)
+
+    def _invoke_strip_llm(self, query: str, strips: List[str]) -> List[tuple[float, str]]:
+        """Run the batched strip chain.
+
+        Args:
+            query: User query.
+            strips: Strip texts.
+
+        Returns:
+            List[tuple[float, str]]: (score, rationale) per strip.
+        """
+        try:
+            chain = self._strip_prompt | self._llm
+            message = self._hedge.call(
+                chain.invoke,
+                {
+                    "query": query,
+                    "strips": json.dumps(strips, ensure_ascii=False),
+                    "format_instructions": self._strip_parser.get_format_instructions(),
+                },
+            )
+            record_usage("evaluator", message)
+            result: StripScoresSchema = self._strip_parser.invoke(message)
+            if len(result.scores) != len(strips):
+                raise ValueError(f"expected {len(strips)} scores, got {len(result.scores)}")
+            return [(max(-1.0, min(1.0, score)), "strip_batch") for score in result.scores]
+        except Exception as exc:
+            self._logger.exception("Evaluator parse error: %s", exc)
+            return [(0.0, "parse_error")] * len(strips)
+
     def _fallback_scores(self, query: str, documents: List[str]) -> List[EvaluationResult]:
         """Fallback lexical scoring using Jaccard similarity.
 
@@ -7,6 +7,9 @@ from typing import Optional
 from openai import OpenAI
 
 from ..config import Settings
+from ..utils.http import shared_http_client
+from ..utils.singleflight import SingleFlight
+from ..utils.usage import record_usage
 
 
 class AnswerGenerator:
@@ -21,11 +24,35 @@ class AnswerGenerator:
         """
         self._settings = settings
         self._logger = logger or logging.getLogger(__name__)
-        self._client = OpenAI(api_key=settings.openai_api_key) if settings.openai_api_key else None
+        self._client = (
+            OpenAI(
+                api_key=settings.openai_api_key,
+                base_url=settings.openai_base_url or None,
+                http_client=shared_http_client(settings),
+                max_retries=settings.http_retries,
+            )
+            if settings.openai_api_key
+            else None
+        )
+        self._flight = SingleFlight("generator", enabled=settings.single_flight)
 
     def generate(self, question: str, context: str) -> str:
         """Generate answer based on context.
 
+        Concurrent calls with the same question and context share one LLM call.
+
+        Args:
+            question: User question.
+            context: Retrieved/refined context.
+
+        Returns:
+            str: Generated answer.
+        """
+        return self._flight.do((question, context), self._generate, question, context)
+
+    def _generate(self, question: str, context: str) -> str:
+        """Call the LLM for one answer.
+
         Args:
             question: User question.
             context: Retrieved/refined context.
@@ -49,6 +76,7 @@ class AnswerGenerator:
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.1,
             )
+            record_usage("generator", response)
             return response.choices[0].message.content
         except Exception as exc:
             self._logger.exception("Generator LLM error: %s", exc)
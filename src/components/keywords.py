@@ -0,0 +1,225 @@
+"""Local keyword extraction for search query rewriting."""
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set
+
+# Standard identifiers such as "TB 10001-2016", "GB/T 50090", "Q/CR 9230".
+STANDARD_PATTERN = re.compile(r"(?<![A-Za-z])((?:GB|TB|JGJ|CJJ|TJ|Q/CR)(?:/T)?)\s*(\d+(?:\.\d+)?(?:\s*-\s*\d{4})?)")
+# Clause references such as "第3.2.1条" or "4.1.2条".
+CLAUSE_PATTERN = re.compile(r"第\s*\d+(?:\.\d+)*\s*[条款章节]|\d+(?:\.\d+){1,3}\s*[条款节]")
+_CJK_RUN = re.compile(r"[一-鿿]+")
+_LATIN_WORD = re.compile(r"[A-Za-z][A-Za-z0-9\-]+")
+# Multi-character function words plus single characters that rarely start or
+# end a domain term; words such as 应 (应力) or 和 (饱和) are deliberately absent.
+_CJK_STOPWORDS = sorted(
+    [
+        "为什么", "有哪些", "有没有", "什么", "多少", "哪些", "哪个", "哪里", "如何", "怎么", "怎样", "是否", "请问", "有关",
+        "关于", "应该", "应当", "不应", "不得", "需要", "可以", "能否", "以及", "之间", "其中", "一般",
+        "通常", "主要", "哪", "的", "了", "吗", "呢", "吧", "啊", "是", "与", "及", "或", "在", "对",
+    ],
+    key=len,
+    reverse=True,
+)
+_CJK_STOP_PATTERN = re.compile("|".join(map(re.escape, _CJK_STOPWORDS)))
+_LATIN_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "did", "do", "does", "for", "from", "how", "in",
+    "is", "it", "of", "on", "or", "should", "the", "to", "was", "what", "when", "where", "which", "who",
+    "why", "with",
+}
+
+
+@dataclass(frozen=True)
+class KeywordResult:
+    """Keywords extracted from a question.
+
+    Args:
+        keywords: Keywords, most specific first.
+        confident: Whether the extraction can be used without the LLM.
+    """
+
+    keywords: List[str]
+    confident: bool
+
+    @property
+    def query(self) -> str:
+        """Return the keywords in the rewriter's comma-separated format."""
+        return ", ".join(self.keywords)
+
+
+def text_terms(text: str) -> Set[str]:
+    """Return the distinct terms (CJK bigrams and Latin words) of a text.
+
+    Args:
+        text: Input text.
+
+    Returns:
+        Set[str]: Terms.
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    terms = set(_LATIN_WORD.findall(text))
+    for run in _CJK_RUN.findall(text):
+        terms.update(run[i : i + 2] for i in range(len(run) - 1))
+    return terms
+
+
+class KeywordExtractor:
+    """Rule-based keyword extractor with corpus document frequencies.
+
+    Standard identifiers and clause numbers are taken verbatim. The rest of
+    the question is cut at punctuation and function words; each remaining
+    phrase is scored by the mean inverse document frequency of its CJK
+    bigrams (or of the word, for Latin text), so terms that are rare in the
+    indexed corpus rank first. The result is marked unsure when nothing was
+    found, when a kept phrase is longer than ``max_phrase`` characters (the
+    cut missed a word boundary), or when the cut at ``limit`` falls between
+    near-equal scores.
+
+    Args:
+        doc_freq: Term -> number of documents containing it.
+        documents: Number of documents the frequencies were counted over.
+        limit: Maximum keywords per question.
+        margin: Minimum score gap at the cut for a confident result.
+        max_phrase: Longest CJK phrase accepted without the LLM.
+    """
+
+    def __init__(
+        self,
+        doc_freq: Optional[Dict[str, int]] = None,
+        documents: int = 0,
+        limit: int = 3,
+        margin: float = 0.25,
+        max_phrase: int = 8,
+        corpus_size: int = 0,
+    ) -> None:
+        """Initialize the extractor.
+
+        Args:
+            doc_freq: Term -> number of documents containing it.
+            documents: Number of documents the frequencies were counted over.
+            limit: Maximum keywords per question.
+            margin: Minimum score gap at the cut for a confident result.
+            max_phrase: Longest CJK phrase accepted without the LLM.
+            corpus_size: Size of the corpus the documents were sampled from
+                (defaults to ``documents``).
+        """
+        self.doc_freq: Counter = Counter(doc_freq or {})
+        self.documents = documents
+        self._corpus_size = corpus_size
+        self.limit = limit
+        self.margin = margin
+        self.max_phrase = max_phrase
+
+    @property
+    def corpus_size(self) -> int:
+        """Return the size of the corpus the statistics were sampled from."""
+        return self._corpus_size or self.documents
+
+    @corpus_size.setter
+    def corpus_size(self, value: int) -> None:
+        """Record the size of the corpus the statistics were sampled from."""
+        self._corpus_size = value
+
+    def fit(self, texts: Iterable[str]) -> "KeywordExtractor":
+        """Add documents to the corpus statistics.
+
+        Args:
+            texts: Document texts.
+
+        Returns:
+            KeywordExtractor: self.
+        """
+        for text in texts:
+            self.doc_freq.update(text_terms(text))
+            self.documents += 1
+        return self
+
+    def save(self, path: str) -> None:
+        """Write the corpus statistics to a JSON file (atomically).
+
+        Args:
+            path: Output path.
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(
+                {"documents": self.documents, "corpus_size": self.corpus_size, "doc_freq": dict(self.doc_freq)},
+                handle,
+                ensure_ascii=False,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "KeywordExtractor":
+        """Read corpus statistics written by ``save``.
+
+        Args:
+            path: Statistics file.
+            **kwargs: Other constructor arguments.
+
+        Returns:
+            KeywordExtractor: Extractor with the loaded statistics.
+        """
+        with open(path, "r", encoding="utf-8") as handle:
+            payload = json.load(handle)
+        return cls(payload["doc_freq"], payload["documents"], corpus_size=payload.get("corpus_size", 0), **kwargs)
+
+    def idf(self, term: str) -> float:
+        """Return the smoothed inverse document frequency of a term.
+
+        Args:
+            term: CJK bigram or lowercased Latin word.
+
+        Returns:
+            float: IDF (unseen terms get the maximum).
+        """
+        return math.log((self.documents + 1) / (self.doc_freq.get(term, 0) + 1)) + 1.0
+
+    def extract(self, question: str) -> KeywordResult:
+        """Extract search keywords from a question.
+
+        Args:
+            question: User question.
+
+        Returns:
+            KeywordResult: Keywords and whether they are trustworthy.
+        """
+        text = unicodedata.normalize("NFKC", question)
+        keywords: List[str] = []
+        for match in STANDARD_PATTERN.finditer(text):
+            keywords.append(match.group(1) + " " + "".join(match.group(2).split()))
+        for match in CLAUSE_PATTERN.finditer(text):
+            keywords.append("".join(match.group(0).split()))
+        rest = CLAUSE_PATTERN.sub(" ", STANDARD_PATTERN.sub(" ", text))
+        found_identifier = bool(keywords)
+
+        scored: Dict[str, float] = {}
+        for run in _CJK_RUN.findall(rest):
+            for phrase in _CJK_STOP_PATTERN.split(run):
+                if len(phrase) >= 2 and phrase not in scored:
+                    bigrams = [phrase[i : i + 2] for i in range(len(phrase) - 1)]
+                    # Rounded so equal-IDF phrases tie exactly and keep question order.
+                    scored[phrase] = round(sum(map(self.idf, bigrams)) / len(bigrams), 6)
+        for word in _LATIN_WORD.findall(rest):
+            if word.lower() not in _LATIN_STOPWORDS and word not in scored:
+                scored[word] = self.idf(word.lower())
+
+        slots = max(0, self.limit - len(keywords))
+        # Stable sort: equal scores keep question order.
+        ranked = sorted(scored, key=lambda phrase: scored[phrase], reverse=True)
+        keywords.extend(ranked[:slots])
+        if not keywords:
+            return KeywordResult([], False)
+        if any(len(phrase) > self.max_phrase and _CJK_RUN.fullmatch(phrase) for phrase in ranked[:slots]):
+            return KeywordResult(keywords, False)
+        if found_identifier or len(ranked) <= slots:
+            return KeywordResult(keywords[: self.limit], True)
+        # More phrases than slots: trust the cut only if it is not between near-ties.
+        clear_cut = slots > 0 and scored[ranked[slots - 1]] - scored[ranked[slots]] >= self.margin
+        return KeywordResult(keywords, clear_cut)
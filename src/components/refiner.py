@@ -4,6 +4,7 @@ from __future__ import annotations
 import re
 from typing import List
 
+from ..utils.tokens import estimate_tokens
 from .evaluator import RetrievalEvaluator
 
 
@@ -28,19 +29,60 @@ class KnowledgeRefiner:
         Returns:
             str: Refined context string.
         """
-        strips = self._split_into_strips(document)
-        scores = self._evaluator.score_documents(query, strips)
-        kept = [s for s, r in zip(strips, scores) if r.score > 0]
-        return "\n".join(kept).strip()
+        return self.refine_many(query, [document])[0]
 
-    def _split_into_strips(self, document: str) -> List[str]:
+    def refine_many(
+        self, query: str, documents: List[str], max_tokens: int = 0, cjk_sentences: bool = False
+    ) -> List[str]:
+        """Refine several documents with one batched scoring call.
+
+        The strips of all documents are scored together in one evaluator
+        prompt (``score_strips``). Each document keeps its relevant strips in
+        their original order. With ``max_tokens``, only the highest-scoring
+        relevant strips that fit the budget are kept.
+
+        Args:
+            query: User query.
+            documents: Raw documents (retrieved chunks or web snippets).
+            max_tokens: Token budget per document (0 keeps all relevant strips).
+            cjk_sentences: Also end strips at 。！？ not followed by whitespace.
+
+        Returns:
+            List[str]: Refined text per document ("" when nothing is relevant).
+        """
+        per_document = [self._split_into_strips(document, cjk_sentences) for document in documents]
+        strips = [strip for doc_strips in per_document for strip in doc_strips]
+        scores = iter(self._evaluator.score_strips(query, strips))
+        refined: List[str] = []
+        for doc_strips in per_document:
+            kept = [(index, strip, result.score) for index, (strip, result) in enumerate(zip(doc_strips, scores))]
+            kept = [item for item in kept if item[2] > 0]
+            if max_tokens > 0:
+                budget = max_tokens
+                selected = []
+                for item in sorted(kept, key=lambda item: item[2], reverse=True):
+                    cost = estimate_tokens(item[1])
+                    if cost <= budget:
+                        selected.append(item)
+                        budget -= cost
+                kept = sorted(selected)
+            refined.append("\n".join(strip for _, strip, _ in kept).strip())
+        return refined
+
+    def _split_into_strips(self, document: str, cjk_sentences: bool = False) -> List[str]:
         """Split document into strips (placeholder by sentence).
 
         Args:
             document: Raw document text.
+            cjk_sentences: End strips at CJK sentence marks even without
+                following whitespace (web snippets are unspaced Chinese prose;
+                internal chunks keep their whitespace-delimited strips).
 
         Returns:
             List[str]: List of strips.
         """
-        strips = re.split(r"(?<=[.!?。！？])\s+", document)
+        if cjk_sentences:
+            strips = re.split(r"(?<=[。！？])\s*|(?<=[.!?])\s+", document)
+        else:
+            strips = re.split(r"(?<=[.!?。！？])\s+", document)
         return [s.strip() for s in strips if s.strip()]
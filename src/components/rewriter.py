@@ -2,26 +2,60 @@
 from __future__ import annotations
 
 import logging
+import threading
+from collections import OrderedDict
 from typing import Optional
 
 from openai import OpenAI
 
 from ..config import Settings
+from ..utils.hedging import hedge_policy
+from ..utils.http import shared_http_client
+from ..utils.search_cache import normalize_query
+from ..utils.singleflight import SingleFlight
+from ..utils.usage import record_usage
+from .keywords import KeywordExtractor
 
 
 class QueryRewriter:
-    """Rewrite natural language questions into search keywords."""
+    """Rewrite natural language questions into search keywords.
 
-    def __init__(self, settings: Settings, logger: Optional[logging.Logger] = None) -> None:
+    Rewrites are tried in tiers: an LRU cache keyed by the normalized
+    question, then the local ``KeywordExtractor`` (when given and
+    ``settings.rewrite_fast_path`` is on), and the LLM only when the
+    extractor is unsure.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        logger: Optional[logging.Logger] = None,
+        keywords: Optional[KeywordExtractor] = None,
+    ) -> None:
         """Initialize query rewriter.
 
         Args:
             settings: Project settings.
             logger: Optional logger.
+            keywords: Optional local keyword extractor for the fast path.
         """
         self._settings = settings
         self._logger = logger or logging.getLogger(__name__)
-        self._client = OpenAI(api_key=settings.openai_api_key) if settings.openai_api_key else None
+        self._client = (
+            OpenAI(
+                api_key=settings.openai_api_key,
+                base_url=settings.openai_base_url or None,
+                http_client=shared_http_client(settings),
+                max_retries=settings.http_retries,
+            )
+            if settings.openai_api_key
+            else None
+        )
+        self._keywords = keywords if settings.rewrite_fast_path else None
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._flight = SingleFlight("rewriter", enabled=settings.single_flight)
+        self._hedge = hedge_policy("rewriter", settings)
 
     def rewrite(self, question: str) -> str:
         """Rewrite the question into keyword-style search query.
@@ -32,7 +66,31 @@ class QueryRewriter:
         Returns:
             str: Rewritten search query.
         """
+        # Concurrent identical questions share one rewrite (and LLM call).
+        return self._flight.do(normalize_query(question), self._rewrite, question)
+
+    def _rewrite(self, question: str) -> str:
+        """Rewrite through the cache, local extractor and LLM tiers.
+
+        Args:
+            question: User question.
+
+        Returns:
+            str: Rewritten search query.
+        """
+        key = normalize_query(question)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        local = self._keywords.extract(question) if self._keywords is not None else None
+        if local is not None and local.confident:
+            return self._remember(key, local.query)
         if not self._client:
+            if local is not None and local.keywords:
+                return local.query
             self._logger.warning("OPENAI_API_KEY not set; using original query")
             return question
 
@@ -50,7 +108,8 @@ class QueryRewriter:
         )
 
         try:
-            response = self._client.chat.completions.create(
+            response = self._hedge.call(
+                self._client.chat.completions.create,
                 model=self._settings.rewrite_model,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -59,10 +118,30 @@ class QueryRewriter:
                 temperature=0,
                 max_tokens=60,
             )
+            record_usage("rewriter", response)
             text = response.choices[0].message.content.strip()
             if "A:" in text:
                 text = text.split("A:")[-1].strip()
-            return text or question
+            return self._remember(key, text) if text else question
         except Exception as exc:
             self._logger.exception("Rewrite error: %s", exc)
-            return question
+            return local.query if local is not None and local.keywords else question
+
+    def _remember(self, key: str, rewritten: str) -> str:
+        """Cache a rewrite, evicting the least recently used one if full.
+
+        Args:
+            key: Normalized question.
+            rewritten: Rewritten query.
+
+        Returns:
+            str: The rewritten query.
+        """
+        if self._settings.rewrite_cache_size <= 0:
+            return rewritten
+        with self._cache_lock:
+            self._cache[key] = rewritten
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._settings.rewrite_cache_size:
+                self._cache.popitem(last=False)
+        return rewritten
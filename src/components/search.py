@@ -1,24 +1,93 @@
 """Web search component."""
 from __future__ import annotations
 
+import hashlib
 import logging
-from typing import List, Optional
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Set
 
+import requests
+from requests.adapters import HTTPAdapter
 from tavily import TavilyClient
 
+from ..utils.search_cache import SearchCache, SearchResults, normalize_query
+
+_QUERY_SEPARATORS = re.compile(r"[,，、;；\n]")
+
+
+def split_queries(rewritten: str, limit: int = 3) -> List[str]:
+    """Split a comma-separated rewrite into distinct search queries.
+
+    Args:
+        rewritten: Output of ``QueryRewriter.rewrite``.
+        limit: Maximum number of queries.
+
+    Returns:
+        List[str]: Queries in order, without blanks or normalized duplicates.
+    """
+    queries: List[str] = []
+    seen: Set[str] = set()
+    for part in _QUERY_SEPARATORS.split(rewritten):
+        part = part.strip()
+        key = normalize_query(part)
+        if key and key not in seen:
+            seen.add(key)
+            queries.append(part)
+    return queries[:limit]
+
 
 class WebSearcher:
-    """Web search wrapper using Tavily."""
+    """Web search wrapper using Tavily.
 
-    def __init__(self, api_key: str, logger: Optional[logging.Logger] = None) -> None:
+    One ``TavilyClient`` is created per searcher and reuses a pooled HTTP
+    session, so repeated searches skip the TCP/TLS handshake. With a
+    ``SearchCache``, identical (normalized) queries are answered locally;
+    stale entries are returned immediately and refreshed in the background.
+
+    Args:
+        api_key: Tavily API key.
+        logger: Optional logger.
+        base_url: Search API base URL (None uses Tavily's default).
+        cache: Optional search result cache.
+        pool_size: Connections kept alive per host (and concurrent searches in ``search_many``).
+        timeout: Per-request timeout in seconds.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        logger: Optional[logging.Logger] = None,
+        base_url: Optional[str] = None,
+        cache: Optional[SearchCache] = None,
+        pool_size: int = 10,
+        timeout: float = 30.0,
+    ) -> None:
         """Initialize web searcher.
 
         Args:
             api_key: Tavily API key.
             logger: Optional logger.
+            base_url: Search API base URL (None uses Tavily's default).
+            cache: Optional search result cache.
+            pool_size: Connections kept alive per host (and concurrent searches in ``search_many``).
+            timeout: Per-request timeout in seconds.
         """
         self._api_key = api_key
         self._logger = logger or logging.getLogger(__name__)
+        self._cache = cache
+        self._timeout = timeout
+        self._client: Optional[TavilyClient] = None
+        if api_key:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._client = TavilyClient(api_key=api_key, api_base_url=base_url or None, session=session)
+        self._refreshing: Set[str] = set()
+        self._refreshing_guard = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, pool_size), thread_name_prefix="web-search")
 
     def search(self, query: str, top_k: int = 5) -> List[str]:
         """Search the web and return top-k snippets.
@@ -30,16 +99,125 @@ class WebSearcher:
         Returns:
             List[str]: List of result snippets.
         """
-        if not self._api_key:
+        return [result["content"] for result in self.search_results(query, top_k) if result["content"]]
+
+    def search_results(self, query: str, top_k: int = 5) -> SearchResults:
+        """Search the web and return top-k results with their URLs.
+
+        Args:
+            query: Search query.
+            top_k: Number of results.
+
+        Returns:
+            SearchResults: Dicts with ``url``, ``title``, ``content`` and ``score``.
+        """
+        if not self._client:
             self._logger.warning("TAVILY_API_KEY not set; skipping web search")
             return []
 
+        key = SearchCache.key(query, top_k) if self._cache is not None else ""
+        if self._cache is not None:
+            cached, stale = self._cache.get(key)
+            if cached is not None:
+                if stale:
+                    self._refresh_async(key, query, top_k)
+                return cached
+
         try:
-            client = TavilyClient(api_key=self._api_key)
-            response = client.search(query=query, max_results=top_k)
-            results = response.get("results", [])
-            snippets = [r.get("content", "") or r.get("snippet", "") for r in results]
-            return [s for s in snippets if s]
+            results = self._fetch(query, top_k)
         except Exception as exc:
             self._logger.exception("Web search failed: %s", exc)
             return []
+        if self._cache is not None:
+            self._cache.put(key, results)
+        return results
+
+    def search_many(self, queries: Sequence[str], top_k: int = 5) -> SearchResults:
+        """Run several searches concurrently and merge their results.
+
+        Results are interleaved by rank (first hit of each query, then the
+        second, ...) and deduplicated by URL and by normalized content hash.
+        A failed query contributes nothing.
+
+        Args:
+            queries: Search queries.
+            top_k: Results requested per query.
+
+        Returns:
+            SearchResults: Merged unique results (up to ``len(queries) * top_k``).
+        """
+        if not queries:
+            return []
+        if len(queries) == 1:
+            ranked = [self.search_results(queries[0], top_k)]
+        else:
+            ranked = list(self._pool.map(lambda query: self.search_results(query, top_k), queries))
+        merged: SearchResults = []
+        seen_urls: Set[str] = set()
+        seen_hashes: Set[str] = set()
+        for rank in range(max(len(results) for results in ranked)):
+            for results in ranked:
+                if rank >= len(results):
+                    continue
+                result = results[rank]
+                content = " ".join(result["content"].split())
+                digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+                if not content or digest in seen_hashes or (result["url"] and result["url"] in seen_urls):
+                    continue
+                seen_hashes.add(digest)
+                if result["url"]:
+                    seen_urls.add(result["url"])
+                merged.append(result)
+        return merged
+
+    def close(self) -> None:
+        """Release pooled connections and search threads."""
+        self._pool.shutdown(wait=False)
+        if self._client is not None:
+            self._client.session.close()
+
+    def _fetch(self, query: str, top_k: int) -> SearchResults:
+        """Query the search API.
+
+        Args:
+            query: Search query.
+            top_k: Number of results.
+
+        Returns:
+            SearchResults: Normalized results.
+        """
+        response = self._client.search(query=query, max_results=top_k, timeout=self._timeout)
+        return [
+            {
+                "url": r.get("url", ""),
+                "title": r.get("title", ""),
+                "content": r.get("content", "") or r.get("snippet", ""),
+                "score": r.get("score"),
+            }
+            for r in response.get("results", [])
+        ]
+
+    def _refresh_async(self, key: str, query: str, top_k: int) -> None:
+        """Refresh a stale entry in a background thread (once per key at a time).
+
+        Args:
+            key: Cache key.
+            query: Search query.
+            top_k: Number of results.
+        """
+        with self._refreshing_guard:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh() -> None:
+            try:
+                self._cache.put(key, self._fetch(query, top_k))
+            except Exception as exc:
+                # Keep serving the stale entry; the next lookup retries.
+                self._logger.warning("Background search refresh failed: %s", exc)
+            finally:
+                with self._refreshing_guard:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name="search-refresh", daemon=True).start()
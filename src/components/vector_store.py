@@ -2,13 +2,35 @@
 from __future__ import annotations
 
 import logging
+import os
 import uuid
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
 
 from ..config import Settings
-from ..utils.chroma_store import ChromaConfig, get_collection, get_openai_embedding_function, query_texts
-from ..ingestion.mineru_parser import Chunk
+from ..utils.chroma_store import (
+    ChromaConfig,
+    get_collection,
+    get_openai_embedding_function,
+    iter_batches,
+    query_embeddings,
+)
+from ..utils.http import shared_http_client
+from ..utils.quantization import QuantizedVectorIndex
+from ..utils.source_index import SourceIndex
+from ..utils.snapshot import (
+    SnapshotError,
+    iter_snapshot_rows,
+    read_snapshot_footer,
+    verify_snapshot,
+    write_snapshot,
+)
+from ..ingestion.dedup import ALTERNATE_SEPARATOR, NearDuplicateIndex, merge_alternate_sources
+from ..ingestion.mineru_parser import Chunk, assign_chunk_ids, section_path
+
+RETRIEVAL_MODES = ("flat", "hierarchical")
 
 
 @dataclass(frozen=True)
@@ -27,7 +49,22 @@ class RetrievedDoc:
 
 
 class VectorStore:
-    """ChromaDB vector store wrapper."""
+    """ChromaDB vector store wrapper.
+
+    Besides the chunk collection, a companion ``<collection>_sections``
+    collection holds one centroid vector per heading section (the first
+    ``section_depth`` levels of a chunk's ``path``). Hierarchical retrieval
+    searches the centroids first and then only the chunks of the top sections.
+    Near-duplicate chunks are collapsed at ingest through a MinHash LSH index
+    stored next to the Chroma data. With ``embedding_quantization`` set, flat
+    search runs on a compact float16/int8 copy of the vectors and only the top
+    candidates are re-ranked with the float vectors held by Chroma. A SQLite
+    source index maps each source to its chunk ids, so a source can be deleted
+    or replaced without scanning the collection.
+    """
+
+    # Seconds without a heartbeat after which another process's replace counts as abandoned.
+    _REPLACE_LEASE = 600.0
 
     def __init__(self, settings: Settings, logger: Optional[logging.Logger] = None) -> None:
         """Initialize vector store.
@@ -38,29 +75,90 @@ class VectorStore:
         """
         self._settings = settings
         self._logger = logger or logging.getLogger(__name__)
-        embedding_fn = get_openai_embedding_function(
+        self._embedding_fn = get_openai_embedding_function(
             api_key=settings.openai_api_key,
             model_name=settings.embedding_model,
             logger=self._logger,
+            hash_dimensions=settings.hash_embedding_dim,
+            dimensions=settings.embedding_dimensions,
+            http_client=shared_http_client(settings),
+            max_retries=settings.http_retries,
+            base_url=settings.openai_base_url or None,
         )
         self._collection = get_collection(
-            ChromaConfig(persist_dir=settings.chroma_persist_dir),
+            ChromaConfig(persist_dir=settings.chroma_persist_dir, collection_name=settings.collection_name),
+            logger=self._logger,
+            embedding_function=self._embedding_fn,
+        )
+        self._sections = get_collection(
+            ChromaConfig(
+                persist_dir=settings.chroma_persist_dir,
+                collection_name=f"{settings.collection_name}_sections",
+            ),
             logger=self._logger,
-            embedding_function=embedding_fn,
+            embedding_function=self._embedding_fn,
+            metadata={"hnsw:space": "cosine"},
+        )
+        self._dedup = (
+            NearDuplicateIndex(
+                os.path.join(settings.chroma_persist_dir, f"{settings.collection_name}_minhash.sqlite3"),
+                threshold=settings.dedup_threshold,
+                logger=self._logger,
+            )
+            if settings.dedup_enabled
+            else None
+        )
+        self._quantized: Optional[QuantizedVectorIndex] = None
+        if settings.embedding_quantization != "none":
+            self._quantized = QuantizedVectorIndex(
+                os.path.join(
+                    settings.chroma_persist_dir,
+                    f"{settings.collection_name}_{settings.embedding_quantization}",
+                ),
+                mode=settings.embedding_quantization,
+                logger=self._logger,
+            )
+            if self._quantized.count == 0 and self._collection.count() > 0:
+                self.rebuild_quantized_index()
+        self._sources = SourceIndex(
+            os.path.join(settings.chroma_persist_dir, f"{settings.collection_name}_sources.sqlite3")
         )
+        if self._sources.count() == 0 and self._collection.count() > 0:
+            self.rebuild_source_index()
+        self._recover_replacements()
 
-    def search(self, query: str, k: int) -> List[RetrievedDoc]:
+    def search(self, query: str, k: int, mode: Optional[str] = None) -> List[RetrievedDoc]:
         """Search top-k documents.
 
         Args:
             query: Query text.
             k: Top-k results.
+            mode: "flat" or "hierarchical"; defaults to ``settings.retrieval_mode``.
 
         Returns:
             List[RetrievedDoc]: Retrieved documents.
         """
+        mode = mode or self._settings.retrieval_mode
+        if mode not in RETRIEVAL_MODES:
+            self._logger.warning("Unknown retrieval mode %s; using flat", mode)
+            mode = "flat"
         try:
-            result = query_texts(self._collection, query, k, logger=self._logger)
+            query_vector = self._embed([query])[0]
+            if mode == "flat" and self._use_quantized():
+                return self._search_quantized(query_vector, k)
+            conditions = self._visibility_conditions()
+            if mode == "hierarchical":
+                section_ids = self._search_sections(query_vector)
+                if section_ids:
+                    conditions.append({"section_id": {"$in": section_ids}})
+                else:
+                    self._logger.info("Section index empty; falling back to flat retrieval")
+            where = None
+            if len(conditions) == 1:
+                where = conditions[0]
+            elif conditions:
+                where = {"$and": conditions}
+            result = query_embeddings(self._collection, query_vector, k, logger=self._logger, where=where)
             documents = result.get("documents", [[]])[0]
             metadatas = result.get("metadatas", [[]])[0]
             ids = result.get("ids", [[]])[0]
@@ -72,31 +170,764 @@ class VectorStore:
             self._logger.exception("VectorStore search failed: %s", exc)
             return []
 
-    def add_chunks(self, chunks: List[Chunk], source_name: str) -> int:
-        """Upsert chunks into the collection.
+    def add_chunks(
+        self, chunks: Iterable[Chunk], source_name: str, batch_size: int = 128, strict: bool = False
+    ) -> int:
+        """Upsert chunks into the collection and update section centroids.
+
+        ``chunks`` may be a lazy stream (e.g. ``MarkdownHierarchySplitter.iter_chunks``);
+        it is consumed ``batch_size`` chunks at a time, so memory stays bounded.
+        Near-duplicates of already indexed chunks (or of earlier chunks in the
+        same call) are not stored; their source is appended to the canonical
+        chunk's ``alternate_sources`` metadata instead.
+
+        Args:
+            chunks: Parsed chunks (list or iterable).
+            source_name: Source filename.
+            batch_size: Chunks embedded and upserted per request.
+            strict: Raise when a batch fails to embed or upsert instead of
+                logging it and counting it as zero chunks.
+
+        Returns:
+            int: Number of upserted chunks.
+        """
+        chunks = assign_chunk_ids(chunks, source_name)
+        return sum(self._add_batch(batch, source_name, strict=strict) for batch in iter_batches(chunks, batch_size))
+
+    def delete_chunks(self, chunk_ids: Iterable[str], batch_size: int = 1000) -> int:
+        """Remove chunks from their source.
+
+        A chunk that other sources' near-duplicates were collapsed into is not
+        dropped: it is handed over to the first of its ``alternate_sources``
+        so that source keeps its content. Other chunks are deleted from
+        Chroma and from the section, MinHash, quantized and source indexes.
+        Ids of chunks that were collapsed into another source's chunk release
+        it: the source is dropped from its ``alternate_sources``, or, if the
+        chunk was handed over to the source, it is removed in turn.
+
+        Args:
+            chunk_ids: Chunk ids (unknown ids are ignored).
+            batch_size: Ids deleted per request.
+
+        Returns:
+            int: Number of chunks removed from their source (deleted or handed over).
+        """
+        removed = 0
+        missing: List[str] = []
+        for batch in iter_batches(chunk_ids, batch_size):
+            try:
+                existing = self._collection.get(ids=batch, include=["embeddings", "metadatas"])
+                found = set(existing["ids"])
+                missing.extend(chunk_id for chunk_id in batch if chunk_id not in found)
+                if not existing["ids"]:
+                    continue
+                embeddings = np.asarray(existing["embeddings"], dtype=np.float32)
+                metadatas = [dict(metadata or {}) for metadata in existing["metadatas"]]
+                handover_rows = [row for row, meta in enumerate(metadatas) if meta.get("alternate_sources")]
+                handover_ids = [existing["ids"][row] for row in handover_rows]
+                kept = set(handover_rows)
+                doomed = [chunk_id for row, chunk_id in enumerate(existing["ids"]) if row not in kept]
+
+                self._remove_from_sections(metadatas, embeddings)
+                if handover_rows:
+                    new_metadatas = [self._hand_over(metadatas[row]) for row in handover_rows]
+                    self._collection.update(ids=handover_ids, metadatas=new_metadatas)
+                    self._update_sections(new_metadatas, embeddings[handover_rows])
+                    self._sources.add(
+                        (chunk_id, meta["source"], meta["source_version"])
+                        for chunk_id, meta in zip(handover_ids, new_metadatas)
+                    )
+                    for chunk_id, meta in zip(handover_ids, new_metadatas):
+                        self._sources.remove_alternates(meta["source"], [chunk_id])
+                    self._logger.info("Handed %d chunks over to their alternate sources", len(handover_ids))
+                if doomed:
+                    self._collection.delete(ids=doomed)
+                    self._sources.remove(doomed)
+                    if self._dedup is not None:
+                        self._dedup.remove(doomed)
+                    if self._quantized is not None:
+                        self._quantized.remove(doomed)
+                removed += len(existing["ids"])
+            except Exception as exc:
+                self._logger.exception("VectorStore delete failed: %s", exc)
+        if missing:
+            removed += self._release_duplicates(missing)
+        if removed:
+            self._logger.info("Removed %d chunks from Chroma", removed)
+        return removed
+
+    def delete_source(self, source_name: str) -> int:
+        """Delete every chunk of a source using the source index.
+
+        The source is also dropped from other chunks' ``alternate_sources``.
 
         Args:
-            chunks: Parsed chunks.
             source_name: Source filename.
 
+        Returns:
+            int: Number of chunks removed from the source.
+        """
+        removed = self.delete_chunks(self._sources.chunk_ids(source_name))
+        self._drop_alternate(source_name, self._sources.alternate_chunk_ids(source_name))
+        self._sources.remove_duplicates(source_name)
+        self._logger.info("Deleted source %s (%d chunks)", source_name, removed)
+        return removed
+
+    def replace_source(self, source_name: str, chunks: Iterable[Chunk], batch_size: int = 128) -> int:
+        """Replace all chunks of a source with a new revision.
+
+        The new chunks are written under a new ``source_version`` that
+        searches do not see until the switch, a single update of the active
+        version in the persisted source index; afterwards the old version is
+        hidden until it is deleted. Readers, including other processes
+        sharing the persist directory, filter on that persisted version and
+        therefore see either the old or the new revision, never a mix. If
+        writing fails, the partial new version is removed and the old one
+        stays active. A replace interrupted by a crash is rolled back or
+        completed by the next store opened after its owner process died or
+        its heartbeat lease expired.
+
+        Args:
+            source_name: Source filename.
+            chunks: Chunks of the new revision (list or iterable).
+            batch_size: Chunks embedded and upserted per request.
+
         Returns:
             int: Number of upserted chunks.
+
+        Raises:
+            Exception: Whatever made the upsert fail (after rolling back).
+        """
+        active, version = self._sources.begin_replace(source_name)
+        old_ids = set(self._sources.chunk_ids(source_name))
+        old_alternates = set(self._sources.alternate_chunk_ids(source_name))
+        try:
+            # Fresh ids per version: identical chunks of the old revision must stay untouched until the switch.
+            fresh = assign_chunk_ids(
+                (Chunk(content=chunk.content, metadata=chunk.metadata) for chunk in chunks),
+                f"{source_name}@{version}",
+            )
+            count = 0
+            for batch in iter_batches(fresh, batch_size):
+                count += self._add_batch(batch, source_name, version=version, shadowed=old_ids, strict=True)
+                self._sources.heartbeat(source_name)
+        except Exception:
+            self.delete_chunks(self._sources.chunk_ids(source_name, exclude_version=active))
+            self._sources.remove_duplicates(source_name, exclude_version=active)
+            self._sources.finish_replace(source_name)
+            raise
+        self._sources.activate(source_name, version)
+        self.delete_chunks(self._sources.chunk_ids(source_name, exclude_version=version))
+        self._drop_alternate(source_name, old_alternates - set(self._sources.alternate_chunk_ids(source_name)))
+        self._sources.remove_duplicates(source_name, exclude_version=version)
+        self._sources.finish_replace(source_name)
+        self._logger.info("Replaced source %s with version %d (%d chunks)", source_name, version, count)
+        return count
+
+    def rebuild_source_index(self, batch_size: int = 1000) -> int:
+        """Rebuild the source index from chunk metadata in Chroma.
+
+        Args:
+            batch_size: Records fetched per page.
+
+        Returns:
+            int: Number of indexed chunks.
+        """
+        total = 0
+        offset = 0
+        while True:
+            page = self._collection.get(include=["metadatas"], limit=batch_size, offset=offset)
+            if not page["ids"]:
+                break
+            self._index_sources(page["ids"], page["metadatas"])
+            # Chunks written before versioning get version 0 so replace filters can match them.
+            legacy = [
+                (chunk_id, {**(meta or {}), "source_version": 0})
+                for chunk_id, meta in zip(page["ids"], page["metadatas"])
+                if "source_version" not in (meta or {})
+            ]
+            if legacy:
+                self._collection.update(ids=[item[0] for item in legacy], metadatas=[item[1] for item in legacy])
+            total += len(page["ids"])
+            offset += batch_size
+        self._logger.info("Rebuilt source index with %d chunks", total)
+        return total
+
+    def count(self) -> int:
+        """Return the number of stored chunks."""
+        return self._collection.count()
+
+    def iter_documents(self, batch_size: int = 1000, max_documents: int = 0) -> Iterator[str]:
+        """Yield the content of stored chunks, one page at a time.
+
+        Args:
+            batch_size: Records fetched per page.
+            max_documents: Stop after about this many chunks (0 yields all).
+                Larger collections are sampled in pages spread evenly over
+                the whole collection rather than read from the start.
+
+        Yields:
+            str: Chunk content.
+        """
+        total = self._collection.count()
+        if 0 < max_documents < total:
+            pages = max(1, -(-max_documents // batch_size))
+            offsets = [page * total // pages for page in range(pages)]
+        else:
+            offsets = range(0, total, batch_size)
+        for offset in offsets:
+            page = self._collection.get(include=["documents"], limit=batch_size, offset=offset)
+            if not page["ids"]:
+                return
+            yield from (document or "" for document in page["documents"])
+
+    def _index_sources(self, ids: List[str], metadatas: List[Optional[dict]]) -> None:
+        """Record stored chunks and their alternate sources in the source index.
+
+        Args:
+            ids: Chunk ids.
+            metadatas: Chunk metadata aligned with ``ids``.
+        """
+        metadatas = [metadata or {} for metadata in metadatas]
+        self._sources.add(
+            (chunk_id, meta.get("source", ""), int(meta.get("source_version", 0)))
+            for chunk_id, meta in zip(ids, metadatas)
+        )
+        self._sources.add_alternates(
+            (source, chunk_id)
+            for chunk_id, meta in zip(ids, metadatas)
+            for source in meta.get("alternate_sources", "").split(ALTERNATE_SEPARATOR)
+            if source
+        )
+
+    def _hand_over(self, metadata: dict) -> dict:
+        """Re-assign a canonical chunk to its first alternate source.
+
+        Args:
+            metadata: Chunk metadata with non-empty ``alternate_sources``.
+
+        Returns:
+            dict: Metadata owned by the new source.
+        """
+        alternates = [source for source in metadata["alternate_sources"].split(ALTERNATE_SEPARATOR) if source]
+        owner = alternates[0]
+        updated = dict(metadata)
+        updated["source"] = owner
+        updated["alternate_sources"] = ALTERNATE_SEPARATOR.join(alternates[1:])
+        updated["section_id"] = self._section_id(owner, updated.get("section", ""))
+        updated["source_version"] = self._sources.active_version(owner)
+        return updated
+
+    def _drop_alternate(self, source_name: str, chunk_ids: Iterable[str]) -> None:
+        """Remove a source from the ``alternate_sources`` of chunks.
+
+        Args:
+            source_name: Source filename.
+            chunk_ids: Chunks that list the source.
+        """
+        chunk_ids = list(chunk_ids)
+        if not chunk_ids:
+            return
+        existing = self._collection.get(ids=chunk_ids, include=["metadatas"])
+        ids: List[str] = []
+        metadatas: List[dict] = []
+        for chunk_id, metadata in zip(existing["ids"], existing["metadatas"]):
+            metadata = dict(metadata or {})
+            alternates = [s for s in metadata.get("alternate_sources", "").split(ALTERNATE_SEPARATOR) if s]
+            if source_name in alternates:
+                metadata["alternate_sources"] = ALTERNATE_SEPARATOR.join(s for s in alternates if s != source_name)
+                ids.append(chunk_id)
+                metadatas.append(metadata)
+        if ids:
+            self._collection.update(ids=ids, metadatas=metadatas)
+        self._sources.remove_alternates(source_name, chunk_ids)
+
+    def _release_duplicates(self, chunk_ids: List[str]) -> int:
+        """Release the canonical chunks that collapsed chunks were merged into.
+
+        A canonical chunk is released once its source has no other chunk
+        collapsed into it: the source is dropped from its
+        ``alternate_sources``, or the chunk is deleted (or handed over again)
+        if it was handed over to that source.
+
+        Args:
+            chunk_ids: Ids that are not stored (possibly collapsed chunks).
+
+        Returns:
+            int: Number of handed-over chunks removed from their source.
+        """
+        released = [
+            (source, canonical_id)
+            for source, canonical_id in self._sources.pop_duplicates(chunk_ids)
+            if not self._sources.has_duplicates(source, canonical_id)
+        ]
+        if not released:
+            return 0
+        canonical_ids = sorted({canonical_id for _, canonical_id in released})
+        existing = self._collection.get(ids=canonical_ids, include=["metadatas"])
+        owners = {
+            chunk_id: (meta or {}).get("source", "") for chunk_id, meta in zip(existing["ids"], existing["metadatas"])
+        }
+        owned: List[str] = []
+        alternates: Dict[str, List[str]] = {}
+        for source, canonical_id in released:
+            if owners.get(canonical_id) == source:
+                owned.append(canonical_id)
+            elif canonical_id in owners:
+                alternates.setdefault(source, []).append(canonical_id)
+        for source, canonical_ids in alternates.items():
+            self._drop_alternate(source, canonical_ids)
+        return self.delete_chunks(owned) if owned else 0
+
+    def _recover_replacements(self) -> None:
+        """Finish replaces interrupted by a crash.
+
+        Only replaces whose owner process is gone or whose lease expired
+        (``_REPLACE_LEASE`` seconds without a heartbeat) are touched; a
+        replace still running in another store or process is left to finish.
+        Chunks of any version other than the active one are deleted, which
+        rolls back a replace that had not switched yet and completes one that had.
+        """
+        for source_name, active in self._sources.abandoned(self._REPLACE_LEASE):
+            stale = self._sources.chunk_ids(source_name, exclude_version=active)
+            self._logger.warning("Recovering interrupted replace of %s (%d stale chunks)", source_name, len(stale))
+            self.delete_chunks(stale)
+            self._sources.remove_duplicates(source_name, exclude_version=active)
+            self._sources.finish_replace(source_name)
+
+    def _visibility_conditions(self) -> List[Dict[str, Any]]:
+        """Build Chroma ``where`` conditions hiding in-flight source versions.
+
+        Read from the persisted source index on every search, so a replace
+        running in another process is honoured too.
+
+        Returns:
+            List[Dict[str, Any]]: One condition per source being replaced.
+        """
+        return [
+            {"$or": [{"source": {"$ne": source}}, {"source_version": {"$eq": version}}]}
+            for source, version in self._sources.pending()
+        ]
+
+    def _is_visible(self, metadata: Optional[dict], replacing: Dict[str, int]) -> bool:
+        """Return whether a chunk belongs to the visible version of its source.
+
+        Args:
+            metadata: Chunk metadata.
+            replacing: Sources being replaced -> active version (``SourceIndex.pending``).
+
+        Returns:
+            bool: False only for chunks hidden by an in-flight replace.
+        """
+        metadata = metadata or {}
+        version = replacing.get(metadata.get("source", ""))
+        return version is None or metadata.get("source_version", 0) == version
+
+    def _add_batch(
+        self,
+        chunks: List[Chunk],
+        source_name: str,
+        version: Optional[int] = None,
+        shadowed: Optional[Set[str]] = None,
+        strict: bool = False,
+    ) -> int:
+        """Embed and upsert one batch of chunks.
+
+        Args:
+            chunks: Parsed chunks.
+            source_name: Source filename.
+            version: Source version to tag the chunks with (defaults to the active one).
+            shadowed: Chunk ids that must not serve as near-duplicate canonicals
+                (the old version of a source being replaced).
+            strict: Re-raise failures instead of returning 0.
+
+        Returns:
+            int: Number of upserted chunks (0 if the batch failed).
         """
         if not chunks:
             return 0
+        if version is None:
+            version = self._sources.active_version(source_name)
+        registered: List[str] = []
         try:
             documents: List[str] = []
             metadatas: List[dict] = []
             ids: List[str] = []
+            duplicates: Dict[str, List[str]] = {}
+            collapsed: List[Tuple[str, str]] = []
             for chunk in chunks:
+                chunk_id = chunk.chunk_id or str(uuid.uuid4())
+                if self._dedup is not None:
+                    signature = self._dedup.signature(chunk.content)
+                    canonical_id = self._dedup.find_duplicate(signature)
+                    if canonical_id is not None and shadowed and canonical_id in shadowed:
+                        canonical_id = None
+                    if canonical_id is not None:
+                        # A chunk matching its own id is already stored; nothing to add.
+                        if canonical_id != chunk_id:
+                            duplicates.setdefault(canonical_id, []).append(source_name)
+                            collapsed.append((chunk_id, canonical_id))
+                        continue
+                    self._dedup.add(chunk_id, signature)
+                    registered.append(chunk_id)
                 documents.append(chunk.content)
                 metadata = dict(chunk.metadata)
                 metadata["source"] = source_name
+                section = section_path(metadata.get("path", ""), self._settings.section_depth)
+                metadata["section"] = section
+                metadata["section_id"] = self._section_id(source_name, section)
+                metadata["source_version"] = version
                 metadatas.append(metadata)
-                ids.append(str(uuid.uuid4()))
-            self._collection.upsert(documents=documents, metadatas=metadatas, ids=ids)
-            self._logger.info("Upserted %d chunks to Chroma", len(chunks))
-            return len(chunks)
+                ids.append(chunk_id)
+
+            stored_duplicates = self._attach_alternates(duplicates, ids, metadatas)
+            if documents:
+                embeddings = self._embed(documents)
+                self._collection.upsert(documents=documents, metadatas=metadatas, ids=ids, embeddings=embeddings)
+                self._sources.add((chunk_id, source_name, version) for chunk_id in ids)
+                self._update_sections(metadatas, embeddings)
+                if self._quantized is not None:
+                    self._quantized.add(ids, embeddings)
+            owners = self._update_alternates(stored_duplicates)
+            self._sources.add_alternates((source_name, canonical_id) for canonical_id in duplicates)
+            # Duplicates within the source need no record: its own chunks go with it.
+            self._sources.add_duplicates(
+                (chunk_id, source_name, version, canonical_id)
+                for chunk_id, canonical_id in collapsed
+                if owners.get(canonical_id, source_name) != source_name
+            )
+            if collapsed:
+                self._logger.info("Collapsed %d near-duplicate chunks from %s", len(collapsed), source_name)
+            self._logger.info("Upserted %d chunks to Chroma", len(documents))
+            return len(documents)
         except Exception as exc:
+            if self._dedup is not None and registered:
+                self._dedup.remove(registered)
             self._logger.exception("VectorStore upsert failed: %s", exc)
+            if strict:
+                raise
+            return 0
+
+    def _attach_alternates(
+        self, duplicates: Dict[str, List[str]], ids: List[str], metadatas: List[dict]
+    ) -> Dict[str, List[str]]:
+        """Record duplicate sources on canonical chunks of the current batch.
+
+        Args:
+            duplicates: Canonical chunk id -> sources of its collapsed duplicates.
+            ids: Ids of the chunks about to be upserted.
+            metadatas: Metadata of the chunks about to be upserted (updated in place).
+
+        Returns:
+            Dict[str, List[str]]: Duplicates whose canonical chunk is already stored.
+        """
+        positions = {chunk_id: row for row, chunk_id in enumerate(ids)}
+        stored: Dict[str, List[str]] = {}
+        for canonical_id, sources in duplicates.items():
+            row = positions.get(canonical_id)
+            if row is None:
+                stored[canonical_id] = sources
+                continue
+            metadata = metadatas[row]
+            alternates = merge_alternate_sources(metadata.get("alternate_sources", ""), sources, metadata["source"])
+            if alternates:
+                metadata["alternate_sources"] = alternates
+        return stored
+
+    def _update_alternates(self, duplicates: Dict[str, List[str]]) -> Dict[str, str]:
+        """Merge duplicate sources into already stored canonical chunks.
+
+        Args:
+            duplicates: Canonical chunk id -> sources of its collapsed duplicates.
+
+        Returns:
+            Dict[str, str]: Canonical chunk id -> its source.
+        """
+        if not duplicates:
+            return {}
+        existing = self._collection.get(ids=list(duplicates), include=["metadatas"])
+        ids: List[str] = []
+        metadatas: List[dict] = []
+        owners: Dict[str, str] = {}
+        for chunk_id, metadata in zip(existing["ids"], existing["metadatas"]):
+            metadata = dict(metadata or {})
+            owners[chunk_id] = metadata.get("source", "")
+            alternates = merge_alternate_sources(
+                metadata.get("alternate_sources", ""), duplicates[chunk_id], metadata.get("source", "")
+            )
+            if alternates != metadata.get("alternate_sources", ""):
+                metadata["alternate_sources"] = alternates
+                ids.append(chunk_id)
+                metadatas.append(metadata)
+        if ids:
+            self._collection.update(ids=ids, metadatas=metadatas)
+        return owners
+
+    def export_snapshot(self, path: str) -> int:
+        """Export chunks and section centroids into a snapshot file.
+
+        Args:
+            path: Output snapshot path.
+
+        Returns:
+            int: Number of exported chunks.
+        """
+        footer = write_snapshot(
+            path,
+            {"chunks": self._collection, "sections": self._sections},
+            info={"embedding": self._embedding_identity()},
+        )
+        count = next(entry["count"] for entry in footer["collections"] if entry["role"] == "chunks")
+        self._logger.info("Exported %d chunks to %s", count, path)
+        return count
+
+    def import_snapshot(self, path: str) -> int:
+        """Bulk-load a snapshot without calling the embedding API.
+
+        The MinHash, quantized and source indexes are rebuilt from the imported
+        rows. Every block checksum is verified before the first upsert, so a
+        corrupt snapshot is rejected without importing anything.
+
+        Args:
+            path: Snapshot path.
+
+        Returns:
+            int: Number of imported chunks.
+
+        Raises:
+            SnapshotError: If the snapshot is corrupt or was built with a
+                different embedding model/dimension.
+        """
+        footer = read_snapshot_footer(path)
+        expected = self._embedding_identity()
+        found = footer.get("info", {}).get("embedding")
+        if found != expected:
+            raise SnapshotError(f"Snapshot embedding {found} does not match configured embedding {expected}")
+        verify_snapshot(path, footer)
+        targets = {"chunks": self._collection, "sections": self._sections}
+        imported = 0
+        for entry in footer["collections"]:
+            target = targets.get(entry["role"])
+            if target is None:
+                self._logger.warning("Skipping unknown snapshot collection role %s", entry["role"])
+                continue
+            for rows in iter_snapshot_rows(path, entry):
+                target.upsert(
+                    ids=rows["ids"],
+                    documents=rows["documents"],
+                    metadatas=rows["metadatas"],
+                    embeddings=rows["embeddings"],
+                )
+                if entry["role"] != "chunks":
+                    continue
+                imported += len(rows["ids"])
+                self._index_sources(rows["ids"], rows["metadatas"])
+                if self._dedup is not None:
+                    self._dedup.add_many(
+                        (chunk_id, self._dedup.signature(document))
+                        for chunk_id, document in zip(rows["ids"], rows["documents"])
+                    )
+                if self._quantized is not None:
+                    self._quantized.add(rows["ids"], rows["embeddings"])
+        self._logger.info("Imported %d chunks from %s", imported, path)
+        return imported
+
+    def _embedding_identity(self) -> str:
+        """Describe the embedding space vectors in this store live in.
+
+        Returns:
+            str: Identity string such as ``openai:text-embedding-3-large:256``.
+        """
+        if not self._settings.openai_api_key:
+            return f"simple_hash:{self._settings.hash_embedding_dim}"
+        dimensions = self._settings.embedding_dimensions or "default"
+        return f"openai:{self._settings.embedding_model}:{dimensions}"
+
+    def rebuild_quantized_index(self, batch_size: int = 1000) -> int:
+        """Rebuild the quantized search index from the float vectors in Chroma.
+
+        Args:
+            batch_size: Records fetched per page.
+
+        Returns:
+            int: Number of indexed vectors.
+        """
+        if self._quantized is None:
             return 0
+        self._quantized.clear()
+        total = 0
+        offset = 0
+        while True:
+            page = self._collection.get(include=["embeddings"], limit=batch_size, offset=offset)
+            if not page["ids"]:
+                break
+            self._quantized.add(page["ids"], np.asarray(page["embeddings"], dtype=np.float32))
+            total += len(page["ids"])
+            offset += batch_size
+        self._logger.info("Rebuilt %s index with %d vectors", self._settings.embedding_quantization, total)
+        return total
+
+    def _use_quantized(self) -> bool:
+        """Return whether flat search can use the quantized index.
+
+        The index is reloaded if another store changed its files. It is only
+        used while it covers exactly the rows in Chroma (e.g. not while a
+        writer without quantization, or one mid-batch, has added chunks).
+
+        Returns:
+            bool: True if the quantized index is in sync with the collection.
+        """
+        if self._quantized is None:
+            return False
+        self._quantized.refresh()
+        count = self._quantized.count
+        return bool(count) and count == self._collection.count()
+
+    def _search_quantized(self, query_vector: np.ndarray, k: int) -> List[RetrievedDoc]:
+        """Search the quantized index and re-rank candidates with float vectors.
+
+        Args:
+            query_vector: Float query embedding.
+            k: Top-k results.
+
+        Returns:
+            List[RetrievedDoc]: Retrieved documents, best first.
+        """
+        candidates = self._quantized.search(query_vector, k * max(1, self._settings.quantization_rerank_factor))
+        if not candidates:
+            return []
+        # Chroma rejects repeated ids in one get.
+        candidate_ids = list(dict.fromkeys(chunk_id for chunk_id, _ in candidates))
+        records = self._collection.get(ids=candidate_ids, include=["embeddings", "documents", "metadatas"])
+        vectors = np.asarray(records["embeddings"], dtype=np.float32)
+        query = query_vector / (np.linalg.norm(query_vector) or 1.0)
+        norms = np.linalg.norm(vectors, axis=1)
+        norms[norms == 0.0] = 1.0
+        scores = (vectors @ query) / norms
+        replacing = dict(self._sources.pending())
+        hidden = [
+            row for row, metadata in enumerate(records["metadatas"]) if not self._is_visible(metadata, replacing)
+        ]
+        scores[hidden] = -np.inf
+        order = [row for row in np.argsort(-scores) if np.isfinite(scores[row])][:k]
+        return [
+            RetrievedDoc(doc_id=records["ids"][row], content=records["documents"][row], metadata=records["metadatas"][row])
+            for row in order
+        ]
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts with the collection's embedding function.
+
+        Args:
+            texts: Texts to embed.
+
+        Returns:
+            np.ndarray: Float32 matrix, one row per text.
+        """
+        return np.asarray(self._embedding_fn(texts), dtype=np.float32)
+
+    def _search_sections(self, query_vector: np.ndarray) -> List[str]:
+        """Return ids of the sections whose centroids are closest to the query.
+
+        Args:
+            query_vector: Query embedding.
+
+        Returns:
+            List[str]: Section ids (empty if the section index is empty).
+        """
+        if self._sections.count() == 0:
+            return []
+        result = query_embeddings(self._sections, query_vector, self._settings.section_k, logger=self._logger)
+        return list(result.get("ids", [[]])[0])
+
+    def _update_sections(self, metadatas: List[dict], embeddings: np.ndarray) -> None:
+        """Fold new chunk embeddings into their section centroids.
+
+        Centroids are stored as running means with a ``chunk_count`` so that a
+        section spread over several upserts still averages all its chunks.
+
+        Args:
+            metadatas: Chunk metadata (with ``section_id``).
+            embeddings: Chunk embeddings aligned with ``metadatas``.
+        """
+        groups: Dict[str, Tuple[dict, List[int]]] = {}
+        for row, metadata in enumerate(metadatas):
+            entry = groups.setdefault(metadata["section_id"], (metadata, []))
+            entry[1].append(row)
+
+        existing = self._sections.get(ids=list(groups), include=["embeddings", "metadatas"])
+        previous = {
+            section_id: (np.asarray(vector, dtype=np.float32), int(meta.get("chunk_count", 0)))
+            for section_id, vector, meta in zip(existing["ids"], existing["embeddings"], existing["metadatas"])
+        }
+
+        ids: List[str] = []
+        centroids: List[np.ndarray] = []
+        section_metas: List[dict] = []
+        documents: List[str] = []
+        for section_id, (metadata, rows) in groups.items():
+            total = embeddings[rows].sum(axis=0)
+            count = len(rows)
+            if section_id in previous:
+                old_mean, old_count = previous[section_id]
+                total = total + old_mean * old_count
+                count += old_count
+            ids.append(section_id)
+            centroids.append(total / count)
+            section_metas.append({"source": metadata["source"], "section": metadata["section"], "chunk_count": count})
+            documents.append(metadata["section"])
+        self._sections.upsert(ids=ids, embeddings=centroids, metadatas=section_metas, documents=documents)
+
+    def _remove_from_sections(self, metadatas: List[dict], embeddings: np.ndarray) -> None:
+        """Take deleted chunk embeddings out of their section centroids.
+
+        Sections left without chunks are deleted.
+
+        Args:
+            metadatas: Metadata of the deleted chunks (with ``section_id``).
+            embeddings: Embeddings aligned with ``metadatas``.
+        """
+        groups: Dict[str, List[int]] = {}
+        for row, metadata in enumerate(metadatas):
+            section_id = (metadata or {}).get("section_id")
+            if section_id:
+                groups.setdefault(section_id, []).append(row)
+        if not groups:
+            return
+        existing = self._sections.get(ids=list(groups), include=["embeddings", "metadatas", "documents"])
+        ids: List[str] = []
+        centroids: List[np.ndarray] = []
+        section_metas: List[dict] = []
+        documents: List[str] = []
+        emptied: List[str] = []
+        for section_id, vector, meta, document in zip(
+            existing["ids"], existing["embeddings"], existing["metadatas"], existing["documents"]
+        ):
+            rows = groups[section_id]
+            old_count = int(meta.get("chunk_count", 0))
+            count = old_count - len(rows)
+            if count <= 0:
+                emptied.append(section_id)
+                continue
+            total = np.asarray(vector, dtype=np.float32) * old_count - embeddings[rows].sum(axis=0)
+            ids.append(section_id)
+            centroids.append(total / count)
+            section_metas.append({**meta, "chunk_count": count})
+            documents.append(document)
+        if emptied:
+            self._sections.delete(ids=emptied)
+        if ids:
+            self._sections.upsert(ids=ids, embeddings=centroids, metadatas=section_metas, documents=documents)
+
+    @staticmethod
+    def _section_id(source_name: str, section: str) -> str:
+        """Build a deterministic section id.
+
+        Args:
+            source_name: Source filename.
+            section: Section path.
+
+        Returns:
+            str: Section id.
+        """
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{source_name}::{section}"))
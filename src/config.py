@@ -6,6 +6,7 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
+from typing import Optional
 
 
 @dataclass(frozen=True)
@@ -14,6 +15,7 @@ class Settings:
 
     Args:
         openai_api_key: OpenAI API key.
+        openai_base_url: OpenAI-compatible API base URL (empty uses OpenAI's default).
         tavily_api_key: Tavily API key.
         chroma_persist_dir: Path for Chroma persistence.
         retriever_k: Number of documents to retrieve.
@@ -24,9 +26,46 @@ class Settings:
         eval_model: Evaluator model name.
         gen_model: Generator model name.
         rewrite_model: Query rewrite model name.
+        hash_embedding_dim: Dimensions of the offline hash embedding.
+        collection_name: Chroma collection name.
+        retrieval_mode: Default retrieval mode ("flat" or "hierarchical").
+        section_depth: Heading levels that identify a section in the hierarchical index.
+        section_k: Sections searched before chunk-level search in hierarchical mode.
+        dedup_enabled: Whether near-duplicate chunks are collapsed at ingest.
+        dedup_threshold: Minimum estimated Jaccard similarity for near-duplicates.
+        embedding_dimensions: Requested embedding size (None keeps the model default).
+        embedding_quantization: In-memory search index precision ("none", "float16", "int8").
+        quantization_rerank_factor: Candidates per result re-ranked with float vectors.
+        chunk_max_tokens: Maximum tokens per chunk (0 keeps whole sections).
+        chunk_min_tokens: Sibling sections below this size are merged (0 disables merging).
+        chunk_overlap_tokens: Tokens shared by consecutive pieces of a split section.
+        ingest_job_workers: Background threads processing API ingest jobs.
+        tavily_base_url: Search API base URL (empty uses Tavily's default).
+        search_cache_ttl: Seconds a cached web search result is fresh (0 disables the cache).
+        search_cache_stale_ttl: Extra seconds a stale result is served while it is refreshed.
+        rewrite_fast_path: Whether query rewriting tries the local keyword extractor first.
+        rewrite_cache_size: Rewrites kept in the LRU cache (0 disables it).
+        keyword_stats_max_docs: Chunks sampled for keyword IDF statistics (0 counts all).
+        eval_concurrency: Evaluator LLM calls in flight when scoring a batch.
+        web_result_max_tokens: Tokens of refined strips kept per web result (0 keeps all).
+        context_max_tokens: Token budget of the generator context (0 disables the limit).
+        http_max_connections: Connections in the shared HTTP pool.
+        http_max_keepalive: Idle keep-alive connections kept in the pool.
+        http_keepalive_expiry: Seconds an idle connection is kept.
+        http_timeout: Read/write timeout of OpenAI requests in seconds.
+        http_connect_timeout: Connect timeout in seconds.
+        http_retries: Retries of failed connects and of retryable OpenAI responses (429/5xx).
+        http2: Whether to use HTTP/2 when the h2 package is installed.
+        single_flight: Whether identical concurrent LLM calls share one request.
+        llm_hedging: Whether evaluator and rewriter calls are hedged with adaptive timeouts.
+        hedge_quantile: Latency percentile after which a duplicate call is fired.
+        hedge_min_samples: Latency samples needed before hedging starts.
+        adaptive_timeout_factor: Adaptive timeout as a multiple of the observed p99 latency.
+        adaptive_timeout_floor: Lower bound of the adaptive timeout in seconds.
     """
 
     openai_api_key: str
+    openai_base_url: str
     tavily_api_key: str
     chroma_persist_dir: str
     retriever_k: int
@@ -37,6 +76,42 @@ class Settings:
     eval_model: str
     gen_model: str
     rewrite_model: str
+    hash_embedding_dim: int
+    collection_name: str
+    retrieval_mode: str
+    section_depth: int
+    section_k: int
+    dedup_enabled: bool
+    dedup_threshold: float
+    embedding_dimensions: Optional[int]
+    embedding_quantization: str
+    quantization_rerank_factor: int
+    chunk_max_tokens: int
+    chunk_min_tokens: int
+    chunk_overlap_tokens: int
+    ingest_job_workers: int
+    tavily_base_url: str
+    search_cache_ttl: float
+    search_cache_stale_ttl: float
+    rewrite_fast_path: bool
+    rewrite_cache_size: int
+    keyword_stats_max_docs: int
+    eval_concurrency: int
+    web_result_max_tokens: int
+    context_max_tokens: int
+    http_max_connections: int
+    http_max_keepalive: int
+    http_keepalive_expiry: float
+    http_timeout: float
+    http_connect_timeout: float
+    http_retries: int
+    http2: bool
+    single_flight: bool
+    llm_hedging: bool
+    hedge_quantile: float
+    hedge_min_samples: int
+    adaptive_timeout_factor: float
+    adaptive_timeout_floor: float
 
 
 def load_settings(require_keys: bool = False) -> Settings:
@@ -52,6 +127,7 @@ def load_settings(require_keys: bool = False) -> Settings:
         ValueError: If a required environment variable is missing.
     """
     openai_api_key = os.getenv("OPENAI_API_KEY", "").strip()
+    openai_base_url = os.getenv("OPENAI_BASE_URL", "").strip()
     tavily_api_key = os.getenv("TAVILY_API_KEY", "").strip()
     chroma_persist_dir = os.getenv("CHROMA_PERSIST_DIR", "./data/chroma").strip()
     retriever_k = int(os.getenv("RETRIEVER_K", "5"))
@@ -62,7 +138,52 @@ def load_settings(require_keys: bool = False) -> Settings:
     eval_model = os.getenv("OPENAI_EVAL_MODEL", "gpt-4o-mini").strip()
     gen_model = os.getenv("OPENAI_GEN_MODEL", "gpt-4o").strip()
     rewrite_model = os.getenv("OPENAI_REWRITE_MODEL", "gpt-4o").strip()
+    hash_embedding_dim = int(os.getenv("HASH_EMBEDDING_DIM", "256"))
+    collection_name = os.getenv("COLLECTION_NAME", "rail_crag").strip()
+    retrieval_mode = os.getenv("RETRIEVAL_MODE", "flat").strip().lower()
+    section_depth = int(os.getenv("SECTION_DEPTH", "2"))
+    section_k = int(os.getenv("SECTION_K", "3"))
+    dedup_enabled = os.getenv("DEDUP_NEAR_DUPLICATES", "true").strip().lower() in ("1", "true", "yes")
+    dedup_threshold = float(os.getenv("DEDUP_THRESHOLD", "0.85"))
+    embedding_dimensions_raw = os.getenv("OPENAI_EMBEDDING_DIMENSIONS", "").strip()
+    embedding_dimensions = int(embedding_dimensions_raw) if embedding_dimensions_raw else None
+    embedding_quantization = os.getenv("EMBEDDING_QUANTIZATION", "none").strip().lower()
+    quantization_rerank_factor = int(os.getenv("QUANTIZATION_RERANK_FACTOR", "4"))
+    chunk_max_tokens = int(os.getenv("CHUNK_MAX_TOKENS", "512"))
+    chunk_min_tokens = int(os.getenv("CHUNK_MIN_TOKENS", "64"))
+    chunk_overlap_tokens = int(os.getenv("CHUNK_OVERLAP_TOKENS", "32"))
+    ingest_job_workers = int(os.getenv("INGEST_JOB_WORKERS", "2"))
+    tavily_base_url = os.getenv("TAVILY_BASE_URL", "").strip()
+    search_cache_ttl = float(os.getenv("SEARCH_CACHE_TTL", "3600"))
+    search_cache_stale_ttl = float(os.getenv("SEARCH_CACHE_STALE_TTL", "86400"))
+    rewrite_fast_path = os.getenv("REWRITE_FAST_PATH", "true").strip().lower() in ("1", "true", "yes")
+    rewrite_cache_size = int(os.getenv("REWRITE_CACHE_SIZE", "1024"))
+    keyword_stats_max_docs = int(os.getenv("KEYWORD_STATS_MAX_DOCS", "20000"))
+    eval_concurrency = int(os.getenv("EVAL_CONCURRENCY", "8"))
+    web_result_max_tokens = int(os.getenv("WEB_RESULT_MAX_TOKENS", "256"))
+    context_max_tokens = int(os.getenv("CONTEXT_MAX_TOKENS", "3000"))
+    http_max_connections = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    http_max_keepalive = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+    http_keepalive_expiry = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+    http_timeout = float(os.getenv("HTTP_TIMEOUT", "60"))
+    http_connect_timeout = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    http_retries = int(os.getenv("HTTP_RETRIES", "2"))
+    http2 = os.getenv("HTTP2", "true").strip().lower() in ("1", "true", "yes")
+    single_flight = os.getenv("SINGLE_FLIGHT", "true").strip().lower() in ("1", "true", "yes")
+    llm_hedging = os.getenv("LLM_HEDGING", "false").strip().lower() in ("1", "true", "yes")
+    hedge_quantile = float(os.getenv("HEDGE_QUANTILE", "95"))
+    hedge_min_samples = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+    adaptive_timeout_factor = float(os.getenv("ADAPTIVE_TIMEOUT_FACTOR", "3"))
+    adaptive_timeout_floor = float(os.getenv("ADAPTIVE_TIMEOUT_FLOOR", "2"))
 
+    if retrieval_mode not in ("flat", "hierarchical"):
+        raise ValueError("RETRIEVAL_MODE must be 'flat' or 'hierarchical'")
+    if embedding_quantization not in ("none", "float16", "int8"):
+        raise ValueError("EMBEDDING_QUANTIZATION must be 'none', 'float16' or 'int8'")
+    if chunk_max_tokens and (chunk_min_tokens > chunk_max_tokens or chunk_overlap_tokens >= chunk_max_tokens):
+        raise ValueError("CHUNK_MIN_TOKENS and CHUNK_OVERLAP_TOKENS must be smaller than CHUNK_MAX_TOKENS")
+    if not 0 < hedge_quantile < 100:
+        raise ValueError("HEDGE_QUANTILE must be between 0 and 100")
     if require_keys and not openai_api_key:
         raise ValueError("OPENAI_API_KEY is required")
     if require_keys and not tavily_api_key:
@@ -70,6 +191,7 @@ def load_settings(require_keys: bool = False) -> Settings:
 
     return Settings(
         openai_api_key=openai_api_key,
+        openai_base_url=openai_base_url,
         tavily_api_key=tavily_api_key,
         chroma_persist_dir=chroma_persist_dir,
         retriever_k=retriever_k,
@@ -80,4 +202,40 @@ def load_settings(require_keys: bool = False) -> Settings:
         eval_model=eval_model,
         gen_model=gen_model,
         rewrite_model=rewrite_model,
+        hash_embedding_dim=hash_embedding_dim,
+        collection_name=collection_name,
+        retrieval_mode=retrieval_mode,
+        section_depth=section_depth,
+        section_k=section_k,
+        dedup_enabled=dedup_enabled,
+        dedup_threshold=dedup_threshold,
+        embedding_dimensions=embedding_dimensions,
+        embedding_quantization=embedding_quantization,
+        quantization_rerank_factor=quantization_rerank_factor,
+        chunk_max_tokens=chunk_max_tokens,
+        chunk_min_tokens=chunk_min_tokens,
+        chunk_overlap_tokens=chunk_overlap_tokens,
+        ingest_job_workers=ingest_job_workers,
+        tavily_base_url=tavily_base_url,
+        search_cache_ttl=search_cache_ttl,
+        search_cache_stale_ttl=search_cache_stale_ttl,
+        rewrite_fast_path=rewrite_fast_path,
+        rewrite_cache_size=rewrite_cache_size,
+        keyword_stats_max_docs=keyword_stats_max_docs,
+        eval_concurrency=eval_concurrency,
+        web_result_max_tokens=web_result_max_tokens,
+        context_max_tokens=context_max_tokens,
+        http_max_connections=http_max_connections,
+        http_max_keepalive=http_max_keepalive,
+        http_keepalive_expiry=http_keepalive_expiry,
+        http_timeout=http_timeout,
+        http_connect_timeout=http_connect_timeout,
+        http_retries=http_retries,
+        http2=http2,
+        single_flight=single_flight,
+        llm_hedging=llm_hedging,
+        hedge_quantile=hedge_quantile,
+        hedge_min_samples=hedge_min_samples,
+        adaptive_timeout_factor=adaptive_timeout_factor,
+        adaptive_timeout_floor=adaptive_timeout_floor,
     )
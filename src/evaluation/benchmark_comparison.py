@@ -1,9 +1,14 @@
 """Benchmark CRAG vs Standard RAG."""
 from __future__ import annotations
 
+import argparse
+import importlib.util
+import os
 import time
-from dataclasses import dataclass
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
 
 import pandas as pd
 
@@ -11,7 +16,17 @@ from ..components.generator import AnswerGenerator
 from ..components.vector_store import VectorStore
 from ..config import load_settings
 from ..graph.builder import build_crag_graph
+from ..graph.state import merge_timings
 from ..utils.logging_utils import setup_logging
+from ..utils.usage import UsageTally, track_usage
+from .load_generator import load_questions
+
+DEFAULT_QUESTIONS = [
+    "What is the standard gauge width for railways?",
+    "What are the construction specifications for the Hyperloop on Mars?",
+    "Tell me about the track requirements defined in section 1.1.",
+]
+METHODS = ("standard", "crag")
 
 
 @dataclass(frozen=True)
@@ -25,6 +40,10 @@ class BenchmarkResult:
         context_source: Context source summary.
         answer: Generated answer.
         latency: Execution time in seconds.
+        node_timings: Seconds spent in each pipeline stage.
+        llm_calls: LLM calls made for this question.
+        prompt_tokens: Prompt tokens reported by the LLM API.
+        completion_tokens: Completion tokens reported by the LLM API.
     """
 
     question: str
@@ -33,6 +52,27 @@ class BenchmarkResult:
     context_source: str
     answer: str
     latency: float
+    node_timings: Dict[str, float] = field(default_factory=dict)
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        """Return prompt plus completion tokens."""
+        return self.prompt_tokens + self.completion_tokens
+
+    def to_row(self) -> Dict[str, object]:
+        """Flatten the result into one table row (a ``node.<name>`` column per stage).
+
+        Returns:
+            Dict[str, object]: Row values.
+        """
+        row = asdict(self)
+        timings = row.pop("node_timings")
+        row["total_tokens"] = self.total_tokens
+        row.update({f"node.{name}": seconds for name, seconds in timings.items()})
+        return row
 
 
 class BenchmarkRunner:
@@ -44,7 +84,7 @@ class BenchmarkRunner:
         self._settings = load_settings(require_keys=False)
         self._vector_store = VectorStore(self._settings, logger=self._logger)
         self._generator = AnswerGenerator(self._settings, logger=self._logger)
-        self._crag_app = build_crag_graph()
+        self._crag_app = build_crag_graph(self._vector_store)
 
     def run_standard_rag(self, query: str, k: int = 3) -> BenchmarkResult:
         """Run Standard RAG: retrieve then generate.
@@ -56,17 +96,22 @@ class BenchmarkRunner:
         Returns:
             BenchmarkResult: Result for standard RAG.
         """
-        start = time.time()
-        docs = self._vector_store.search(query, k)
-        context = "\n\n".join([doc.content for doc in docs])
-        answer = self._generator.generate(query, context)
+        with track_usage() as usage:
+            start = time.perf_counter()
+            docs = self._vector_store.search(query, k)
+            context = "\n\n".join([doc.content for doc in docs])
+            retrieved = time.perf_counter()
+            answer = self._generator.generate(query, context)
+            end = time.perf_counter()
         return BenchmarkResult(
             question=query,
             method="Standard RAG",
             action_log="N/A",
             context_source="Internal DB Only",
             answer=answer,
-            latency=time.time() - start,
+            latency=end - start,
+            node_timings={"retrieve": retrieved - start, "generate": end - retrieved},
+            **_usage_fields(usage),
         )
 
     def run_crag(self, query: str) -> BenchmarkResult:
@@ -78,24 +123,30 @@ class BenchmarkRunner:
         Returns:
             BenchmarkResult: Result for CRAG.
         """
-        start = time.time()
         final_answer = ""
         action_log: List[str] = []
         context_source = "Internal"
+        node_timings: Dict[str, float] = {}
 
         inputs = {"question": query}
-        for output in self._crag_app.stream(inputs):
-            for _, state_update in output.items():
-                if isinstance(state_update, dict) and "confidence" in state_update:
-                    action = state_update.get("confidence", "")
-                    if action:
-                        action_log.append(f"Action: {action.upper()}")
-                    if action == "incorrect":
-                        context_source = "Web Search"
-                    elif action == "ambiguous":
-                        context_source = "Hybrid"
-                if isinstance(state_update, dict) and "final_answer" in state_update:
-                    final_answer = state_update.get("final_answer", "")
+        with track_usage() as usage:
+            start = time.perf_counter()
+            for output in self._crag_app.stream(inputs):
+                for _, state_update in output.items():
+                    if not isinstance(state_update, dict):
+                        continue
+                    node_timings = merge_timings(node_timings, state_update.get("node_timings", {}))
+                    if "confidence" in state_update:
+                        action = state_update.get("confidence", "")
+                        if action:
+                            action_log.append(f"Action: {action.upper()}")
+                        if action == "incorrect":
+                            context_source = "Web Search"
+                        elif action == "ambiguous":
+                            context_source = "Hybrid"
+                    if "final_answer" in state_update:
+                        final_answer = state_update.get("final_answer", "")
+            latency = time.perf_counter() - start
 
         return BenchmarkResult(
             question=query,
@@ -103,39 +154,156 @@ class BenchmarkRunner:
             action_log=" -> ".join(action_log),
             context_source=context_source,
             answer=final_answer,
-            latency=time.time() - start,
+            latency=latency,
+            node_timings=node_timings,
+            **_usage_fields(usage),
         )
 
-    def compare(self, questions: List[str]) -> pd.DataFrame:
+    def compare(
+        self,
+        questions: List[str],
+        parallelism: int = 1,
+        methods: Sequence[str] = METHODS,
+    ) -> pd.DataFrame:
         """Run benchmark for a list of questions.
 
+        Questions (and methods) run concurrently on ``parallelism`` threads;
+        with I/O-bound LLM and search calls a large question set finishes in
+        roughly ``1 / parallelism`` of the sequential time. Rows keep the
+        question order.
+
         Args:
             questions: List of questions.
+            parallelism: Questions benchmarked at the same time.
+            methods: Methods to run ("standard", "crag").
 
         Returns:
-            pd.DataFrame: Results dataframe.
+            pd.DataFrame: Results dataframe (one row per question and method).
+
+        Raises:
+            ValueError: If a method name is unknown.
         """
-        results: List[BenchmarkResult] = []
-        for q in questions:
-            self._logger.info("Benchmarking: %s", q)
-            results.append(self.run_standard_rag(q))
-            results.append(self.run_crag(q))
+        unknown = set(methods) - set(METHODS)
+        if unknown:
+            raise ValueError(f"unknown benchmark methods: {sorted(unknown)}")
+        runners = {"standard": self.run_standard_rag, "crag": self.run_crag}
+        tasks = [(question, method) for question in questions for method in methods]
+        run_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
 
-        df = pd.DataFrame([r.__dict__ for r in results])
+        def run(task: tuple) -> BenchmarkResult:
+            question, method = task
+            self._logger.info("Benchmarking (%s): %s", method, question)
+            return runners[method](question)
+
+        with ThreadPoolExecutor(max_workers=max(1, parallelism), thread_name_prefix="benchmark") as pool:
+            results = list(pool.map(run, tasks))
+
+        df = pd.DataFrame([result.to_row() for result in results])
+        df.insert(0, "run_at", run_at)
         return df
 
 
+def _usage_fields(usage: UsageTally) -> Dict[str, int]:
+    """Return the LLM usage fields of a benchmark result.
+
+    Args:
+        usage: Tally collected while the question ran.
+
+    Returns:
+        Dict[str, int]: llm_calls, prompt_tokens and completion_tokens.
+    """
+    return {
+        "llm_calls": usage.calls,
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+    }
+
+
+def summarize(df: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate latency, stage timings and LLM usage per method.
+
+    Args:
+        df: Output of ``BenchmarkRunner.compare``.
+
+    Returns:
+        pd.DataFrame: One row per method.
+    """
+    grouped = df.groupby("method", sort=False)
+    summary = pd.DataFrame(
+        {
+            "questions": grouped.size(),
+            "latency_mean": grouped["latency"].mean(),
+            "latency_p95": grouped["latency"].quantile(0.95),
+            "llm_calls_mean": grouped["llm_calls"].mean(),
+            "tokens_mean": grouped["total_tokens"].mean(),
+        }
+    )
+    for column in [name for name in df.columns if name.startswith("node.")]:
+        summary[f"{column}_mean"] = grouped[column].mean()
+    return summary.reset_index()
+
+
+def parquet_available() -> bool:
+    """Return whether pandas has a Parquet engine (pyarrow or fastparquet)."""
+    return any(importlib.util.find_spec(engine) is not None for engine in ("pyarrow", "fastparquet"))
+
+
+def write_results(df: pd.DataFrame, path: str, logger=None) -> str:
+    """Write benchmark rows to Parquet, CSV or JSONL (by file extension).
+
+    Args:
+        df: Benchmark rows.
+        path: Output file (``.parquet``, ``.csv`` or ``.jsonl``).
+        logger: Optional logger.
+
+    Returns:
+        str: Path written.
+
+    Raises:
+        ImportError: ``.parquet`` was asked for but neither pyarrow nor
+            fastparquet is installed.
+    """
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    lowered = path.lower()
+    if lowered.endswith(".jsonl"):
+        df.to_json(path, orient="records", lines=True, force_ascii=False)
+        return path
+    if lowered.endswith(".parquet"):
+        if not parquet_available():
+            raise ImportError(f"Writing {path} needs pyarrow or fastparquet (pip install pyarrow); use .csv or .jsonl")
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    if logger is not None:
+        logger.info("Wrote %d benchmark rows to %s", len(df), path)
+    return path
+
+
 def main() -> None:
     """CLI entry for benchmark comparison."""
+    parser = argparse.ArgumentParser(description="CRAG vs Standard RAG benchmark")
+    parser.add_argument("--questions", default=None, help="Question set: .jsonl, .csv or one question per line")
+    parser.add_argument("--parallelism", type=int, default=4, help="Questions benchmarked at the same time")
+    parser.add_argument("--methods", nargs="+", choices=METHODS, default=list(METHODS), help="Methods to run")
+    parser.add_argument("--output", default=None, help="Write rows to .parquet, .csv or .jsonl")
+    args = parser.parse_args()
+    # Fail before the run rather than after it.
+    if args.output and args.output.lower().endswith(".parquet") and not parquet_available():
+        parser.error("--output .parquet needs pyarrow or fastparquet (pip install pyarrow); use .csv or .jsonl")
+
+    questions = load_questions(args.questions) if args.questions else DEFAULT_QUESTIONS
     runner = BenchmarkRunner()
-    questions = [
-        "What is the standard gauge width for railways?",
-        "What are the construction specifications for the Hyperloop on Mars?",
-        "Tell me about the track requirements defined in section 1.1.",
-    ]
-    df = runner.compare(questions)
-    cols = ["question", "method", "action_log", "context_source", "answer", "latency"]
+    started = time.perf_counter()
+    df = runner.compare(questions, parallelism=args.parallelism, methods=args.methods)
+    elapsed = time.perf_counter() - started
+    cols = ["question", "method", "action_log", "context_source", "answer", "latency", "llm_calls", "total_tokens"]
     print(df[cols].to_markdown(index=False))
+    print()
+    print(summarize(df).to_markdown(index=False, floatfmt=".3f"))
+    print(f"\n{len(df)} runs in {elapsed:.1f}s (parallelism {args.parallelism})")
+    if args.output:
+        print(f"results written to {write_results(df, args.output, runner._logger)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,166 @@
+"""Benchmark the offline hash embedding against the legacy implementation."""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Tuple
+
+from ..ingestion.mineru_parser import MarkdownHierarchySplitter
+from ..utils.chroma_store import SimpleHashEmbeddingFunction
+
+
+@dataclass(frozen=True)
+class EmbeddingBenchmarkResult:
+    """Throughput record for one embedding implementation.
+
+    Args:
+        method: Implementation name.
+        texts: Number of embedded texts.
+        megabytes: UTF-8 size of the embedded texts in MB.
+        seconds: Best wall time over the measured rounds.
+    """
+
+    method: str
+    texts: int
+    megabytes: float
+    seconds: float
+
+    @property
+    def texts_per_second(self) -> float:
+        """Return embedded texts per second."""
+        return self.texts / self.seconds if self.seconds else float("inf")
+
+    @property
+    def megabytes_per_second(self) -> float:
+        """Return embedded megabytes per second."""
+        return self.megabytes / self.seconds if self.seconds else float("inf")
+
+
+def _legacy_embed_text(text: str, dimensions: int) -> List[float]:
+    """Embed text the way SimpleHashEmbeddingFunction did before vectorization.
+
+    Args:
+        text: Input text.
+        dimensions: Vector dimensions.
+
+    Returns:
+        List[float]: Embedding vector.
+    """
+    vector = [0.0] * dimensions
+    for token in text.lower().split():
+        digest = hashlib.sha256(token.encode("utf-8")).digest()
+        idx = digest[0] % dimensions
+        vector[idx] += 1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def _naive_ngram_embed_text(text: str, dimensions: int, ngram_range: Tuple[int, int]) -> List[float]:
+    """Embed character n-grams with one SHA-256 per feature in pure Python.
+
+    This is what making the legacy implementation CJK-aware would cost without
+    vectorization, i.e. the same feature set as the new implementation.
+
+    Args:
+        text: Input text.
+        dimensions: Vector dimensions.
+        ngram_range: Inclusive (min, max) n-gram sizes.
+
+    Returns:
+        List[float]: Embedding vector.
+    """
+    normalized = " ".join(text.lower().split())
+    vector = [0.0] * dimensions
+    for size in range(ngram_range[0], ngram_range[1] + 1):
+        for start in range(len(normalized) - size + 1):
+            digest = hashlib.sha256(normalized[start : start + size].encode("utf-8")).digest()
+            idx = int.from_bytes(digest[:8], "little") % dimensions
+            vector[idx] += 1.0 if digest[8] & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def _time_best(func: Callable[[], object], rounds: int) -> float:
+    """Return the best wall time of ``func`` over several rounds.
+
+    Args:
+        func: Callable to time.
+        rounds: Number of rounds.
+
+    Returns:
+        float: Best elapsed time in seconds.
+    """
+    best = float("inf")
+    for _ in range(max(1, rounds)):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(path: str, repeat: int, dimensions: int, batch_size: int, rounds: int) -> List[EmbeddingBenchmarkResult]:
+    """Embed the chunks of a (repeated) markdown file with both implementations.
+
+    Args:
+        path: Markdown file used as corpus.
+        repeat: How many times the file content is concatenated.
+        dimensions: Embedding dimensions.
+        batch_size: Texts per embedding call for the vectorized implementation.
+        rounds: Timing rounds per implementation.
+
+    Returns:
+        List[EmbeddingBenchmarkResult]: Legacy, naive n-gram and vectorized results.
+    """
+    with open(path, "r", encoding="utf-8") as handle:
+        markdown = handle.read()
+    texts = [chunk.content for chunk in MarkdownHierarchySplitter().parse("\n".join([markdown] * repeat))]
+    megabytes = sum(len(text.encode("utf-8")) for text in texts) / 1e6
+
+    embedder = SimpleHashEmbeddingFunction(dimensions=dimensions)
+
+    def legacy() -> None:
+        for text in texts:
+            _legacy_embed_text(text, dimensions)
+
+    def naive_ngram() -> None:
+        for text in texts:
+            _naive_ngram_embed_text(text, dimensions, (1, 3))
+
+    def vectorized() -> None:
+        for start in range(0, len(texts), batch_size):
+            embedder.embed_batch(texts[start : start + batch_size])
+
+    return [
+        EmbeddingBenchmarkResult("legacy sha256/whitespace", len(texts), megabytes, _time_best(legacy, rounds)),
+        EmbeddingBenchmarkResult("naive n-gram sha256", len(texts), megabytes, _time_best(naive_ngram, rounds)),
+        EmbeddingBenchmarkResult("vectorized n-gram", len(texts), megabytes, _time_best(vectorized, rounds)),
+    ]
+
+
+def main() -> None:
+    """CLI entry for the embedding benchmark."""
+    parser = argparse.ArgumentParser(description="SimpleHashEmbeddingFunction throughput benchmark")
+    parser.add_argument("--file", default="data/railway_standard_guide.md", help="Markdown corpus file")
+    parser.add_argument("--repeat", type=int, default=50, help="Concatenate the file this many times")
+    parser.add_argument("--dimensions", type=int, default=256, help="Embedding dimensions")
+    parser.add_argument("--batch-size", type=int, default=128, help="Texts per vectorized batch")
+    parser.add_argument("--rounds", type=int, default=1, help="Timing rounds (best is reported)")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.file, args.repeat, args.dimensions, args.batch_size, args.rounds)
+    print(f"{'method':<26}{'texts':>8}{'MB':>8}{'seconds':>10}{'texts/s':>12}{'MB/s':>9}")
+    for r in results:
+        print(
+            f"{r.method:<26}{r.texts:>8}{r.megabytes:>8.2f}{r.seconds:>10.3f}"
+            f"{r.texts_per_second:>12.0f}{r.megabytes_per_second:>9.2f}"
+        )
+    vectorized = results[-1]
+    for r in results[:-1]:
+        print(f"vectorized speedup vs {r.method}: {r.seconds / vectorized.seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""Micro-benchmarks with a regression gate for the CPU hot paths.
+
+Times the pure-Python/NumPy code that runs on every ingest or query —
+markdown splitting, hash embedding, lexical scoring, strip splitting and
+the CRAG decision — on synthetic Chinese standard documents of several
+sizes, and compares the throughput with the baseline stored next to this
+module::
+
+    python -m src.evaluation.benchmark_hotpaths                    # check, exit 1 on regression
+    python -m src.evaluation.benchmark_hotpaths --update-baseline  # after an intended change
+
+Throughput is normalized by a fixed pure-Python calibration workload
+timed in the same run, so a baseline recorded on one machine remains
+meaningful on a faster or slower one.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass, replace
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..components.evaluator import RetrievalEvaluator, determine_crag_action
+from ..components.refiner import KnowledgeRefiner
+from ..config import load_settings
+from ..ingestion.mineru_parser import MarkdownHierarchySplitter
+from ..utils.chroma_store import SimpleHashEmbeddingFunction
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "hotpath_baseline.json")
+SIZES: Dict[str, int] = {"small": 20, "medium": 200, "large": 1000}
+
+_SUBJECTS = ["路基", "桥梁", "隧道", "轨道", "站场", "接触网", "信号", "排水", "涵洞", "道岔"]
+_ATTRIBUTES = ["宽度", "厚度", "坡度", "压实系数", "曲线半径", "沉降量", "净空高度", "设计荷载", "间距", "强度等级"]
+_CONDITIONS = ["设计速度 350 km/h 时", "单线地段", "双线地段", "困难条件下", "寒冷地区", "软土地基上", "桥隧过渡段"]
+_VERBS = ["不应小于", "不应大于", "宜采用", "应控制在", "不得超过"]
+_UNITS = ["m", "mm", "‰", "MPa", "kN", "%"]
+_STANDARDS = ["TB 10001-2016", "TB 10621-2014", "GB 50090-2006", "TB/T 3275-2018", "GB/T 2585-2021"]
+
+
+@dataclass(frozen=True)
+class HotPathResult:
+    """Throughput of one hot path on one document size.
+
+    Args:
+        name: Case name (``<hot path>/<size>``).
+        ops_per_second: Full passes over the input per second.
+        megabytes_per_second: UTF-8 input megabytes processed per second.
+        relative: ``ops_per_second`` divided by the calibration throughput.
+    """
+
+    name: str
+    ops_per_second: float
+    megabytes_per_second: float
+    relative: float
+
+
+@dataclass(frozen=True)
+class Regression:
+    """A case slower than its baseline beyond the tolerance.
+
+    Args:
+        name: Case name.
+        baseline: Baseline relative throughput.
+        current: Current relative throughput.
+    """
+
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        """Return current over baseline throughput."""
+        return self.current / self.baseline if self.baseline else float("inf")
+
+
+def synthetic_standard(clauses: int, seed: int = 0) -> str:
+    """Generate a Chinese railway standard in MinerU-style markdown.
+
+    Chapters and sections with numbered clauses, references to other
+    standards, numeric limits with units and a table per chapter — the
+    structure and character mix the splitter and scorers see in practice.
+
+    Args:
+        clauses: Number of numbered clauses.
+        seed: Random seed (the same seed gives the same document).
+
+    Returns:
+        str: Markdown document.
+    """
+    rng = random.Random(seed)
+    lines = [f"# {rng.choice(_STANDARDS)} 铁路{rng.choice(_SUBJECTS)}设计规范", ""]
+    chapter = section = 0
+    for number in range(clauses):
+        if number % 25 == 0:
+            chapter, section = chapter + 1, 0
+            subject = _SUBJECTS[chapter % len(_SUBJECTS)]
+            lines += [f"## {chapter} {subject}", "", "| 项目 | 一般值 | 困难值 | 依据 |", "| :-- | :-- | :-- | :-- |"]
+            for attribute in rng.sample(_ATTRIBUTES, 3):
+                lines.append(
+                    f"| {subject}{attribute} | {rng.randint(5, 900)} | {rng.randint(3, 700)} | {rng.choice(_STANDARDS)} |"
+                )
+            lines.append("")
+        if number % 5 == 0:
+            section += 1
+            lines += [f"### {chapter}.{section} {rng.choice(_SUBJECTS)}{rng.choice(_ATTRIBUTES)}", ""]
+        sentences = []
+        for _ in range(rng.randint(2, 5)):
+            sentences.append(
+                f"{rng.choice(_CONDITIONS)}，{rng.choice(_SUBJECTS)}{rng.choice(_ATTRIBUTES)}"
+                f"{rng.choice(_VERBS)} {rng.randint(1, 9999) / 10:g} {rng.choice(_UNITS)}。"
+            )
+        if rng.random() < 0.4:
+            sentences.append(f"具体要求应符合现行 {rng.choice(_STANDARDS)} 的有关规定。")
+        lines += [f"{chapter}.{section}.{number % 5 + 1} " + "".join(sentences), ""]
+    return "\n".join(lines)
+
+
+def _calibration() -> None:
+    """Run a fixed pure-Python workload (string, sort and dict operations)."""
+    counts: Dict[str, int] = {}
+    for word in sorted(str(i * 7919 % 10007) for i in range(20000)):
+        counts[word[:2]] = counts.get(word[:2], 0) + len(word)
+
+
+def _throughput(fn: Callable[[], object], min_time: float, rounds: int) -> float:
+    """Return the best calls per second of ``fn`` over several rounds.
+
+    Each round repeats ``fn`` until ``min_time`` has elapsed, so fast and
+    slow cases get comparable timer resolution. The garbage collector is
+    paused while timing, as in ``timeit``.
+
+    Args:
+        fn: Callable to time.
+        min_time: Minimum seconds per round.
+        rounds: Number of rounds.
+
+    Returns:
+        float: Calls per second of the fastest round.
+    """
+    fn()
+    best = 0.0
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(max(1, rounds)):
+            calls, started = 0, time.perf_counter()
+            while True:
+                fn()
+                calls += 1
+                elapsed = time.perf_counter() - started
+                if elapsed >= min_time:
+                    break
+            best = max(best, calls / elapsed)
+    finally:
+        if collecting:
+            gc.enable()
+    return best
+
+
+def hot_path_cases(size: str) -> List[Tuple[str, Callable[[], object], int]]:
+    """Build the benchmark cases for one document size.
+
+    Args:
+        size: Key of ``SIZES``.
+
+    Returns:
+        List[Tuple[str, Callable[[], object], int]]: (name, callable, input bytes).
+    """
+    document = synthetic_standard(SIZES[size], seed=SIZES[size])
+    splitter = MarkdownHierarchySplitter(max_tokens=512, min_tokens=64, overlap_tokens=32)
+    chunks = [chunk.content for chunk in splitter.parse(document)]
+    chunk_bytes = sum(len(chunk.encode("utf-8")) for chunk in chunks)
+    embedder = SimpleHashEmbeddingFunction(dimensions=256)
+    evaluator = RetrievalEvaluator(replace(load_settings(), openai_api_key=""))
+    refiner = KnowledgeRefiner(evaluator)
+    query = "设计速度 350 km/h 时 路基 宽度 不应小于 多少 m"
+    rng = random.Random(SIZES[size])
+    score_sets = [[rng.uniform(-1, 1) for _ in range(5)] for _ in range(SIZES[size] * 10)]
+
+    def split_strips() -> None:
+        for chunk in chunks:
+            refiner._split_into_strips(chunk)
+
+    def crag_actions() -> None:
+        for scores in score_sets:
+            determine_crag_action(scores)
+
+    return [
+        (f"splitter.parse/{size}", lambda: splitter.parse(document), len(document.encode("utf-8"))),
+        (f"hash_embedding/{size}", lambda: embedder.embed_batch(chunks), chunk_bytes),
+        (f"fallback_scores/{size}", lambda: evaluator._fallback_scores(query, chunks), chunk_bytes),
+        (f"split_into_strips/{size}", split_strips, chunk_bytes),
+        (f"crag_action/{size}", crag_actions, 0),
+    ]
+
+
+def run_benchmarks(
+    sizes: Sequence[str] = ("small", "medium", "large"),
+    min_time: float = 0.1,
+    rounds: int = 3,
+    runs: int = 3,
+) -> Tuple[float, List[HotPathResult]]:
+    """Time every hot path at the given sizes.
+
+    Each case is timed ``runs`` times, each time right after the
+    calibration workload, and the run with the median relative throughput
+    is kept; a machine that speeds up or slows down during the benchmark
+    thus affects both sides of the ratio alike.
+
+    Args:
+        sizes: Document sizes to run.
+        min_time: Minimum seconds per timing round.
+        rounds: Timing rounds per measurement (best is kept).
+        runs: Calibrated measurements per case (median is kept).
+
+    Returns:
+        Tuple[float, List[HotPathResult]]: (median calibration calls per second, results)
+    """
+    calibrations: List[float] = []
+    results: List[HotPathResult] = []
+    for size in sizes:
+        for name, fn, size_bytes in hot_path_cases(size):
+            measured = []
+            for _ in range(max(1, runs)):
+                calibration = _throughput(_calibration, min_time, rounds)
+                ops = _throughput(fn, min_time, rounds)
+                calibrations.append(calibration)
+                measured.append(HotPathResult(name, ops, ops * size_bytes / 1e6, ops / calibration))
+            results.append(sorted(measured, key=lambda result: result.relative)[len(measured) // 2])
+    return sorted(calibrations)[len(calibrations) // 2], results
+
+
+def load_baseline(path: str = BASELINE_PATH) -> Dict[str, float]:
+    """Load baseline relative throughputs.
+
+    Args:
+        path: Baseline JSON file.
+
+    Returns:
+        Dict[str, float]: Relative throughput per case name.
+    """
+    with open(path, "r", encoding="utf-8") as handle:
+        data = json.load(handle)
+    return {name: entry["relative"] for name, entry in data["results"].items()}
+
+
+def save_baseline(calibration: float, results: List[HotPathResult], path: str = BASELINE_PATH) -> None:
+    """Write results as the new baseline (cases not run are kept).
+
+    Args:
+        calibration: Calibration calls per second of this run.
+        results: Benchmark results.
+        path: Baseline JSON file.
+    """
+    existing: Dict[str, dict] = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as handle:
+            existing = json.load(handle).get("results", {})
+    for result in results:
+        entry = asdict(result)
+        entry.pop("name")
+        existing[result.name] = {key: round(value, 6) for key, value in entry.items()}
+    payload = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "calibration_per_second": round(calibration, 3),
+        "results": dict(sorted(existing.items())),
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(payload, handle, indent=2)
+        handle.write("\n")
+    os.replace(tmp_path, path)
+
+
+def find_regressions(results: List[HotPathResult], baseline: Dict[str, float], tolerance: float) -> List[Regression]:
+    """Return the cases slower than baseline by more than ``tolerance``.
+
+    Cases without a baseline entry are not gated.
+
+    Args:
+        results: Benchmark results.
+        baseline: Relative throughput per case name.
+        tolerance: Allowed fractional slowdown (0.25 allows 25%).
+
+    Returns:
+        List[Regression]: Regressed cases.
+    """
+    regressions = []
+    for result in results:
+        expected = baseline.get(result.name)
+        if expected and result.relative < expected * (1 - tolerance):
+            regressions.append(Regression(result.name, expected, result.relative))
+    return regressions
+
+
+def main() -> None:
+    """CLI entry for the hot path benchmarks."""
+    parser = argparse.ArgumentParser(description="CPU hot path micro-benchmarks with a regression gate")
+    parser.add_argument("--sizes", nargs="+", choices=sorted(SIZES), default=["small", "medium", "large"])
+    parser.add_argument("--min-time", type=float, default=0.1, help="Minimum seconds per timing round")
+    parser.add_argument("--rounds", type=int, default=3, help="Timing rounds per measurement (best is kept)")
+    parser.add_argument("--runs", type=int, default=3, help="Calibrated measurements per case (median is kept)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed fractional slowdown")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Record this run as the baseline")
+    args = parser.parse_args()
+
+    calibration, results = run_benchmarks(args.sizes, args.min_time, args.rounds, args.runs)
+    baseline: Optional[Dict[str, float]] = load_baseline(args.baseline) if os.path.exists(args.baseline) else {}
+    print(f"calibration: {calibration:.1f} calls/s")
+    print(f"{'case':<28}{'ops/s':>12}{'MB/s':>9}{'relative':>12}{'baseline':>12}{'change':>9}")
+    for r in results:
+        expected = baseline.get(r.name)
+        change = f"{r.relative / expected - 1:+.0%}" if expected else "new"
+        shown = f"{expected:.4g}" if expected else "-"
+        print(f"{r.name:<28}{r.ops_per_second:>12.1f}{r.megabytes_per_second:>9.2f}{r.relative:>12.4g}{shown:>12}{change:>9}")
+
+    if args.update_baseline:
+        save_baseline(calibration, results, args.baseline)
+        print(f"baseline written to {args.baseline}")
+        return
+    regressions = find_regressions(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression.name}: {regression.ratio:.0%} of baseline throughput")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Recall and memory of reduced/quantized embeddings vs the float32 baseline."""
+from __future__ import annotations
+
+import argparse
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+from ..config import load_settings
+from ..utils.chroma_store import get_openai_embedding_function
+from ..utils.quantization import QuantizedVectorIndex
+
+
+@dataclass(frozen=True)
+class QuantizationBenchmarkResult:
+    """Recall/memory record for one storage configuration.
+
+    Args:
+        method: Configuration name.
+        dimensions: Stored vector dimensions.
+        bytes_per_vector: Index bytes per vector.
+        compression: Memory reduction vs float32 at full dimensions.
+        recall: Recall@k against the float32 full-dimension baseline.
+    """
+
+    method: str
+    dimensions: int
+    bytes_per_vector: float
+    compression: float
+    recall: float
+
+
+def _load_sentences(path: str, limit: int) -> List[str]:
+    """Split a markdown file into unique sentences.
+
+    Args:
+        path: Markdown file.
+        limit: Maximum number of sentences.
+
+    Returns:
+        List[str]: Unique sentences (at least 8 characters long).
+    """
+    with open(path, "r", encoding="utf-8") as handle:
+        text = handle.read()
+    sentences = re.split(r"(?<=[.!?。！？；])\s*|\n+", text)
+    unique = list(dict.fromkeys(s.strip() for s in sentences if len(s.strip()) >= 8))
+    return unique[:limit]
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize rows.
+
+    Args:
+        matrix: Float matrix.
+
+    Returns:
+        np.ndarray: Row-normalized matrix.
+    """
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0.0] = 1.0
+    return matrix / norms
+
+
+def _exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Exact top-k ids by inner product.
+
+    Args:
+        corpus: Normalized corpus matrix.
+        queries: Normalized query matrix.
+        k: Top-k.
+
+    Returns:
+        np.ndarray: (n_queries, k) row indices.
+    """
+    scores = queries @ corpus.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def _recall(found: List[List[int]], truth: np.ndarray) -> float:
+    """Mean recall of found ids against ground truth.
+
+    Args:
+        found: Retrieved row indices per query.
+        truth: Ground-truth row indices per query.
+
+    Returns:
+        float: Mean recall in [0, 1].
+    """
+    hits = [len(set(f) & set(t.tolist())) / len(t) for f, t in zip(found, truth)]
+    return float(np.mean(hits)) if hits else 0.0
+
+
+def run_benchmark(
+    corpus: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+    rerank_factor: int,
+    truncations: Optional[List[int]] = None,
+) -> List[QuantizationBenchmarkResult]:
+    """Compare storage configurations against the float32 baseline.
+
+    Args:
+        corpus: Float32 corpus embeddings (full dimensions).
+        queries: Float32 query embeddings (full dimensions).
+        k: Top-k for recall.
+        rerank_factor: Candidates per result re-ranked in float32.
+        truncations: Reduced dimensions to evaluate (Matryoshka-style
+            truncation + renormalization, which is what the embedding API's
+            ``dimensions`` parameter returns for text-embedding-3 models).
+
+    Returns:
+        List[QuantizationBenchmarkResult]: One record per configuration.
+    """
+    corpus = _normalize(corpus.astype(np.float32))
+    queries = _normalize(queries.astype(np.float32))
+    full_dim = corpus.shape[1]
+    baseline_bytes = float(full_dim * 4)
+    truth = _exact_top_k(corpus, queries, k)
+    ids = [str(i) for i in range(corpus.shape[0])]
+
+    results = [QuantizationBenchmarkResult("float32", full_dim, baseline_bytes, 1.0, 1.0)]
+    for dim in [full_dim] + [d for d in (truncations or []) if d < full_dim]:
+        docs = _normalize(corpus[:, :dim])
+        qs = _normalize(queries[:, :dim])
+        if dim != full_dim:
+            found = _exact_top_k(docs, qs, k).tolist()
+            results.append(
+                QuantizationBenchmarkResult(f"float32 dims={dim}", dim, dim * 4.0, baseline_bytes / (dim * 4), _recall(found, truth))
+            )
+        for mode in ("float16", "int8"):
+            index = QuantizedVectorIndex(None, mode)
+            index.add(ids, docs)
+            per_vector = index.nbytes / len(ids)
+            raw = [[int(i) for i, _ in index.search(q, k)] for q in qs]
+            reranked: List[List[int]] = []
+            for q in qs:
+                rows = np.array([int(i) for i, _ in index.search(q, k * rerank_factor)])
+                reranked.append(rows[np.argsort(-(docs[rows] @ q))][:k].tolist())
+            suffix = f" dims={dim}" if dim != full_dim else ""
+            results.append(
+                QuantizationBenchmarkResult(f"{mode}{suffix}", dim, per_vector, baseline_bytes / per_vector, _recall(raw, truth))
+            )
+            results.append(
+                QuantizationBenchmarkResult(
+                    f"{mode}{suffix} + rerank x{rerank_factor}",
+                    dim,
+                    per_vector,
+                    baseline_bytes / per_vector,
+                    _recall(reranked, truth),
+                )
+            )
+    return results
+
+
+def main() -> None:
+    """CLI entry for the quantization benchmark."""
+    parser = argparse.ArgumentParser(description="Reduced/quantized embedding recall benchmark")
+    parser.add_argument("--file", default="data/railway_standard_guide.md", help="Markdown corpus file")
+    parser.add_argument("--limit", type=int, default=2000, help="Maximum corpus sentences")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--k", type=int, default=5, help="Top-k for recall")
+    parser.add_argument("--rerank-factor", type=int, default=4, help="Candidates per result for float re-ranking")
+    parser.add_argument(
+        "--truncate",
+        type=int,
+        nargs="*",
+        default=[1024, 256],
+        help="Reduced dimensions to evaluate (only meaningful for text-embedding-3 vectors)",
+    )
+    args = parser.parse_args()
+
+    settings = load_settings(require_keys=False)
+    embedder = get_openai_embedding_function(
+        api_key=settings.openai_api_key,
+        model_name=settings.embedding_model,
+        hash_dimensions=settings.hash_embedding_dim,
+    )
+    sentences = _load_sentences(args.file, args.limit)
+    rng = np.random.default_rng(0)
+    picks = rng.choice(len(sentences), size=min(args.queries, len(sentences)), replace=False)
+    # Queries are the first half of corpus sentences: related but not identical.
+    query_texts = [sentences[i][: max(4, len(sentences[i]) // 2)] for i in picks]
+    corpus = np.asarray(embedder(sentences), dtype=np.float32)
+    queries = np.asarray(embedder(query_texts), dtype=np.float32)
+    truncations = args.truncate if settings.openai_api_key else []
+
+    results = run_benchmark(corpus, queries, args.k, args.rerank_factor, truncations)
+    print(f"corpus={corpus.shape[0]} queries={queries.shape[0]} k={args.k} embedding={settings.embedding_model if settings.openai_api_key else 'simple_hash'}")
+    print(f"{'method':<32}{'dims':>6}{'bytes/vec':>11}{'compression':>13}{'recall@k':>10}")
+    for r in results:
+        print(f"{r.method:<32}{r.dimensions:>6}{r.bytes_per_vector:>11.0f}{r.compression:>12.1f}x{r.recall:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+"""Load generator for the Rail-CRAG API.
+
+Drives ``POST /chat`` from a question corpus either open-loop (requests
+arrive at a fixed rate regardless of how fast the service answers) or
+closed-loop (a fixed number of clients, each sending its next request when
+the previous one returns), and reports throughput, latency percentiles,
+error rate and the per-node breakdown returned in ``node_timings``::
+
+    python -m src.evaluation.load_generator questions.jsonl --rate 5 --requests 200 \\
+        --json results/load.json --csv results/load.csv
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+
+from ..utils.metrics import percentile
+
+
+@dataclass
+class RequestRecord:
+    """Outcome of one request.
+
+    Args:
+        index: Request number.
+        question: Question sent.
+        status: HTTP status (0 when the request did not complete).
+        latency: Seconds from the scheduled send time to the response.
+        error: Error description for failed requests.
+        context_source: CRAG decision reported by the service.
+        node_timings: Seconds spent in each graph node.
+    """
+
+    index: int
+    question: str
+    status: int
+    latency: float
+    error: str = ""
+    context_source: str = ""
+    node_timings: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        """Return whether the request succeeded."""
+        return 200 <= self.status < 300
+
+
+@dataclass
+class LoadTestReport:
+    """Aggregated results of a load test.
+
+    Args:
+        mode: "open" or "closed".
+        target: URL under test.
+        offered: Arrival rate (open loop) or concurrency (closed loop).
+        duration: Seconds from the first send to the last response.
+        records: Per-request outcomes.
+    """
+
+    mode: str
+    target: str
+    offered: float
+    duration: float
+    records: List[RequestRecord]
+
+    @property
+    def errors(self) -> int:
+        """Return the number of failed requests."""
+        return sum(not record.ok for record in self.records)
+
+    def summary(self) -> Dict[str, object]:
+        """Summarize throughput, latency, errors and node timings.
+
+        Returns:
+            Dict[str, object]: Summary suitable for JSON output.
+        """
+        ok = [record for record in self.records if record.ok]
+        latencies = [record.latency for record in ok]
+        nodes: Dict[str, List[float]] = {}
+        for record in ok:
+            for name, seconds in record.node_timings.items():
+                nodes.setdefault(name, []).append(seconds)
+        total = sum(latencies) or 1.0
+        return {
+            "mode": self.mode,
+            "target": self.target,
+            "offered": self.offered,
+            "requests": len(self.records),
+            "errors": self.errors,
+            "error_rate": self.errors / len(self.records) if self.records else 0.0,
+            "duration": self.duration,
+            "throughput": len(ok) / self.duration if self.duration else 0.0,
+            "latency": _distribution(latencies),
+            "nodes": {
+                name: {**_distribution(values), "share": sum(values) / total}
+                for name, values in sorted(nodes.items())
+            },
+        }
+
+    def write_json(self, path: str) -> None:
+        """Write the summary and per-request records as JSON.
+
+        Args:
+            path: Output file.
+        """
+        _ensure_parent(path)
+        payload = {"summary": self.summary(), "records": [asdict(record) for record in self.records]}
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, ensure_ascii=False, indent=2)
+
+    def write_csv(self, path: str) -> None:
+        """Write one row per request, with a ``node.<name>`` column per node.
+
+        Args:
+            path: Output file.
+        """
+        _ensure_parent(path)
+        node_names = sorted({name for record in self.records for name in record.node_timings})
+        columns = ["index", "question", "status", "latency", "error", "context_source"]
+        with open(path, "w", encoding="utf-8", newline="") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(columns + [f"node.{name}" for name in node_names])
+            for record in self.records:
+                row = [getattr(record, column) for column in columns]
+                writer.writerow(row + [record.node_timings.get(name, "") for name in node_names])
+
+
+def _distribution(values: List[float]) -> Dict[str, float]:
+    """Return count, mean and tail percentiles of latencies.
+
+    Args:
+        values: Latencies in seconds.
+
+    Returns:
+        Dict[str, float]: count, mean, p50, p95, p99 and max.
+    """
+    if not values:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values),
+    }
+
+
+def _ensure_parent(path: str) -> None:
+    """Create the parent directory of an output file."""
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+
+
+def load_questions(path: str) -> List[str]:
+    """Load a question corpus.
+
+    JSONL files take the ``question`` (or ``query``) field of each object,
+    CSV files the ``question`` (or ``query``) column, and any other file
+    one question per non-empty line.
+
+    Args:
+        path: Corpus file.
+
+    Returns:
+        List[str]: Questions in file order.
+
+    Raises:
+        ValueError: If a JSONL/CSV record has no question field.
+    """
+    questions: List[str] = []
+    with open(path, "r", encoding="utf-8", newline="") as handle:
+        if path.lower().endswith(".jsonl"):
+            for number, line in enumerate(handle, start=1):
+                if line.strip():
+                    questions.append(_question_field(json.loads(line), f"{path}:{number}"))
+        elif path.lower().endswith(".csv"):
+            for number, row in enumerate(csv.DictReader(handle), start=2):
+                questions.append(_question_field(row, f"{path}:{number}"))
+        else:
+            questions = [line.strip() for line in handle if line.strip()]
+    return questions
+
+
+def _question_field(record: dict, where: str) -> str:
+    """Return the question of a corpus record.
+
+    Args:
+        record: Parsed JSONL object or CSV row.
+        where: Location used in the error message.
+
+    Returns:
+        str: Question text.
+
+    Raises:
+        ValueError: If the record has no question field.
+    """
+    value = record.get("question") or record.get("query")
+    if not value:
+        raise ValueError(f"{where}: missing 'question' field")
+    return str(value).strip()
+
+
+class LoadTester:
+    """Send chat requests to the API and collect their outcomes.
+
+    Args:
+        base_url: API base URL, e.g. ``http://127.0.0.1:8000``.
+        path: Endpoint path.
+        timeout: Per-request timeout in seconds.
+        max_in_flight: Cap on concurrent open-loop requests (and pooled connections).
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        path: str = "/chat",
+        timeout: float = 120.0,
+        max_in_flight: int = 256,
+    ) -> None:
+        """Initialize the load tester.
+
+        Args:
+            base_url: API base URL, e.g. ``http://127.0.0.1:8000``.
+            path: Endpoint path.
+            timeout: Per-request timeout in seconds.
+            max_in_flight: Cap on concurrent open-loop requests (and pooled connections).
+        """
+        self.target = base_url.rstrip("/") + path
+        self._timeout = timeout
+        self._max_in_flight = max_in_flight
+
+    def run_open(
+        self,
+        questions: List[str],
+        rate: float,
+        requests: Optional[int] = None,
+        arrival: str = "poisson",
+        seed: int = 0,
+    ) -> LoadTestReport:
+        """Send requests at a fixed arrival rate regardless of response times.
+
+        Latency is measured from each request's scheduled send time, so time
+        spent waiting for a free client slot counts (no coordinated omission).
+
+        Args:
+            questions: Question corpus (cycled).
+            rate: Requests per second.
+            requests: Total requests (defaults to the corpus size).
+            arrival: "poisson" (exponential gaps) or "uniform" (even spacing).
+            seed: Seed of the Poisson arrival process.
+
+        Returns:
+            LoadTestReport: Results.
+
+        Raises:
+            ValueError: If the rate or arrival process is invalid.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if arrival not in ("poisson", "uniform"):
+            raise ValueError("arrival must be 'poisson' or 'uniform'")
+        total = requests or len(questions)
+        rng = random.Random(seed)
+        offsets, at = [], 0.0
+        for _ in range(total):
+            offsets.append(at)
+            at += rng.expovariate(rate) if arrival == "poisson" else 1.0 / rate
+        records: List[Optional[RequestRecord]] = [None] * total
+        with self._client(self._max_in_flight) as client, ThreadPoolExecutor(
+            max_workers=self._max_in_flight, thread_name_prefix="load"
+        ) as pool:
+            started = time.perf_counter()
+            for index, offset in enumerate(offsets):
+                delay = started + offset - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                question = questions[index % len(questions)]
+                pool.submit(self._record_into, records, client, index, question, started + offset)
+        duration = time.perf_counter() - started
+        return LoadTestReport("open", self.target, rate, duration, [record for record in records if record])
+
+    def run_closed(self, questions: List[str], concurrency: int, requests: Optional[int] = None) -> LoadTestReport:
+        """Keep ``concurrency`` requests in flight until all are sent.
+
+        Args:
+            questions: Question corpus (cycled).
+            concurrency: Simultaneous clients.
+            requests: Total requests (defaults to the corpus size).
+
+        Returns:
+            LoadTestReport: Results.
+
+        Raises:
+            ValueError: If concurrency is not positive.
+        """
+        if concurrency <= 0:
+            raise ValueError("concurrency must be positive")
+        total = requests or len(questions)
+        records: List[Optional[RequestRecord]] = [None] * total
+        counter = iter(range(total))
+        lock = threading.Lock()
+
+        def client_loop(client: httpx.Client) -> None:
+            while True:
+                with lock:
+                    index = next(counter, None)
+                if index is None:
+                    return
+                self._record_into(records, client, index, questions[index % len(questions)], time.perf_counter())
+
+        with self._client(concurrency) as client, ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="load"
+        ) as pool:
+            started = time.perf_counter()
+            for _ in range(concurrency):
+                pool.submit(client_loop, client)
+        duration = time.perf_counter() - started
+        return LoadTestReport("closed", self.target, concurrency, duration, [record for record in records if record])
+
+    def _client(self, connections: int) -> httpx.Client:
+        """Create a pooled HTTP client sized for the offered load.
+
+        Args:
+            connections: Maximum simultaneous connections.
+
+        Returns:
+            httpx.Client: Client.
+        """
+        limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+        return httpx.Client(timeout=self._timeout, limits=limits)
+
+    def _record_into(
+        self,
+        records: List[Optional[RequestRecord]],
+        client: httpx.Client,
+        index: int,
+        question: str,
+        scheduled: float,
+    ) -> None:
+        """Send one request and store its outcome.
+
+        Args:
+            records: Result slots indexed by request number.
+            client: HTTP client.
+            index: Request number.
+            question: Question to send.
+            scheduled: ``perf_counter`` time the request was due.
+        """
+        try:
+            response = client.post(self.target, json={"query": question})
+            latency = time.perf_counter() - scheduled
+            if response.is_success:
+                body = response.json()
+                records[index] = RequestRecord(
+                    index,
+                    question,
+                    response.status_code,
+                    latency,
+                    context_source=str(body.get("context_source", "")),
+                    node_timings=dict(body.get("node_timings") or {}),
+                )
+            else:
+                records[index] = RequestRecord(index, question, response.status_code, latency, error=response.text[:200])
+        except Exception as exc:
+            records[index] = RequestRecord(index, question, 0, time.perf_counter() - scheduled, error=repr(exc)[:200])
+
+
+def format_summary(summary: Dict[str, object]) -> str:
+    """Render a load test summary as text.
+
+    Args:
+        summary: Output of ``LoadTestReport.summary``.
+
+    Returns:
+        str: Human-readable report.
+    """
+    latency = summary["latency"]
+    lines = [
+        f"{summary['mode']} loop @ {summary['offered']:g} against {summary['target']}",
+        f"requests {summary['requests']}  errors {summary['errors']} ({summary['error_rate']:.1%})"
+        f"  duration {summary['duration']:.2f}s  throughput {summary['throughput']:.2f} req/s",
+        f"latency  p50 {latency['p50']:.3f}s  p95 {latency['p95']:.3f}s  p99 {latency['p99']:.3f}s"
+        f"  max {latency['max']:.3f}s",
+    ]
+    for name, stats in summary["nodes"].items():
+        lines.append(
+            f"  {name:<22} p50 {stats['p50']:.3f}s  p95 {stats['p95']:.3f}s  p99 {stats['p99']:.3f}s"
+            f"  share {stats['share']:.1%}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """CLI entry for the load test."""
+    parser = argparse.ArgumentParser(description="Rail-CRAG API load test")
+    parser.add_argument("corpus", help="Questions: .jsonl, .csv or one question per line")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="API base URL")
+    parser.add_argument("--path", default="/chat", help="Endpoint path")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--rate", type=float, help="Open loop: arrivals per second")
+    mode.add_argument("--concurrency", type=int, help="Closed loop: simultaneous clients")
+    parser.add_argument("--requests", type=int, default=None, help="Total requests (default: corpus size)")
+    parser.add_argument("--arrival", choices=("poisson", "uniform"), default="poisson", help="Open-loop arrivals")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of Poisson arrivals")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write summary and records as JSON")
+    parser.add_argument("--csv", dest="csv_path", default=None, help="Write per-request rows as CSV")
+    args = parser.parse_args()
+
+    questions = load_questions(args.corpus)
+    if not questions:
+        parser.error(f"no questions in {args.corpus}")
+    tester = LoadTester(args.url, path=args.path, timeout=args.timeout)
+    if args.rate is not None:
+        report = tester.run_open(questions, args.rate, args.requests, arrival=args.arrival, seed=args.seed)
+    else:
+        report = tester.run_closed(questions, args.concurrency, args.requests)
+    print(format_summary(report.summary()))
+    if args.json_path:
+        report.write_json(args.json_path)
+    if args.csv_path:
+        report.write_csv(args.csv_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+"""Local OpenAI- and Tavily-compatible stand-in server for offline load tests.
+
+Serves ``/v1/chat/completions``, ``/v1/embeddings`` and ``/search`` with
+deterministic, schema-valid responses, so the whole CRAG graph can run
+without API quota::
+
+    python -m src.evaluation.stub_server --port 8900 \\
+        --chat-latency lognormal:0.8,0.4 --error-rate 0.01
+
+    OPENAI_API_KEY=stub OPENAI_BASE_URL=http://127.0.0.1:8900/v1 \\
+    TAVILY_API_KEY=stub TAVILY_BASE_URL=http://127.0.0.1:8900 uvicorn src.server:app
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import re
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set
+
+from ..components.keywords import KeywordExtractor
+from ..utils.chroma_store import SimpleHashEmbeddingFunction
+from ..utils.tokens import estimate_tokens
+
+ENDPOINTS = ("chat", "embeddings", "search")
+
+_EVAL_PATTERN = re.compile(r"Query: (?P<query>.*?)\nDocument: (?P<document>.*?)\n\n", re.S)
+_STRIPS_PATTERN = re.compile(r"Query: (?P<query>.*?)\nStrips \(JSON array\): (?P<strips>\[.*?\])\n\n", re.S)
+_REWRITE_PATTERN = re.compile(r"Q: (?P<question>[^\n]*)\nA:\s*$")
+_GENERATE_PATTERN = re.compile(r"Context:\n(?P<context>.*)\n\nQuestion: (?P<question>.*)$", re.S)
+_SENTENCE_PATTERN = re.compile(r"(?<=[。！？])\s*|(?<=[.!?])\s+|\n+")
+_CJK = re.compile(r"[一-鿿]+")
+_WORD = re.compile(r"[a-z0-9]+(?:[./-][a-z0-9]+)*")
+
+
+@dataclass(frozen=True)
+class LatencyProfile:
+    """Latency distribution of one endpoint.
+
+    Args:
+        kind: "fixed", "uniform", "normal", "lognormal" or "exponential".
+        params: Distribution parameters in seconds (fixed: value; uniform:
+            low, high; normal: mean, stddev; lognormal: median, sigma;
+            exponential: mean).
+    """
+
+    kind: str = "fixed"
+    params: tuple = (0.0,)
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyProfile":
+        """Parse a ``kind:p1,p2`` spec (a bare number means fixed).
+
+        Args:
+            spec: Latency spec, e.g. ``lognormal:0.8,0.4`` or ``0.05``.
+
+        Returns:
+            LatencyProfile: Parsed profile.
+
+        Raises:
+            ValueError: If the kind or parameter count is invalid.
+        """
+        kind, _, raw = spec.partition(":") if ":" in spec else ("fixed", "", spec)
+        params = tuple(float(value) for value in raw.split(",") if value.strip())
+        arity = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exponential": 1}
+        if arity.get(kind) != len(params):
+            raise ValueError(f"invalid latency spec: {spec!r}")
+        return cls(kind=kind, params=params)
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one latency in seconds (never negative).
+
+        Args:
+            rng: Random source.
+
+        Returns:
+            float: Latency in seconds.
+        """
+        if self.kind == "uniform":
+            value = rng.uniform(*self.params)
+        elif self.kind == "normal":
+            value = rng.gauss(*self.params)
+        elif self.kind == "lognormal":
+            median, sigma = self.params
+            value = median * rng.lognormvariate(0.0, sigma) if median > 0 else 0.0
+        elif self.kind == "exponential":
+            value = rng.expovariate(1.0 / self.params[0]) if self.params[0] > 0 else 0.0
+        else:
+            value = self.params[0]
+        return max(0.0, value)
+
+
+@dataclass(frozen=True)
+class StubConfig:
+    """Behaviour of the stand-in server.
+
+    Args:
+        latency: Latency profile per endpoint ("chat", "embeddings", "search").
+        error_rate: Probability per endpoint that a request fails.
+        error_status: HTTP status of injected failures.
+        seed: Seed making latencies and failures reproducible.
+        embedding_dimensions: Vector size when the request does not set one.
+    """
+
+    latency: Dict[str, LatencyProfile] = field(default_factory=dict)
+    error_rate: Dict[str, float] = field(default_factory=dict)
+    error_status: int = 500
+    seed: int = 0
+    embedding_dimensions: int = 256
+
+
+def _grams(text: str) -> Set[str]:
+    """Return CJK character bigrams and Latin words of a text.
+
+    Args:
+        text: Input text.
+
+    Returns:
+        Set[str]: Terms.
+    """
+    lowered = text.lower()
+    terms = {word for word in _WORD.findall(lowered)}
+    for run in _CJK.findall(lowered):
+        terms.update(run[i : i + 2] for i in range(max(1, len(run) - 1)))
+    return terms
+
+
+def relevance(query: str, document: str) -> float:
+    """Score how much of the query a document covers, in [-1, 1].
+
+    Args:
+        query: Query text.
+        document: Document text.
+
+    Returns:
+        float: ``2 * coverage - 1`` rounded to 3 decimals.
+    """
+    wanted = _grams(query)
+    if not wanted:
+        return -1.0
+    coverage = len(wanted & _grams(document)) / len(wanted)
+    return round(2 * coverage - 1, 3)
+
+
+@lru_cache(maxsize=None)
+def _embedder(dimensions: int) -> SimpleHashEmbeddingFunction:
+    """Return a shared hash embedding of the given size."""
+    return SimpleHashEmbeddingFunction(dimensions=dimensions)
+
+
+class StubServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the stub configuration and counters.
+
+    Args:
+        address: (host, port) to bind; port 0 picks a free port.
+        config: Stub behaviour.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple, config: Optional[StubConfig] = None) -> None:
+        """Bind the server.
+
+        Args:
+            address: (host, port) to bind; port 0 picks a free port.
+            config: Stub behaviour.
+        """
+        super().__init__(address, _StubHandler)
+        self.config = config or StubConfig()
+        self._lock = threading.Lock()
+        self._seen: Dict[str, int] = {}
+        self.stats: Dict[str, Dict[str, int]] = {name: {"requests": 0, "errors": 0} for name in ENDPOINTS}
+
+    @property
+    def base_url(self) -> str:
+        """Return the server's base URL (without the ``/v1`` prefix)."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def roll(self, endpoint: str, body: bytes) -> tuple[float, bool]:
+        """Draw the latency and failure decision for one request.
+
+        The random stream is derived from the seed, the endpoint, the body
+        and how often that body was seen, so a replayed workload gets the
+        same latencies and failures regardless of thread interleaving.
+
+        Args:
+            endpoint: Endpoint name.
+            body: Raw request body.
+
+        Returns:
+            tuple[float, bool]: (latency in seconds, whether to fail)
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        with self._lock:
+            occurrence = self._seen.get(digest, 0)
+            self._seen[digest] = occurrence + 1
+            self.stats[endpoint]["requests"] += 1
+        rng = random.Random(f"{self.config.seed}:{endpoint}:{digest}:{occurrence}")
+        delay = self.config.latency.get(endpoint, LatencyProfile()).sample(rng)
+        failed = rng.random() < self.config.error_rate.get(endpoint, 0.0)
+        if failed:
+            with self._lock:
+                self.stats[endpoint]["errors"] += 1
+        return delay, failed
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Route requests to the chat, embeddings and search stand-ins."""
+
+    protocol_version = "HTTP/1.1"
+    server: StubServer
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        if self.path.rstrip("/") == "/stats":
+            self._send(200, self.server.stats)
+        elif self.path.rstrip("/") == "/health":
+            self._send(200, {"status": "ok"})
+        else:
+            self._send(404, {"error": {"message": f"unknown path {self.path}"}})
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        path = self.path.split("?")[0].rstrip("/")
+        routes = {"/chat/completions": "chat", "/embeddings": "embeddings", "/search": "search"}
+        endpoint = next((name for suffix, name in routes.items() if path.endswith(suffix)), None)
+        if endpoint is None:
+            self._send(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+        try:
+            payload = json.loads(body or b"{}")
+        except json.JSONDecodeError:
+            self._send(400, {"error": {"message": "invalid JSON body"}})
+            return
+        delay, failed = self.server.roll(endpoint, body)
+        time.sleep(delay)
+        if failed:
+            status = self.server.config.error_status
+            self._send(status, {"error": {"message": "injected failure", "type": "server_error", "code": status}})
+            return
+        handler = {"chat": _chat, "embeddings": lambda p: _embeddings(p, self.server.config), "search": _search}
+        self._send(200, handler[endpoint](payload))
+
+    def _send(self, status: int, payload: dict) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def _reply(messages: List[dict]) -> str:
+    """Build the deterministic assistant reply for a chat request.
+
+    Recognizes the evaluator, rewriter and generator prompts of this
+    project; anything else gets an echo of the last message.
+
+    Args:
+        messages: Chat messages of the request.
+
+    Returns:
+        str: Assistant message content.
+    """
+    text = "\n".join(str(message.get("content", "")) for message in messages)
+    last = str(messages[-1].get("content", "")) if messages else ""
+    evaluation = _EVAL_PATTERN.search(text)
+    if evaluation:
+        score = relevance(evaluation["query"], evaluation["document"])
+        return json.dumps({"relevance_score": score, "reasoning": f"query term coverage {score:+.3f}"})
+    strips = _STRIPS_PATTERN.search(text)
+    if strips:
+        scores = [relevance(strips["query"], strip) for strip in json.loads(strips["strips"])]
+        return json.dumps({"scores": scores})
+    rewrite = _REWRITE_PATTERN.search(last)
+    if rewrite:
+        result = KeywordExtractor().extract(rewrite["question"])
+        return result.query if result.keywords else rewrite["question"]
+    generate = _GENERATE_PATTERN.search(last)
+    if generate:
+        sentences = [part.strip() for part in _SENTENCE_PATTERN.split(generate["context"]) if part.strip()]
+        if not sentences:
+            return "I do not know."
+        best = max(sentences, key=lambda sentence: relevance(generate["question"], sentence))
+        return f"According to the context: {best}"
+    return f"stub reply: {last[:200]}"
+
+
+def _chat(payload: dict) -> dict:
+    """Answer an OpenAI chat completions request."""
+    messages = payload.get("messages") or []
+    content = _reply(messages)
+    prompt_tokens = sum(estimate_tokens(str(message.get("content", ""))) for message in messages)
+    completion_tokens = estimate_tokens(content)
+    digest = hashlib.sha256(json.dumps(messages, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+    return {
+        "id": f"chatcmpl-stub-{digest[:24]}",
+        "object": "chat.completion",
+        "created": 0,
+        "model": payload.get("model", "stub"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+                "logprobs": None,
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def _embeddings(payload: dict, config: StubConfig) -> dict:
+    """Answer an OpenAI embeddings request with hash embeddings."""
+    inputs = payload.get("input") or []
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    texts = [value if isinstance(value, str) else " ".join(map(str, value)) for value in inputs]
+    vectors = _embedder(int(payload.get("dimensions") or config.embedding_dimensions))(texts)
+    as_base64 = payload.get("encoding_format") == "base64"
+    data = []
+    for index, vector in enumerate(vectors):
+        values = [float(value) for value in vector]
+        embedding = base64.b64encode(struct.pack(f"<{len(values)}f", *values)).decode("ascii") if as_base64 else values
+        data.append({"object": "embedding", "index": index, "embedding": embedding})
+    tokens = sum(estimate_tokens(text) for text in texts)
+    return {
+        "object": "list",
+        "data": data,
+        "model": payload.get("model", "stub"),
+        "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+    }
+
+
+def _search(payload: dict) -> dict:
+    """Answer a Tavily search request with synthetic standard excerpts."""
+    query = str(payload.get("query", ""))
+    count = int(payload.get("max_results") or 5)
+    slug = hashlib.sha256(query.encode("utf-8")).hexdigest()[:12]
+    results = [
+        {
+            "title": f"{query} - 参考资料 {rank + 1}",
+            "url": f"https://stub.local/{slug}/{rank}",
+            "content": f"关于{query}的说明（第 {rank + 1} 条）：相关条文规定了{query}的技术要求与适用范围。",
+            "score": round(1.0 - rank / (count + 1), 3),
+            "raw_content": None,
+        }
+        for rank in range(count)
+    ]
+    return {"query": query, "answer": None, "images": [], "results": results, "response_time": 0.0}
+
+
+def start_stub_server(config: Optional[StubConfig] = None, host: str = "127.0.0.1", port: int = 0) -> StubServer:
+    """Start the stand-in server on a background thread.
+
+    Args:
+        config: Stub behaviour.
+        host: Interface to bind.
+        port: Port to bind (0 picks a free port).
+
+    Returns:
+        StubServer: Running server; call ``shutdown()`` and ``server_close()`` to stop it.
+    """
+    server = StubServer((host, port), config)
+    threading.Thread(target=server.serve_forever, name="stub-server", daemon=True).start()
+    return server
+
+
+def main() -> None:
+    """CLI entry for the stand-in server."""
+    parser = argparse.ArgumentParser(description="OpenAI/Tavily-compatible stand-in server")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8900, help="Port to bind")
+    for name in ENDPOINTS:
+        parser.add_argument(f"--{name}-latency", default="0", help=f"{name} latency spec, e.g. lognormal:0.8,0.4")
+        parser.add_argument(f"--{name}-error-rate", type=float, default=None, help=f"{name} failure probability")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Failure probability of every endpoint")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status of injected failures")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of latencies and failures")
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency={name: LatencyProfile.parse(getattr(args, f"{name}_latency")) for name in ENDPOINTS},
+        error_rate={
+            name: args.error_rate if getattr(args, f"{name}_error_rate") is None else getattr(args, f"{name}_error_rate")
+            for name in ENDPOINTS
+        },
+        error_status=args.error_status,
+        seed=args.seed,
+    )
+    server = StubServer((args.host, args.port), config)
+    print(f"Stub server listening on {server.base_url} (OPENAI_BASE_URL={server.base_url}/v1)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,57 @@
 """Build and compile the CRAG LangGraph workflow."""
 from __future__ import annotations
 
+import time
+from typing import Callable, Dict, Optional
+
 from langgraph.graph import END, StateGraph
 
+from ..components.vector_store import VectorStore
+from ..utils.metrics import METRICS
 from .nodes import CRAGNodes
 from .state import AgentState
 
 
-def build_crag_graph() -> object:
+def timed_node(name: str, node: Callable[[AgentState], Dict[str, object]]) -> Callable[[AgentState], Dict[str, object]]:
+    """Wrap a node so its wall time is reported in ``node_timings``.
+
+    The time is also observed as ``node.<name>`` in the process metrics.
+
+    Args:
+        name: Node name.
+        node: Node function returning a state update.
+
+    Returns:
+        Callable[[AgentState], Dict[str, object]]: Timed node.
+    """
+
+    def run(state: AgentState) -> Dict[str, object]:
+        started = time.perf_counter()
+        update = node(state)
+        elapsed = time.perf_counter() - started
+        METRICS.observe(f"node.{name}", elapsed)
+        return {**update, "node_timings": {name: elapsed}}
+
+    return run
+
+
+def build_crag_graph(vector_store: Optional[VectorStore] = None) -> object:
     """Build and compile the CRAG graph.
 
+    Args:
+        vector_store: Store the retrieve node searches (a new one when omitted).
+
     Returns:
         object: Compiled graph application.
     """
-    nodes = CRAGNodes()
+    nodes = CRAGNodes(vector_store)
     workflow = StateGraph(AgentState)
 
-    workflow.add_node("retrieve", nodes.retrieve)
-    workflow.add_node("evaluate", nodes.evaluate)
-    workflow.add_node("knowledge_refinement", nodes.refine_knowledge)
-    workflow.add_node("web_search", nodes.web_search)
-    workflow.add_node("generate", nodes.generate)
+    workflow.add_node("retrieve", timed_node("retrieve", nodes.retrieve))
+    workflow.add_node("evaluate", timed_node("evaluate", nodes.evaluate))
+    workflow.add_node("knowledge_refinement", timed_node("knowledge_refinement", nodes.refine_knowledge))
+    workflow.add_node("web_search", timed_node("web_search", nodes.web_search))
+    workflow.add_node("generate", timed_node("generate", nodes.generate))
 
     workflow.set_entry_point("retrieve")
     workflow.add_edge("retrieve", "evaluate")
@@ -1,16 +1,21 @@
 """CRAG graph node implementations (skeleton)."""
 from __future__ import annotations
 
-from typing import Dict, List
+import os
+import threading
+from typing import Dict, Optional
 
+from ..components.context import ContextItem, ContextPacker, get_token_counter
 from ..components.evaluator import RetrievalEvaluator, determine_crag_action
 from ..components.generator import AnswerGenerator
+from ..components.keywords import KeywordExtractor
 from ..components.refiner import KnowledgeRefiner
 from ..components.rewriter import QueryRewriter
-from ..components.search import WebSearcher
+from ..components.search import WebSearcher, split_queries
 from ..components.vector_store import VectorStore
 from ..config import load_settings
 from ..utils.logging_utils import setup_logging
+from ..utils.search_cache import SearchCache
 from .state import AgentState
 
 
@@ -20,16 +25,80 @@ class CRAGNodes:
     Each node is a pure-ish function that takes state and returns a partial update.
     """
 
-    def __init__(self) -> None:
-        """Initialize CRAG nodes with logger and settings."""
+    def __init__(self, vector_store: Optional[VectorStore] = None) -> None:
+        """Initialize CRAG nodes with logger and settings.
+
+        Args:
+            vector_store: Store to retrieve from; pass the one the caller
+                ingests into so both share its in-memory indexes (a new
+                store is opened when omitted).
+        """
         self._logger = setup_logging(name="rail-crag")
         self._settings = load_settings(require_keys=False)
-        self._vector_store = VectorStore(self._settings, logger=self._logger)
+        self._vector_store = vector_store or VectorStore(self._settings, logger=self._logger)
         self._evaluator = RetrievalEvaluator(self._settings, logger=self._logger)
         self._refiner = KnowledgeRefiner(self._evaluator)
-        self._searcher = WebSearcher(self._settings.tavily_api_key, logger=self._logger)
-        self._rewriter = QueryRewriter(self._settings, logger=self._logger)
+        search_cache = None
+        if self._settings.search_cache_ttl > 0:
+            # Created after VectorStore, which ensures the persist directory exists.
+            search_cache = SearchCache(
+                os.path.join(self._settings.chroma_persist_dir, "search_cache.sqlite3"),
+                ttl=self._settings.search_cache_ttl,
+                stale_ttl=self._settings.search_cache_stale_ttl,
+            )
+        self._searcher = WebSearcher(
+            self._settings.tavily_api_key,
+            logger=self._logger,
+            base_url=self._settings.tavily_base_url or None,
+            cache=search_cache,
+        )
+        # Built on the first web search: its keyword statistics read the collection.
+        self._rewriter: Optional[QueryRewriter] = None
+        self._rewriter_lock = threading.Lock()
         self._generator = AnswerGenerator(self._settings, logger=self._logger)
+        self._packer = ContextPacker(
+            self._settings.context_max_tokens, token_counter=get_token_counter(self._settings.gen_model)
+        )
+
+    def _get_rewriter(self) -> QueryRewriter:
+        """Return the query rewriter, creating it on first use.
+
+        Returns:
+            QueryRewriter: Rewriter with the keyword extractor fast path.
+        """
+        with self._rewriter_lock:
+            if self._rewriter is None:
+                keywords = self._load_keywords() if self._settings.rewrite_fast_path else None
+                self._rewriter = QueryRewriter(self._settings, logger=self._logger, keywords=keywords)
+            return self._rewriter
+
+    def _load_keywords(self) -> KeywordExtractor:
+        """Load corpus statistics for the keyword extractor, recounting them if the collection changed.
+
+        The count samples at most ``settings.keyword_stats_max_docs`` chunks,
+        so it stays bounded however large the collection grows.
+
+        Returns:
+            KeywordExtractor: Extractor with document frequencies of the indexed chunks.
+        """
+        path = os.path.join(
+            self._settings.chroma_persist_dir, f"{self._settings.collection_name}_keywords.json"
+        )
+        count = self._vector_store.count()
+        if os.path.exists(path):
+            try:
+                extractor = KeywordExtractor.load(path)
+                if extractor.corpus_size == count:
+                    return extractor
+            except Exception as exc:
+                self._logger.warning("Ignoring unreadable keyword statistics %s: %s", path, exc)
+        extractor = KeywordExtractor().fit(
+            self._vector_store.iter_documents(max_documents=self._settings.keyword_stats_max_docs)
+        )
+        extractor.corpus_size = count
+        extractor.save(path)
+        self._logger.info("Counted keyword statistics over %d of %d chunks", extractor.documents, count)
+        return extractor
 
     def retrieve(self, state: AgentState) -> Dict[str, object]:
         """Retrieve documents for the query.
@@ -78,15 +147,22 @@ class CRAGNodes:
             Dict[str, object]: Partial state updates.
         """
         self._logger.info("[Node] refine_knowledge")
-        refined: List[str] = []
-        for doc in state.get("retrieved_documents", []):
-            content = doc.get("content", "")
-            if not content:
-                continue
-            refined_text = self._refiner.refine(state["question"], content)
-            if refined_text:
-                refined.append(refined_text)
-        return {"knowledge_strips": refined}
+        scores = state.get("evaluation_scores", {})
+        documents = [
+            (index, doc) for index, doc in enumerate(state.get("retrieved_documents", [])) if doc.get("content")
+        ]
+        refined = self._refiner.refine_many(state["question"], [doc["content"] for _, doc in documents])
+        items = [
+            ContextItem(
+                content=text,
+                score=scores.get(str(index), 0.0),
+                source=(doc.get("metadata") or {}).get("source", ""),
+                path=(doc.get("metadata") or {}).get("path", ""),
+            )
+            for (index, doc), text in zip(documents, refined)
+            if text
+        ]
+        return {"knowledge_strips": [item.content for item in items], "knowledge_items": items}
 
     def web_search(self, state: AgentState) -> Dict[str, object]:
         """Perform web search to supplement knowledge.
@@ -98,9 +174,28 @@ class CRAGNodes:
             Dict[str, object]: Partial state updates.
         """
         self._logger.info("[Node] web_search")
-        rewritten = self._rewriter.rewrite(state["question"])
-        results = self._searcher.search(rewritten, top_k=self._settings.search_k)
-        return {"search_results": results}
+        rewritten = self._get_rewriter().rewrite(state["question"])
+        queries = split_queries(rewritten) or [state["question"]]
+        results = self._searcher.search_many(queries, top_k=self._settings.search_k)
+        # Rerank the merged pool against all keywords, then cut to search_k;
+        # the sort is stable, so ties keep the interleaved search rank.
+        scores = self._evaluator.lexical_scores(" ".join(queries), [result["content"] for result in results])
+        order = sorted(range(len(results)), key=lambda i: scores[i].score, reverse=True)
+        top = order[: self._settings.search_k]
+        # Web snippets go through the same decompose-filter-recompose step as
+        # internal documents, capped per result so one long page cannot dominate.
+        refined = self._refiner.refine_many(
+            state["question"],
+            [results[i]["content"] for i in top],
+            max_tokens=self._settings.web_result_max_tokens,
+            cjk_sentences=True,
+        )
+        items = [
+            ContextItem(content=text, score=scores[i].score, source=results[i]["url"], path=results[i]["title"])
+            for i, text in zip(top, refined)
+            if text
+        ]
+        return {"search_results": [item.content for item in items], "search_items": items}
 
     def generate(self, state: AgentState) -> Dict[str, object]:
         """Generate final response based on context.
@@ -112,6 +207,23 @@ class CRAGNodes:
             Dict[str, object]: Partial state updates.
         """
         self._logger.info("[Node] generate")
-        context = "\n".join(state.get("knowledge_strips", []) + state.get("search_results", []))
-        answer = self._generator.generate(state["question"], context)
-        return {"final_context": context, "final_answer": answer}
+        items = list(state.get("knowledge_items", [])) + list(state.get("search_items", []))
+        packed = self._packer.pack(items)
+        self._logger.info(
+            "Packed %d/%d context items: %d tokens used, %d dropped (%d duplicates)",
+            len(packed.items),
+            len(items),
+            packed.tokens_used,
+            packed.tokens_dropped,
+            packed.duplicates,
+        )
+        answer = self._generator.generate(state["question"], packed.text)
+        return {
+            "final_context": packed.text,
+            "final_answer": answer,
+            "context_tokens": {
+                "used": packed.tokens_used,
+                "dropped": packed.tokens_dropped,
+                "budget": self._settings.context_max_tokens,
+            },
+        }
@@ -1,7 +1,25 @@
 """LangGraph state definitions."""
 from __future__ import annotations
 
-from typing import List, TypedDict
+from typing import Annotated, Dict, List, TypedDict
+
+from ..components.context import ContextItem
+
+
+def merge_timings(current: Dict[str, float], update: Dict[str, float]) -> Dict[str, float]:
+    """Merge per-node timings reported by successive nodes.
+
+    Args:
+        current: Timings recorded so far.
+        update: Timings reported by a node.
+
+    Returns:
+        Dict[str, float]: Combined timings (a re-run node accumulates).
+    """
+    merged = dict(current or {})
+    for name, seconds in (update or {}).items():
+        merged[name] = merged.get(name, 0.0) + seconds
+    return merged
 
 
 class AgentState(TypedDict):
@@ -13,9 +31,13 @@ class AgentState(TypedDict):
         evaluation_scores: Relevance scores per document id.
         confidence: CRAG decision (correct/incorrect/ambiguous).
         knowledge_strips: Refined strips.
+        knowledge_items: Refined strips with score, source and path.
         search_results: Web search results.
+        search_items: Refined web results with score, URL and title.
         final_context: Final blended context.
+        context_tokens: Tokens used and dropped when packing the context.
         final_answer: Final LLM response.
+        node_timings: Wall time in seconds spent in each node.
     """
 
     question: str
@@ -23,6 +45,10 @@ class AgentState(TypedDict):
     evaluation_scores: dict
     confidence: str
     knowledge_strips: List[str]
+    knowledge_items: List[ContextItem]
     search_results: List[str]
+    search_items: List[ContextItem]
     final_context: str
+    context_tokens: dict
     final_answer: str
+    node_timings: Annotated[Dict[str, float], merge_timings]
@@ -0,0 +1,125 @@
+"""Incremental NDJSON bulk ingestion."""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional
+
+from ..components.vector_store import VectorStore
+from .mineru_parser import MarkdownHierarchySplitter
+
+
+class BulkIngestor:
+    """Ingest ``{source_name, markdown_content}`` NDJSON records as bytes arrive.
+
+    ``feed`` accepts arbitrary byte blocks (e.g. HTTP body chunks); each
+    complete line is parsed and upserted before the next one is read, so only
+    the current record is held in memory. Bad records are reported by line
+    number and do not stop the stream.
+
+    Args:
+        store: Vector store to ingest into.
+        splitter_kwargs: MarkdownHierarchySplitter keyword arguments.
+        batch_size: Chunks per upsert.
+        source_lock: Optional function returning a lock per source name.
+        logger: Optional logger.
+    """
+
+    def __init__(
+        self,
+        store: VectorStore,
+        splitter_kwargs: Optional[Dict[str, int]] = None,
+        batch_size: int = 128,
+        source_lock: Optional[Callable[[str], threading.Lock]] = None,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        """Initialize the ingestor.
+
+        Args:
+            store: Vector store to ingest into.
+            splitter_kwargs: MarkdownHierarchySplitter keyword arguments.
+            batch_size: Chunks per upsert.
+            source_lock: Optional function returning a lock per source name.
+            logger: Optional logger.
+        """
+        self._store = store
+        self._splitter = MarkdownHierarchySplitter(**(splitter_kwargs or {}))
+        self._batch_size = batch_size
+        self._source_lock = source_lock
+        self._logger = logger or logging.getLogger(__name__)
+        self._buffer = bytearray()
+        self._line = 0
+        self.records = 0
+        self.sources: Dict[str, int] = {}
+        self.errors: List[Dict[str, Any]] = []
+
+    def feed(self, block: bytes) -> None:
+        """Consume a block of the NDJSON body.
+
+        Args:
+            block: Raw bytes (may split lines anywhere).
+        """
+        # Only the unscanned tail is searched, so a large record arriving in
+        # many small blocks is not rescanned from its start on every block.
+        scan = len(self._buffer)
+        self._buffer.extend(block)
+        start = 0
+        while True:
+            end = self._buffer.find(b"\n", max(start, scan))
+            if end < 0:
+                break
+            self._ingest_line(bytes(self._buffer[start:end]))
+            start = end + 1
+        del self._buffer[:start]
+
+    def close(self) -> Dict[str, Any]:
+        """Flush a trailing record without newline and summarize the run.
+
+        Returns:
+            Dict[str, Any]: Records, total and per-source chunk counts, and errors.
+        """
+        if self._buffer:
+            self._ingest_line(bytes(self._buffer))
+            self._buffer.clear()
+        return {
+            "status": "partial" if self.errors else "success",
+            "records": self.records,
+            "chunks_added": sum(self.sources.values()),
+            "sources": self.sources,
+            "errors": self.errors,
+        }
+
+    def _ingest_line(self, line: bytes) -> None:
+        """Parse and upsert one NDJSON line.
+
+        Args:
+            line: Raw line without the newline.
+        """
+        self._line += 1
+        if not line.strip():
+            return
+        try:
+            record = json.loads(line)
+            source_name = record["source_name"]
+            markdown = record["markdown_content"]
+            if not isinstance(source_name, str) or not isinstance(markdown, str):
+                raise ValueError("source_name and markdown_content must be strings")
+        except Exception as exc:
+            self.errors.append({"line": self._line, "error": f"invalid record: {exc}"})
+            return
+        self.records += 1
+        try:
+            with self._source_lock(source_name) if self._source_lock else nullcontext():
+                count = self._store.add_chunks(
+                    self._splitter.iter_chunks(markdown),
+                    source_name=source_name,
+                    batch_size=self._batch_size,
+                    strict=True,
+                )
+        except Exception as exc:
+            self._logger.exception("Bulk ingest of %s failed: %s", source_name, exc)
+            self.errors.append({"line": self._line, "source_name": source_name, "error": str(exc)})
+            return
+        self.sources[source_name] = self.sources.get(source_name, 0) + count
@@ -0,0 +1,207 @@
+"""Near-duplicate chunk detection with MinHash and LSH banding.
+
+Railway standards repeat boilerplate (scope statements, normative references,
+definitions) across documents. The index below keeps one MinHash signature per
+canonical chunk in SQLite and buckets it by LSH bands, so each new chunk is
+compared only against the few canonical chunks sharing a band.
+"""
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from ..utils.hashing import hash_char_ngrams
+
+ALTERNATE_SEPARATOR = "; "
+
+
+class NearDuplicateIndex:
+    """Persistent MinHash LSH index of canonical chunks.
+
+    Args:
+        path: SQLite file path (``":memory:"`` for a throwaway index).
+        num_perm: Number of MinHash permutations.
+        bands: Number of LSH bands (``num_perm`` must be divisible by it).
+        shingle_size: Character shingle size.
+        threshold: Minimum estimated Jaccard similarity for a duplicate.
+        seed: Seed for the permutation coefficients.
+        logger: Optional logger.
+    """
+
+    _BLOCK = 4096
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 5,
+        threshold: float = 0.85,
+        seed: int = 1,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        """Initialize the index.
+
+        Args:
+            path: SQLite file path.
+            num_perm: Number of MinHash permutations.
+            bands: Number of LSH bands.
+            shingle_size: Character shingle size.
+            threshold: Minimum estimated Jaccard similarity.
+            seed: Permutation seed.
+            logger: Optional logger.
+
+        Raises:
+            ValueError: If ``num_perm`` is not divisible by ``bands``.
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self._logger = logger or logging.getLogger(__name__)
+        self._bands = bands
+        self._rows = num_perm // bands
+        self._shingle_size = shingle_size
+        self._threshold = threshold
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: odd multipliers, keep the high 32 bits.
+        self._mult = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._add = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS minhash_signatures (
+                chunk_id TEXT PRIMARY KEY,
+                signature BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS minhash_bands (
+                band INTEGER NOT NULL,
+                bucket BLOB NOT NULL,
+                chunk_id TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS minhash_bands_lookup ON minhash_bands (band, bucket);
+            CREATE INDEX IF NOT EXISTS minhash_bands_chunk ON minhash_bands (chunk_id);
+            """
+        )
+
+    def signature(self, text: str) -> np.ndarray:
+        """Compute the MinHash signature of a text.
+
+        Args:
+            text: Chunk text.
+
+        Returns:
+            np.ndarray: uint32 signature of length ``num_perm``.
+        """
+        normalized = " ".join(text.lower().split())
+        codes = np.frombuffer(normalized.encode("utf-32-le"), dtype=np.uint32)
+        shingles = hash_char_ngrams(codes, min(self._shingle_size, max(1, codes.shape[0])))
+        signature = np.full(self._mult.shape[0], np.iinfo(np.uint32).max, dtype=np.uint64)
+        for start in range(0, shingles.shape[0], self._BLOCK):
+            block = shingles[start : start + self._BLOCK]
+            permuted = (self._mult[:, None] * block[None, :] + self._add[:, None]) >> np.uint64(32)
+            signature = np.minimum(signature, permuted.min(axis=1))
+        return signature.astype(np.uint32)
+
+    def find_duplicate(self, signature: np.ndarray) -> Optional[str]:
+        """Return the canonical chunk id a signature duplicates, if any.
+
+        Args:
+            signature: MinHash signature.
+
+        Returns:
+            Optional[str]: Canonical chunk id, or None.
+        """
+        buckets = self._band_buckets(signature)
+        with self._lock:
+            candidates: List[str] = []
+            for band, bucket in enumerate(buckets):
+                rows = self._conn.execute(
+                    "SELECT chunk_id FROM minhash_bands WHERE band = ? AND bucket = ?", (band, bucket)
+                ).fetchall()
+                candidates.extend(row[0] for row in rows)
+            best_id: Optional[str] = None
+            best_score = self._threshold
+            for chunk_id in dict.fromkeys(candidates):
+                row = self._conn.execute(
+                    "SELECT signature FROM minhash_signatures WHERE chunk_id = ?", (chunk_id,)
+                ).fetchone()
+                if row is None:
+                    continue
+                score = float(np.mean(np.frombuffer(row[0], dtype=np.uint32) == signature))
+                if score >= best_score:
+                    best_id, best_score = chunk_id, score
+        return best_id
+
+    def add(self, chunk_id: str, signature: np.ndarray) -> None:
+        """Register a canonical chunk.
+
+        Args:
+            chunk_id: Chunk id.
+            signature: MinHash signature.
+        """
+        self.add_many([(chunk_id, signature)])
+
+    def add_many(self, entries: Iterable[tuple[str, np.ndarray]]) -> None:
+        """Register several canonical chunks in one transaction.
+
+        Args:
+            entries: (chunk_id, signature) pairs.
+        """
+        with self._lock, self._conn:
+            for chunk_id, signature in entries:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO minhash_signatures (chunk_id, signature) VALUES (?, ?)",
+                    (chunk_id, signature.astype(np.uint32).tobytes()),
+                )
+                self._conn.execute("DELETE FROM minhash_bands WHERE chunk_id = ?", (chunk_id,))
+                self._conn.executemany(
+                    "INSERT INTO minhash_bands (band, bucket, chunk_id) VALUES (?, ?, ?)",
+                    [(band, bucket, chunk_id) for band, bucket in enumerate(self._band_buckets(signature))],
+                )
+
+    def remove(self, chunk_ids: Iterable[str]) -> None:
+        """Forget canonical chunks (e.g. after they are deleted from the store).
+
+        Args:
+            chunk_ids: Chunk ids to remove.
+        """
+        ids = [(chunk_id,) for chunk_id in chunk_ids]
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM minhash_signatures WHERE chunk_id = ?", ids)
+            self._conn.executemany("DELETE FROM minhash_bands WHERE chunk_id = ?", ids)
+
+    def _band_buckets(self, signature: np.ndarray) -> List[bytes]:
+        """Split a signature into per-band bucket keys.
+
+        Args:
+            signature: MinHash signature.
+
+        Returns:
+            List[bytes]: One bucket key per band.
+        """
+        rows = signature.astype(np.uint32).reshape(self._bands, self._rows)
+        return [row.tobytes() for row in rows]
+
+
+def merge_alternate_sources(existing: str, sources: Iterable[str], canonical_source: str) -> str:
+    """Merge sources into an ``alternate_sources`` metadata value.
+
+    Args:
+        existing: Current ``alternate_sources`` value (may be empty).
+        sources: Sources of collapsed duplicates.
+        canonical_source: Source of the canonical chunk (never listed).
+
+    Returns:
+        str: ``ALTERNATE_SEPARATOR``-joined, de-duplicated source names.
+    """
+    merged = [s for s in existing.split(ALTERNATE_SEPARATOR) if s] if existing else []
+    for source in sources:
+        if source and source != canonical_source and source not in merged:
+            merged.append(source)
+    return ALTERNATE_SEPARATOR.join(merged)
@@ -3,15 +3,19 @@ from __future__ import annotations
 
 import glob
 import logging
+import multiprocessing
 import os
-import uuid
-from dataclasses import dataclass
-from typing import List
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Dict, List, Optional, Tuple
 
+from ..components.vector_store import VectorStore
 from ..config import load_settings
-from ..utils.chroma_store import ChromaConfig, get_collection, upsert_texts
+from ..utils.chroma_store import iter_batches
 from ..utils.logging_utils import setup_logging
-from .mineru_parser import MarkdownHierarchySplitter, Chunk
+from .manifest import IngestManifest, ManifestEntry, file_digest
+from .mineru_parser import MarkdownHierarchySplitter, assign_chunk_ids
 
 
 @dataclass(frozen=True)
@@ -22,81 +26,320 @@ class IngestConfig:
         input_glob: Glob pattern for MinerU markdown files.
         collection_name: Chroma collection name.
         batch_size: Upsert batch size.
+        workers: Processes that read and split files (1 ingests serially).
+        force: Re-upsert every chunk of every file, even unchanged ones. Chunks
+            a file no longer produces are still deleted.
     """
 
     input_glob: str
     collection_name: str = "rail_crag"
     batch_size: int = 128
+    workers: int = 1
+    force: bool = False
 
 
-def _read_markdown(path: str, logger: logging.Logger) -> str:
-    """Read a markdown file with error handling.
+@dataclass
+class IngestReport:
+    """Outcome of an ingestion run.
 
     Args:
-        path: File path.
-        logger: Logger instance.
+        files: Number of files attempted.
+        chunks: Number of chunks upserted.
+        skipped: Files skipped because they are unchanged since the last run.
+        deleted: Chunks deleted because they left a changed or removed file.
+        failures: File path -> error message for files that failed.
+    """
 
-    Returns:
-        str: File contents.
+    files: int = 0
+    chunks: int = 0
+    skipped: int = 0
+    deleted: int = 0
+    failures: Dict[str, str] = field(default_factory=dict)
+
+
+def _sync_worker(
+    path: str,
+    previous: Optional[Dict[str, Any]],
+    splitter_kwargs: Dict[str, int],
+    batch_size: int,
+    queue: Any,
+    force: bool = False,
+) -> None:
+    """Diff one file against its manifest entry and queue the changes.
+
+    Runs in a worker process (or inline when ingesting serially). Posts, in order:
+
+    - ``("unchanged", path, entry)`` if the content hash matches ``previous``
+      (never with ``force``); or
+    - ``("stale", path, chunk_ids)`` for chunks that are no longer produced,
+      ``("chunks", path, batch)`` for chunks not ingested before (all chunks
+      with ``force``), and
+      ``("done", path, entry)`` with the new manifest entry;
+    - ``("error", path, message)`` if the file cannot be read or parsed.
+
+    The file is split twice: once to collect the new chunk ids, so stale
+    chunks are deleted before new ones are deduplicated against them, and
+    once to stream the new chunks.
+
+    Args:
+        path: Markdown file path.
+        previous: Previous ``ManifestEntry`` as a dict (None for new files).
+        splitter_kwargs: MarkdownHierarchySplitter keyword arguments.
+        batch_size: Chunks per queued batch.
+        queue: Queue shared with the writer.
+        force: Re-upsert chunks that ``previous`` already lists.
     """
+    splitter = MarkdownHierarchySplitter(**splitter_kwargs)
+    source_name = os.path.basename(path)
     try:
+        stat = os.stat(path)
+        digest = file_digest(path)
+        if previous is not None and previous["sha256"] == digest and not force:
+            entry = ManifestEntry(stat.st_size, stat.st_mtime_ns, digest, previous["chunk_ids"])
+            queue.put(("unchanged", path, entry))
+            return
         with open(path, "r", encoding="utf-8") as handle:
-            return handle.read()
+            chunk_ids = [chunk.chunk_id for chunk in assign_chunk_ids(splitter.iter_chunks(handle), source_name)]
+        known = set(previous["chunk_ids"]) if previous is not None else set()
+        stale = known.difference(chunk_ids)
+        if stale:
+            queue.put(("stale", path, sorted(stale)))
+        with open(path, "r", encoding="utf-8") as handle:
+            fresh = (
+                chunk
+                for chunk in assign_chunk_ids(splitter.iter_chunks(handle), source_name)
+                if force or chunk.chunk_id not in known
+            )
+            for batch in iter_batches(fresh, batch_size):
+                queue.put(("chunks", path, batch))
     except Exception as exc:
-        logger.exception("Failed to read %s: %s", path, exc)
-        raise
+        queue.put(("error", path, f"{type(exc).__name__}: {exc}"))
+        return
+    queue.put(("done", path, ManifestEntry(stat.st_size, stat.st_mtime_ns, digest, chunk_ids)))
 
 
-def _chunks_to_docs(chunks: List[Chunk], source: str) -> tuple[list[str], list[dict], list[str]]:
-    """Convert chunks to Chroma documents.
+class _IngestWriter:
+    """Apply worker messages to the store and manifest (the only writer).
 
-    Args:
-        chunks: Parsed chunks.
-        source: Source filename.
+    Exposes ``put`` so the serial path can hand it to ``_sync_worker`` in place
+    of a queue. The manifest is saved every ``save_every`` finished files and
+    on ``flush``; a crash in between only re-checks those files next run.
 
-    Returns:
-        tuple: (documents, metadatas, ids)
+    Args:
+        store: Vector store.
+        manifest: Ingest manifest.
+        report: Report updated with counts and failures.
+        logger: Logger instance.
+        save_every: Finished files between manifest saves.
     """
-    documents: List[str] = []
-    metadatas: List[dict] = []
-    ids: List[str] = []
 
-    for chunk in chunks:
-        documents.append(chunk.content)
-        metadata = dict(chunk.metadata)
-        metadata["source"] = source
-        metadatas.append(metadata)
-        ids.append(str(uuid.uuid4()))
+    def __init__(
+        self,
+        store: VectorStore,
+        manifest: IngestManifest,
+        report: IngestReport,
+        logger: logging.Logger,
+        save_every: int = 100,
+    ) -> None:
+        """Initialize the writer.
+
+        Args:
+            store: Vector store.
+            manifest: Ingest manifest.
+            report: Report to fill in.
+            logger: Logger instance.
+            save_every: Finished files between manifest saves.
+        """
+        self._store = store
+        self._manifest = manifest
+        self._report = report
+        self._logger = logger
+        self._save_every = max(1, save_every)
+        self._unsaved = 0
+
+    def put(self, message: Tuple[str, str, Any]) -> None:
+        """Handle one worker message.
+
+        Args:
+            message: (kind, path, payload) tuple.
+        """
+        kind, path, payload = message
+        try:
+            if kind == "chunks":
+                source_name = os.path.basename(path)
+                self._report.chunks += self._store.add_chunks(
+                    payload, source_name=source_name, batch_size=len(payload), strict=True
+                )
+            elif kind == "stale":
+                # Stale ids that were collapsed into other files' chunks release those chunks too.
+                self._report.deleted += self._store.delete_chunks(payload)
+            elif kind == "unchanged":
+                self._report.skipped += 1
+                self._record(path, payload)
+            elif kind == "done":
+                # A file whose upsert failed keeps its old entry and is retried next run.
+                if path not in self._report.failures:
+                    self._record(path, payload)
+                    self._logger.info("Finished %s", path)
+            elif kind == "error":
+                self._report.failures[path] = payload
+                self._logger.error("Failed to ingest %s: %s", path, payload)
+        except Exception as exc:
+            # Keep draining: a dead writer would block the workers on a full queue.
+            self._logger.exception("Failed to apply %s from %s: %s", kind, path, exc)
+            self._report.failures[path] = f"{type(exc).__name__}: {exc}"
+
+    def flush(self) -> None:
+        """Save the manifest if entries changed since the last save."""
+        if self._unsaved:
+            self._manifest.save()
+            self._unsaved = 0
 
-    return documents, metadatas, ids
+    def _record(self, path: str, entry: ManifestEntry) -> None:
+        """Put a file's manifest entry, saving every ``save_every`` files.
 
+        Args:
+            path: File path.
+            entry: New manifest entry.
+        """
+        self._manifest.put(path, entry)
+        self._unsaved += 1
+        if self._unsaved >= self._save_every:
+            self.flush()
 
-def ingest_markdown(config: IngestConfig) -> None:
+    def drain(self, queue: Any) -> None:
+        """Apply messages from a queue until a ``None`` sentinel.
+
+        Args:
+            queue: Manager queue fed by the workers.
+        """
+        while True:
+            message = queue.get()
+            if message is None:
+                return
+            self.put(message)
+
+
+def _ingest_parallel(
+    jobs: List[Tuple[str, Optional[Dict[str, Any]]]],
+    splitter_kwargs: Dict[str, int],
+    writer: _IngestWriter,
+    config: IngestConfig,
+) -> None:
+    """Split files in a process pool while a single thread embeds and upserts.
+
+    Args:
+        jobs: (file path, previous manifest entry) pairs.
+        splitter_kwargs: MarkdownHierarchySplitter keyword arguments.
+        writer: Writer applying the queued messages.
+        config: Ingestion configuration.
+    """
+    # Spawn rather than fork: the parent already runs Chroma's background threads.
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager:
+        # Bounded so fast splitters cannot run far ahead of the embedding writer.
+        queue = manager.Queue(maxsize=config.workers * 4)
+        thread = threading.Thread(target=writer.drain, args=(queue,), name="ingest-writer", daemon=True)
+        thread.start()
+        try:
+            with ProcessPoolExecutor(max_workers=config.workers, mp_context=context) as pool:
+                futures = {
+                    pool.submit(
+                        _sync_worker, path, previous, splitter_kwargs, config.batch_size, queue, config.force
+                    ): path
+                    for path, previous in jobs
+                }
+                for future in as_completed(futures):
+                    exc = future.exception()
+                    if exc is not None:
+                        queue.put(("error", futures[future], f"{type(exc).__name__}: {exc}"))
+        finally:
+            queue.put(None)
+            thread.join()
+
+
+def ingest_markdown(config: IngestConfig) -> IngestReport:
     """Ingest MinerU markdown files into ChromaDB.
 
+    A manifest next to the Chroma data records each file's size, mtime,
+    content hash and chunk ids. Files whose size and mtime (or, failing that,
+    content hash) are unchanged are skipped; changed files only embed chunks
+    that are new and delete chunks that disappeared; chunks of files that no
+    longer exist are deleted.
+
+    With ``config.workers > 1`` files are read and split in a process pool and
+    a single writer thread batches the embedding calls and Chroma upserts.
+    A failing file is recorded in the report and does not abort the run.
+
     Args:
         config: Ingestion configuration.
+
+    Returns:
+        IngestReport: Files attempted, chunks upserted/deleted and per-file failures.
     """
     logger = setup_logging(name="rail-crag.ingest")
-    settings = load_settings()
+    settings = replace(load_settings(), collection_name=config.collection_name)
 
-    splitter = MarkdownHierarchySplitter()
-    collection = get_collection(
-        ChromaConfig(persist_dir=settings.chroma_persist_dir, collection_name=config.collection_name),
-        logger=logger,
+    splitter_kwargs = {
+        "max_tokens": settings.chunk_max_tokens,
+        "min_tokens": settings.chunk_min_tokens,
+        "overlap_tokens": settings.chunk_overlap_tokens,
+    }
+    store = VectorStore(settings, logger=logger)
+    manifest = IngestManifest(
+        os.path.join(settings.chroma_persist_dir, f"{config.collection_name}_manifest.json"), logger=logger
     )
+    report = IngestReport()
+    writer = _IngestWriter(store, manifest, report, logger)
+
+    removed = 0
+    for path in manifest.paths:
+        if not os.path.exists(path):
+            logger.info("Removing chunks of deleted file %s", path)
+            # By source, so chunks handed over to it and its alternate entries go as well.
+            report.deleted += store.delete_source(os.path.basename(path))
+            manifest.remove(path)
+            removed += 1
+    if removed:
+        manifest.save()
 
     files = glob.glob(config.input_glob, recursive=True)
     if not files:
         logger.warning("No markdown files matched: %s", config.input_glob)
-        return
+        return report
+    report.files = len(files)
 
+    jobs: List[Tuple[str, Optional[Dict[str, Any]]]] = []
     for path in files:
-        logger.info("Ingesting %s", path)
-        markdown = _read_markdown(path, logger)
-        chunks = splitter.parse(markdown)
-        documents, metadatas, ids = _chunks_to_docs(chunks, os.path.basename(path))
-        upsert_texts(collection, documents, metadatas, ids, logger=logger)
+        # Force still passes the old entry so chunks the file no longer produces are deleted.
+        entry = manifest.get(path)
+        if entry is not None and not config.force:
+            stat = os.stat(path)
+            if (stat.st_size, stat.st_mtime_ns) == (entry.size, entry.mtime_ns):
+                report.skipped += 1
+                continue
+        jobs.append((path, asdict(entry) if entry is not None else None))
+
+    try:
+        if config.workers > 1 and len(jobs) > 1:
+            logger.info("Ingesting %d files with %d workers", len(jobs), config.workers)
+            _ingest_parallel(jobs, splitter_kwargs, writer, config)
+        else:
+            for path, previous in jobs:
+                logger.info("Ingesting %s", path)
+                _sync_worker(path, previous, splitter_kwargs, config.batch_size, writer, config.force)
+    finally:
+        writer.flush()
+
+    logger.info(
+        "Ingested %d chunks from %d files (%d unchanged, %d chunks deleted, %d failed)",
+        report.chunks,
+        report.files,
+        report.skipped,
+        report.deleted,
+        len(report.failures),
+    )
+    return report
 
 
 def main() -> None:
@@ -105,10 +348,18 @@ def main() -> None:
     Environment variables:
         INPUT_GLOB: glob for markdown files.
         COLLECTION_NAME: Chroma collection name.
+        INGEST_WORKERS: processes that read and split files.
+        INGEST_FORCE: set to "true" to re-upsert every chunk, even of unchanged files.
     """
     input_glob = os.getenv("INPUT_GLOB", "./data/**/*.md")
     collection_name = os.getenv("COLLECTION_NAME", "rail_crag")
-    ingest_markdown(IngestConfig(input_glob=input_glob, collection_name=collection_name))
+    workers = int(os.getenv("INGEST_WORKERS", "1"))
+    force = os.getenv("INGEST_FORCE", "false").strip().lower() in ("1", "true", "yes")
+    report = ingest_markdown(
+        IngestConfig(input_glob=input_glob, collection_name=collection_name, workers=workers, force=force)
+    )
+    if report.failures:
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,338 @@
+"""Background ingestion jobs with SQLite-persisted state.
+
+The API writes each payload to ``<job_dir>/<job_id>.md`` and returns a job id
+immediately; worker threads split and upsert the file and record progress.
+Jobs that were queued or running when the process stopped are requeued on
+start, which is safe because chunk ids are deterministic and re-upserting a
+chunk is a no-op.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from ..components.vector_store import VectorStore
+from ..utils.chroma_store import iter_batches
+from .mineru_parser import MarkdownHierarchySplitter
+
+JOB_STATUSES = ("receiving", "queued", "running", "succeeded", "failed")
+
+
+class IngestJobStore:
+    """SQLite table of ingestion jobs.
+
+    Args:
+        path: SQLite file path.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Open (and create) the job table.
+
+        Args:
+            path: SQLite file path.
+        """
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS ingest_jobs (
+                job_id TEXT PRIMARY KEY,
+                source_name TEXT NOT NULL,
+                status TEXT NOT NULL,
+                payload_path TEXT NOT NULL,
+                bytes_total INTEGER NOT NULL DEFAULT 0,
+                bytes_processed INTEGER NOT NULL DEFAULT 0,
+                chunks_added INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            """
+        )
+
+    def create(self, source_name: str, payload_path: str, status: str = "receiving") -> str:
+        """Insert a new job.
+
+        Args:
+            source_name: Source filename.
+            payload_path: Where the markdown payload is (or will be) stored.
+            status: Initial status.
+
+        Returns:
+            str: Job id.
+        """
+        job_id = os.path.splitext(os.path.basename(payload_path))[0]
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO ingest_jobs (job_id, source_name, status, payload_path, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, source_name, status, payload_path, now, now),
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job as a dict.
+
+        Args:
+            job_id: Job id.
+
+        Returns:
+            Optional[Dict[str, Any]]: Job fields plus ``progress`` in [0, 1], or None.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM ingest_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job.pop("payload_path")
+        if job["status"] == "succeeded":
+            job["progress"] = 1.0
+        else:
+            job["progress"] = job["bytes_processed"] / job["bytes_total"] if job["bytes_total"] else 0.0
+        return job
+
+    def payload_path(self, job_id: str) -> Optional[str]:
+        """Return the payload path of a job.
+
+        Args:
+            job_id: Job id.
+
+        Returns:
+            Optional[str]: Payload path, or None if the job does not exist.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT payload_path FROM ingest_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        """Update job fields.
+
+        Args:
+            job_id: Job id.
+            **fields: Column values (status, bytes_total, bytes_processed, chunks_added, error).
+        """
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE ingest_jobs SET {columns} WHERE job_id = ?", (*fields.values(), job_id))
+
+    def recover(self) -> List[str]:
+        """Prepare jobs left over by a previous process.
+
+        Interrupted uploads are failed; queued and running jobs are reset to
+        queued from the start.
+
+        Returns:
+            List[str]: Ids of jobs to requeue, oldest first.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE ingest_jobs SET status = 'failed', error = 'upload interrupted', updated_at = ? "
+                "WHERE status = 'receiving'",
+                (now,),
+            )
+            self._conn.execute(
+                "UPDATE ingest_jobs SET status = 'queued', bytes_processed = 0, chunks_added = 0, updated_at = ? "
+                "WHERE status = 'running'",
+                (now,),
+            )
+            rows = self._conn.execute(
+                "SELECT job_id FROM ingest_jobs WHERE status = 'queued' ORDER BY created_at"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+
+class IngestJobQueue:
+    """Worker pool that processes ingestion jobs in the background.
+
+    Jobs for the same ``source_name`` never run concurrently, so a source's
+    section centroids and near-duplicate index are updated by one thread at a
+    time.
+
+    Args:
+        store: Vector store to ingest into.
+        job_dir: Directory for the job database and payload files.
+        splitter_kwargs: MarkdownHierarchySplitter keyword arguments.
+        workers: Worker threads.
+        batch_size: Chunks per upsert (progress is recorded after each).
+        logger: Optional logger.
+    """
+
+    def __init__(
+        self,
+        store: VectorStore,
+        job_dir: str,
+        splitter_kwargs: Optional[Dict[str, int]] = None,
+        workers: int = 1,
+        batch_size: int = 128,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        """Initialize the queue (workers start with ``start``).
+
+        Args:
+            store: Vector store to ingest into.
+            job_dir: Directory for the job database and payload files.
+            splitter_kwargs: MarkdownHierarchySplitter keyword arguments.
+            workers: Worker threads.
+            batch_size: Chunks per upsert.
+            logger: Optional logger.
+        """
+        os.makedirs(job_dir, exist_ok=True)
+        self._store = store
+        self._job_dir = job_dir
+        self._splitter_kwargs = splitter_kwargs or {}
+        self._workers = max(1, workers)
+        self._batch_size = batch_size
+        self._logger = logger or logging.getLogger(__name__)
+        self.jobs = IngestJobStore(os.path.join(job_dir, "jobs.sqlite3"))
+        self._pending: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._source_locks: Dict[str, threading.Lock] = {}
+        self._source_locks_guard = threading.Lock()
+
+    def start(self) -> None:
+        """Requeue unfinished jobs and start the worker threads."""
+        if self._threads:
+            return
+        recovered = self.jobs.recover()
+        if recovered:
+            self._logger.info("Requeueing %d unfinished ingest jobs", len(recovered))
+        for job_id in recovered:
+            self._pending.put(job_id)
+        for index in range(self._workers):
+            thread = threading.Thread(target=self._work, name=f"ingest-job-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the workers after their current job.
+
+        Args:
+            timeout: Seconds to wait for each worker.
+        """
+        for _ in self._threads:
+            self._pending.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def open_payload(self, source_name: str) -> Tuple[str, BinaryIO]:
+        """Create a job in ``receiving`` state and open its payload file.
+
+        Write the markdown to the handle, close it and call ``enqueue``.
+
+        Args:
+            source_name: Source filename.
+
+        Returns:
+            Tuple[str, BinaryIO]: Job id and a binary handle for the payload.
+        """
+        path = os.path.join(self._job_dir, f"{uuid.uuid4().hex}.md")
+        handle = open(path, "wb")
+        return self.jobs.create(source_name, path), handle
+
+    def submit_text(self, source_name: str, markdown: str) -> str:
+        """Store a markdown payload and queue it.
+
+        Args:
+            source_name: Source filename.
+            markdown: Markdown content.
+
+        Returns:
+            str: Job id.
+        """
+        job_id, handle = self.open_payload(source_name)
+        with handle:
+            handle.write(markdown.encode("utf-8"))
+        self.enqueue(job_id)
+        return job_id
+
+    def enqueue(self, job_id: str) -> None:
+        """Mark a received job as queued and hand it to the workers.
+
+        Args:
+            job_id: Job id.
+        """
+        self.jobs.update(job_id, status="queued", bytes_total=os.path.getsize(self.jobs.payload_path(job_id)))
+        self._pending.put(job_id)
+
+    def fail(self, job_id: str, error: str) -> None:
+        """Fail a job before it was queued (e.g. a broken upload).
+
+        Args:
+            job_id: Job id.
+            error: Error message.
+        """
+        self.jobs.update(job_id, status="failed", error=error)
+
+    def _work(self) -> None:
+        """Worker loop."""
+        while True:
+            job_id = self._pending.get()
+            if job_id is None:
+                return
+            try:
+                self._run(job_id)
+            except Exception as exc:
+                self._logger.exception("Ingest job %s failed: %s", job_id, exc)
+                self.jobs.update(job_id, status="failed", error=f"{type(exc).__name__}: {exc}")
+
+    def _run(self, job_id: str) -> None:
+        """Split and upsert one job's payload, recording progress after each batch.
+
+        An upsert failure propagates (``_work`` marks the job failed) and the
+        payload is kept; it is only removed once the job has succeeded.
+
+        Args:
+            job_id: Job id.
+        """
+        job = self.jobs.get(job_id)
+        path = self.jobs.payload_path(job_id)
+        if job is None or path is None or job["status"] != "queued":
+            return
+        source_name = job["source_name"]
+        with self.source_lock(source_name):
+            self.jobs.update(job_id, status="running")
+            splitter = MarkdownHierarchySplitter(**self._splitter_kwargs)
+            read = [0]
+            chunks_added = 0
+            with open(path, "rb") as handle:
+                for batch in iter_batches(splitter.iter_chunks(self._decoded_lines(handle, read)), self._batch_size):
+                    chunks_added += self._store.add_chunks(
+                        batch, source_name=source_name, batch_size=len(batch), strict=True
+                    )
+                    self.jobs.update(job_id, bytes_processed=read[0], chunks_added=chunks_added)
+            self.jobs.update(job_id, status="succeeded", bytes_processed=read[0], chunks_added=chunks_added)
+        os.remove(path)
+        self._logger.info("Ingest job %s finished: %d chunks from %s", job_id, chunks_added, source_name)
+
+    @staticmethod
+    def _decoded_lines(handle: BinaryIO, read: List[int]) -> Iterator[str]:
+        """Decode a binary payload line by line, counting bytes consumed.
+
+        Args:
+            handle: Binary file handle.
+            read: Single-item byte counter updated in place.
+
+        Yields:
+            str: Decoded lines.
+        """
+        for raw in handle:
+            read[0] += len(raw)
+            yield raw.decode("utf-8")
+
+    def source_lock(self, source_name: str) -> threading.Lock:
+        """Return the lock serializing writes of one source (shared with bulk ingest)."""
+        with self._source_locks_guard:
+            return self._source_locks.setdefault(source_name, threading.Lock())
@@ -0,0 +1,128 @@
+"""Persisted ingest manifest for incremental re-ingestion."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class ManifestEntry:
+    """What was ingested from one file.
+
+    Args:
+        size: File size in bytes.
+        mtime_ns: Modification time in nanoseconds.
+        sha256: Hex digest of the file content.
+        chunk_ids: Ids of the chunks produced from the file.
+    """
+
+    size: int
+    mtime_ns: int
+    sha256: str
+    chunk_ids: List[str] = field(default_factory=list)
+
+
+def file_digest(path: str, block_size: int = 1 << 20) -> str:
+    """Hash a file's content without reading it into memory at once.
+
+    Args:
+        path: File path.
+        block_size: Bytes read per step.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestManifest:
+    """JSON manifest mapping ingested file paths to their ``ManifestEntry``.
+
+    Paths are stored as absolute paths. ``save`` writes a temp file and renames
+    it, so an interrupted run never leaves a truncated manifest behind.
+
+    Args:
+        path: Manifest file path.
+        logger: Optional logger.
+    """
+
+    def __init__(self, path: str, logger: Optional[logging.Logger] = None) -> None:
+        """Load the manifest if it exists.
+
+        Args:
+            path: Manifest file path.
+            logger: Optional logger.
+        """
+        self._path = path
+        self._logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, ManifestEntry] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as handle:
+                    payload = json.load(handle)
+                self._entries = {key: ManifestEntry(**value) for key, value in payload.get("files", {}).items()}
+            except Exception as exc:
+                # A bad manifest only costs a full re-ingest; upserts are idempotent.
+                self._logger.warning("Ignoring unreadable manifest %s: %s", path, exc)
+
+    @property
+    def paths(self) -> List[str]:
+        """Return the recorded file paths."""
+        with self._lock:
+            return list(self._entries)
+
+    def get(self, path: str) -> Optional[ManifestEntry]:
+        """Return the entry recorded for a file.
+
+        Args:
+            path: File path.
+
+        Returns:
+            Optional[ManifestEntry]: Entry, or None if the file was never ingested.
+        """
+        with self._lock:
+            return self._entries.get(os.path.abspath(path))
+
+    def put(self, path: str, entry: ManifestEntry) -> None:
+        """Record a file's entry.
+
+        Args:
+            path: File path.
+            entry: Manifest entry.
+        """
+        with self._lock:
+            self._entries[os.path.abspath(path)] = entry
+
+    def remove(self, path: str) -> None:
+        """Forget a file.
+
+        Args:
+            path: File path.
+        """
+        with self._lock:
+            self._entries.pop(os.path.abspath(path), None)
+
+    def save(self) -> None:
+        """Persist the manifest atomically."""
+        with self._lock:
+            payload = {
+                "version": MANIFEST_VERSION,
+                "files": {key: asdict(entry) for key, entry in sorted(self._entries.items())},
+            }
+        os.makedirs(os.path.dirname(os.path.abspath(self._path)), exist_ok=True)
+        tmp_path = f"{self._path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, ensure_ascii=False)
+        os.replace(tmp_path, self._path)
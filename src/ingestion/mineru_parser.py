@@ -1,9 +1,30 @@
 """MinerU markdown parser for hierarchical splitting."""
 from __future__ import annotations
 
+import hashlib
 import re
+import uuid
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from ..utils.tokens import estimate_tokens
+
+PATH_SEPARATOR = " > "
+
+
+def section_path(path: str, depth: int) -> str:
+    """Truncate a chunk path to its enclosing section.
+
+    Args:
+        path: Hierarchical chunk path (headings joined by ``PATH_SEPARATOR``).
+        depth: Number of heading levels that identify a section.
+
+    Returns:
+        str: Section path made of the first ``depth`` headings.
+    """
+    if not path:
+        return ""
+    return PATH_SEPARATOR.join(path.split(PATH_SEPARATOR)[: max(1, depth)])
 
 
 @dataclass
@@ -13,19 +34,94 @@ class Chunk:
     Args:
         content: The text content of the chunk.
         metadata: Metadata including hierarchical path.
+        chunk_id: Stable chunk id (assigned by ``assign_chunk_ids``).
     """
 
     content: str
     metadata: Dict[str, str]
+    chunk_id: Optional[str] = None
+
+
+def assign_chunk_ids(chunks: Iterable[Chunk], source_name: str) -> Iterator[Chunk]:
+    """Give chunks deterministic ids derived from source, path and content.
+
+    Unchanged chunks keep their id across re-ingests, so a changed file can be
+    diffed chunk by chunk. Repeats of the same content under the same path are
+    numbered in document order. Chunks that already have an id are left as is.
+
+    Args:
+        chunks: Parsed chunks.
+        source_name: Source filename.
+
+    Yields:
+        Chunk: The same chunks with ``chunk_id`` set.
+    """
+    occurrences: Dict[str, int] = {}
+    for chunk in chunks:
+        if chunk.chunk_id is None:
+            digest = hashlib.sha256(chunk.content.encode("utf-8")).hexdigest()
+            key = f"{source_name}::{chunk.metadata.get('path', '')}::{digest}"
+            occurrence = occurrences.get(key, 0)
+            occurrences[key] = occurrence + 1
+            chunk.chunk_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"{key}::{occurrence}"))
+        yield chunk
+
+
+def parent_path(path: str) -> str:
+    """Return the path of the enclosing heading.
+
+    Args:
+        path: Hierarchical chunk path.
+
+    Returns:
+        str: Path without its last heading ("" for top-level paths).
+    """
+    return PATH_SEPARATOR.join(path.split(PATH_SEPARATOR)[:-1]) if path else ""
 
 
 class MarkdownHierarchySplitter:
     """Split MinerU markdown into hierarchical chunks.
 
-    The parser uses heading markers (#, ##, ###) to build a path stack.
+    The parser uses heading markers (#, ##, ###) to build a path stack. With a
+    token budget, sections above ``max_tokens`` are split at line, then
+    sentence boundaries (consecutive pieces share ``overlap_tokens``), and
+    runs of adjacent sibling sections below ``min_tokens`` are merged into one
+    chunk under their parent path. The defaults keep one chunk per section.
+
+    Args:
+        max_tokens: Maximum tokens per chunk (0 disables splitting).
+        min_tokens: Sections below this size are merged with small siblings (0 disables merging).
+        overlap_tokens: Tokens repeated between consecutive pieces of a split section.
+        token_counter: Function that counts tokens in a text.
     """
 
     header_pattern = re.compile(r"^(#+)\s+(.*)$")
+    sentence_pattern = re.compile(r"(?<=[。！？；!?;])|(?<=\.\s)")
+
+    def __init__(
+        self,
+        max_tokens: int = 0,
+        min_tokens: int = 0,
+        overlap_tokens: int = 0,
+        token_counter: Callable[[str], int] = estimate_tokens,
+    ) -> None:
+        """Initialize the splitter.
+
+        Args:
+            max_tokens: Maximum tokens per chunk (0 disables splitting).
+            min_tokens: Minimum tokens before a section is merged with siblings (0 disables merging).
+            overlap_tokens: Tokens repeated between consecutive pieces.
+            token_counter: Function that counts tokens in a text.
+
+        Raises:
+            ValueError: If the budget is inconsistent.
+        """
+        if max_tokens and (min_tokens > max_tokens or overlap_tokens >= max_tokens):
+            raise ValueError("min_tokens and overlap_tokens must be smaller than max_tokens")
+        self.max_tokens = max_tokens
+        self.min_tokens = min_tokens
+        self.overlap_tokens = overlap_tokens
+        self._count = token_counter
 
     def parse(self, markdown_text: str) -> List[Chunk]:
         """Parse markdown content into chunks.
@@ -36,17 +132,68 @@ class MarkdownHierarchySplitter:
         Returns:
             List[Chunk]: A list of chunks with metadata paths.
         """
-        lines = markdown_text.splitlines()
+        return list(self.iter_chunks(markdown_text.splitlines()))
+
+    def iter_chunks(self, file_or_lines: Union[str, Iterable[str]]) -> Iterator[Chunk]:
+        """Stream chunks from a file object or any iterable of lines.
+
+        A chunk is yielded as soon as the next heading closes its section (or,
+        when merging, as soon as the run of small siblings ends), so memory
+        stays bounded by the largest section rather than the file.
+
+        Args:
+            file_or_lines: Open text file, iterable of lines, or a markdown string.
+
+        Yields:
+            Chunk: Chunks with metadata paths, in document order.
+        """
+        sections = self._iter_sections(file_or_lines)
+        if not self.max_tokens and not self.min_tokens:
+            yield from sections
+            return
+
+        pending: List[Tuple[Chunk, int]] = []
+        pending_tokens = 0
+        for chunk in sections:
+            tokens = self._count(chunk.content)
+            parent = parent_path(chunk.metadata["path"])
+            if self.min_tokens and tokens < self.min_tokens and parent:
+                # Merged chunks keep each child heading, so count it into the budget.
+                cost = tokens + self._count(chunk.metadata["path"][len(parent) :])
+                same_parent = pending and parent_path(pending[0][0].metadata["path"]) == parent
+                if pending and (not same_parent or (self.max_tokens and pending_tokens + cost > self.max_tokens)):
+                    yield self._merge(pending)
+                    pending, pending_tokens = [], 0
+                pending.append((chunk, tokens))
+                pending_tokens += cost
+                continue
+            if pending:
+                yield self._merge(pending)
+                pending, pending_tokens = [], 0
+            yield from self._split(chunk, tokens)
+        if pending:
+            yield self._merge(pending)
+
+    def _iter_sections(self, file_or_lines: Union[str, Iterable[str]]) -> Iterator[Chunk]:
+        """Yield one chunk per heading section.
+
+        Args:
+            file_or_lines: Open text file, iterable of lines, or a markdown string.
+
+        Yields:
+            Chunk: Section chunks with metadata paths.
+        """
+        lines: Iterable[str] = file_or_lines.splitlines() if isinstance(file_or_lines, str) else file_or_lines
         header_stack: List[Tuple[int, str]] = []
         current_content: List[str] = []
-        chunks: List[Chunk] = []
 
-        for line in lines:
+        for raw_line in lines:
+            line = raw_line.rstrip("\r\n")
             match = self.header_pattern.match(line)
             if match:
                 if current_content:
-                    path = " > ".join([h[1] for h in header_stack])
-                    chunks.append(Chunk(content="\n".join(current_content).strip(), metadata={"path": path}))
+                    path = PATH_SEPARATOR.join([h[1] for h in header_stack])
+                    yield Chunk(content="\n".join(current_content).strip(), metadata={"path": path})
                     current_content = []
 
                 level = len(match.group(1))
@@ -60,7 +207,102 @@ class MarkdownHierarchySplitter:
                     current_content.append(line)
 
         if current_content:
-            path = " > ".join([h[1] for h in header_stack])
-            chunks.append(Chunk(content="\n".join(current_content).strip(), metadata={"path": path}))
+            path = PATH_SEPARATOR.join([h[1] for h in header_stack])
+            yield Chunk(content="\n".join(current_content).strip(), metadata={"path": path})
+
+    def _merge(self, pending: List[Tuple[Chunk, int]]) -> Chunk:
+        """Merge a run of small sibling sections into one chunk.
+
+        Args:
+            pending: (chunk, tokens) pairs sharing a parent path.
+
+        Returns:
+            Chunk: The single chunk unchanged, or the merged chunk under the parent path.
+        """
+        if len(pending) == 1:
+            return pending[0][0]
+        parent = parent_path(pending[0][0].metadata["path"])
+        parts = [f"{chunk.metadata['path'][len(parent) + len(PATH_SEPARATOR):]}\n{chunk.content}" for chunk, _ in pending]
+        return Chunk(content="\n\n".join(parts), metadata={"path": parent})
+
+    def _split(self, chunk: Chunk, tokens: int) -> Iterator[Chunk]:
+        """Split an oversized section into budgeted pieces.
 
-        return chunks
+        Args:
+            chunk: Section chunk.
+            tokens: Token count of the chunk.
+
+        Yields:
+            Chunk: Pieces sharing the section path (the chunk itself if it fits).
+        """
+        if not self.max_tokens or tokens <= self.max_tokens:
+            yield chunk
+            return
+        window: List[Tuple[str, str, int]] = []
+        window_tokens = 0
+        for unit in self._units(chunk.content):
+            if window and window_tokens + unit[2] > self.max_tokens:
+                yield Chunk(content=self._join(window), metadata=dict(chunk.metadata))
+                carried: List[Tuple[str, str, int]] = []
+                carried_tokens = 0
+                for previous in reversed(window):
+                    if carried_tokens + previous[2] > self.overlap_tokens:
+                        break
+                    carried.insert(0, previous)
+                    carried_tokens += previous[2]
+                if carried_tokens + unit[2] > self.max_tokens:
+                    carried, carried_tokens = [], 0
+                window, window_tokens = carried, carried_tokens
+            window.append(unit)
+            window_tokens += unit[2]
+        if window:
+            yield Chunk(content=self._join(window), metadata=dict(chunk.metadata))
+
+    def _units(self, content: str) -> Iterator[Tuple[str, str, int]]:
+        """Break content into units that fit the budget.
+
+        Lines (paragraphs, table rows) are kept whole when they fit; longer
+        lines fall back to sentences, and over-long sentences to fixed windows.
+
+        Args:
+            content: Section content.
+
+        Yields:
+            Tuple[str, str, int]: (separator before the unit, unit text, tokens).
+        """
+        for line in content.split("\n"):
+            tokens = self._count(line)
+            if tokens <= self.max_tokens:
+                yield "\n", line, tokens
+                continue
+            separator = "\n"
+            for sentence in filter(None, self.sentence_pattern.split(line)):
+                sentence_tokens = self._count(sentence)
+                if sentence_tokens <= self.max_tokens:
+                    yield separator, sentence, sentence_tokens
+                    separator = ""
+                    continue
+                start = 0
+                while start < len(sentence):
+                    step = max(1, len(sentence) * self.max_tokens // sentence_tokens)
+                    piece = sentence[start : start + step]
+                    piece_tokens = self._count(piece)
+                    # Token density is uneven (e.g. inline base64), so shrink until it fits.
+                    while piece_tokens > self.max_tokens and len(piece) > 1:
+                        piece = piece[: len(piece) * 9 // 10]
+                        piece_tokens = self._count(piece)
+                    yield separator, piece, piece_tokens
+                    separator = ""
+                    start += len(piece)
+
+    @staticmethod
+    def _join(units: List[Tuple[str, str, int]]) -> str:
+        """Join units back into text, dropping the leading separator.
+
+        Args:
+            units: (separator, text, tokens) triples.
+
+        Returns:
+            str: Joined text.
+        """
+        return (units[0][1] + "".join(sep + text for sep, text, _ in units[1:])).strip()
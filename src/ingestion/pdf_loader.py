@@ -5,101 +5,243 @@ into Markdown format suitable for ingestion.
 """
 from __future__ import annotations
 
+import collections
+import logging
 import os
 import shutil
 import subprocess
-import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from .manifest import file_digest
 
 # Use local logger if setup_logging is complex to import or just use standard logging
 logger = logging.getLogger(__name__)
 
+_COMPLETE_MARKER = ".complete"
+_LOG_TAIL_LINES = 40
+
+
+@dataclass(frozen=True)
+class ConversionResult:
+    """Outcome of converting one PDF.
+
+    Args:
+        pdf_path: Source PDF path.
+        markdown_path: Generated Markdown path (None on failure).
+        cached: Whether the output came from the content-addressed cache.
+        seconds: Wall time spent on this PDF.
+        error: Error message (None on success).
+    """
+
+    pdf_path: str
+    markdown_path: Optional[str]
+    cached: bool
+    seconds: float
+    error: Optional[str] = None
+
+
 class MinerULoader:
     """Wrapper for the Magic-PDF (MinerU) CLI.
-    
-    Converts PDF to Markdown for ingestion.
+
+    Converts PDF to Markdown for ingestion. Outputs live under
+    ``<output_dir>/<sha256 of the PDF>/``, so converting the same PDF again
+    (even renamed or moved) returns the cached Markdown without running
+    MinerU. A directory only counts as cached once the run finished and wrote
+    its completion marker.
+
+    Args:
+        output_dir: Directory to store intermediate MinerU outputs.
+        command: MinerU executable name or path.
+        timeout: Per-PDF timeout in seconds (None waits forever).
+        workers: Concurrent MinerU processes in ``parse_pdfs``.
     """
-    
-    def __init__(self, output_dir: str = "data/mineru_output") -> None:
+
+    def __init__(
+        self,
+        output_dir: str = "data/mineru_output",
+        command: str = "magic-pdf",
+        timeout: Optional[float] = None,
+        workers: int = 2,
+    ) -> None:
         """Initialize the loader.
-        
+
         Args:
             output_dir: Directory to store intermediate MinerU outputs.
+            command: MinerU executable name or path.
+            timeout: Per-PDF timeout in seconds (None waits forever).
+            workers: Concurrent MinerU processes in ``parse_pdfs``.
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        
+        self.command = command
+        self.timeout = timeout
+        self.workers = max(1, workers)
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
     def parse_pdf(self, pdf_path: str) -> str:
         """Runs magic-pdf to convert PDF -> Markdown.
-        
+
         Args:
             pdf_path: Path to the source PDF file.
-            
+
         Returns:
             str: The content of the generated Markdown file.
-            
+
         Raises:
             FileNotFoundError: If PDF does not exist.
-            RuntimeError: If MinerU processing fails.
+            RuntimeError: If MinerU processing fails or times out.
         """
         pdf_file = Path(pdf_path)
         if not pdf_file.exists():
             raise FileNotFoundError(f"PDF not found: {pdf_path}")
-            
-        logger.info("🚀 Starting MinerU processing for: %s", pdf_file.name)
-        
+        result = self.convert(pdf_path)
+        if result.error is not None:
+            raise RuntimeError(f"PDF Parsing Failed: {result.error}")
+        return Path(result.markdown_path).read_text(encoding="utf-8")
+
+    def parse_pdfs(self, pdf_paths: Sequence[str]) -> List[ConversionResult]:
+        """Convert many PDFs with at most ``workers`` MinerU processes at a time.
+
+        Failures are reported per file instead of raised.
+
+        Args:
+            pdf_paths: Source PDF paths.
+
+        Returns:
+            List[ConversionResult]: One result per input, in input order.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="mineru") as pool:
+            results = list(pool.map(self.convert, pdf_paths))
+        failed = sum(1 for result in results if result.error is not None)
+        cached = sum(1 for result in results if result.cached)
+        logger.info("MinerU batch finished: %d PDFs, %d cached, %d failed", len(results), cached, failed)
+        return results
+
+    def convert(self, pdf_path: str) -> ConversionResult:
+        """Convert one PDF, reusing the cached output when available.
+
+        Args:
+            pdf_path: Path to the source PDF file.
+
+        Returns:
+            ConversionResult: Markdown path or error message.
+        """
+        started = time.perf_counter()
+        pdf_file = Path(pdf_path)
+        try:
+            if not pdf_file.exists():
+                raise FileNotFoundError(f"PDF not found: {pdf_path}")
+            digest = file_digest(str(pdf_file))
+            # Serialize conversions of identical content; different PDFs run in parallel.
+            with self._lock_for(digest):
+                doc_dir = self.output_dir / digest
+                cached = self._cached_markdown(doc_dir)
+                if cached is not None:
+                    logger.info("MinerU cache hit for %s: %s", pdf_file.name, cached)
+                    return ConversionResult(str(pdf_file), str(cached), True, time.perf_counter() - started)
+                markdown = self._run(pdf_file, doc_dir)
+            return ConversionResult(str(pdf_file), str(markdown), False, time.perf_counter() - started)
+        except Exception as exc:
+            logger.error("❌ MinerU failed for %s: %s", pdf_path, exc)
+            return ConversionResult(str(pdf_file), None, False, time.perf_counter() - started, str(exc))
+
+    def _lock_for(self, digest: str) -> threading.Lock:
+        """Return the lock guarding one content hash."""
+        with self._locks_guard:
+            return self._locks.setdefault(digest, threading.Lock())
+
+    @staticmethod
+    def _cached_markdown(doc_dir: Path) -> Optional[Path]:
+        """Return the Markdown recorded by a completed run, if any.
+
+        Args:
+            doc_dir: Content-addressed output directory.
+
+        Returns:
+            Optional[Path]: Markdown path, or None if there is no complete output.
+        """
+        marker = doc_dir / _COMPLETE_MARKER
+        if not marker.exists():
+            return None
+        markdown = doc_dir / marker.read_text(encoding="utf-8").strip()
+        return markdown if markdown.exists() else None
+
+    def _run(self, pdf_file: Path, doc_dir: Path) -> Path:
+        """Run MinerU into ``doc_dir``, streaming its output to a log file.
+
+        Args:
+            pdf_file: Source PDF.
+            doc_dir: Content-addressed output directory.
+
+        Returns:
+            Path: Generated Markdown path.
+
+        Raises:
+            RuntimeError: If magic-pdf is missing, fails or times out.
+            ValueError: If MinerU finished without producing Markdown.
+        """
         # Check if magic-pdf is available
-        if shutil.which("magic-pdf") is None:
-             raise RuntimeError("magic-pdf command not found. Please install magic-pdf first.")
+        if shutil.which(self.command) is None:
+            raise RuntimeError(f"{self.command} command not found. Please install magic-pdf first.")
+
+        # A previous run may have died half-way; start from an empty directory.
+        if doc_dir.exists():
+            shutil.rmtree(doc_dir)
+        doc_dir.mkdir(parents=True)
+        logger.info("🚀 Starting MinerU processing for: %s", pdf_file.name)
 
         # Construct MinerU CLI command
         # magic-pdf -p {file} -o {output_dir} -m auto
         # Note: magic-pdf creates a subdirectory with the PDF filename in the output dir
-        cmd = [
-            "magic-pdf",
-            "-p", str(pdf_file.absolute()),
-            "-o", str(self.output_dir.absolute()),
-            "-m", "auto"
-        ]
-        
-        try:
-            # Run the heavy lifting
-            result = subprocess.run(
-                cmd, 
-                check=True, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE,
+        cmd = [self.command, "-p", str(pdf_file.absolute()), "-o", str(doc_dir.absolute()), "-m", "auto"]
+        tail: collections.deque = collections.deque(maxlen=_LOG_TAIL_LINES)
+        timed_out = threading.Event()
+        with open(doc_dir / "mineru.log", "w", encoding="utf-8") as log_file:
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
                 text=True,
-                encoding='utf-8', 
-                errors='replace' # handle potential encoding issues in stdout
+                encoding="utf-8",
+                errors="replace",  # handle potential encoding issues in stdout
             )
-            logger.debug("MinerU Output: %s", result.stdout)
-            
-            # Locate the generated markdown
-            # MinerU creates a subdir named after the PDF stem in the output directory
-            doc_dir = self.output_dir / pdf_file.stem
-            
-            # Check for generic auto-generated markdown naming usually {stem}.md
-            md_files = list(doc_dir.glob("*.md"))
-            
-            # Sometimes it might name it 'auto.md' or similar depending on version; 
-            # usually it's {filename}.md or just one .md file in that folder.
-            if not md_files:
-                 # Fallback search recursively in case structure changes
-                 md_files = list(doc_dir.rglob("*.md"))
-
-            if not md_files:
-                logger.error("MinerU stdout: %s", result.stdout)
-                logger.error("MinerU stderr: %s", result.stderr)
-                raise ValueError(f"MinerU finished but no Markdown file found in {doc_dir}")
-            
-            # Pick the largest one if multiple (assuming implies content) or just the first
-            target_md = md_files[0]
-            logger.info("MinerU generation successful: %s", target_md)
-                
-            return target_md.read_text(encoding='utf-8')
-            
-        except subprocess.CalledProcessError as e:
-            logger.error("❌ MinerU Failed with return code %d", e.returncode)
-            logger.error("Stderr: %s", e.stderr)
-            raise RuntimeError(f"PDF Parsing Failed: {e.stderr}")
+            timer = None
+            if self.timeout is not None:
+                timer = threading.Timer(self.timeout, lambda: (timed_out.set(), process.kill()))
+                timer.start()
+            try:
+                # Stream line by line: MinerU can print a lot for large PDFs.
+                for line in process.stdout:
+                    log_file.write(line)
+                    tail.append(line.rstrip())
+                    logger.debug("MinerU[%s]: %s", pdf_file.name, line.rstrip())
+                returncode = process.wait()
+            finally:
+                if timer is not None:
+                    timer.cancel()
+                process.stdout.close()
+
+        if timed_out.is_set():
+            raise RuntimeError(f"MinerU timed out after {self.timeout}s on {pdf_file.name}")
+        if returncode != 0:
+            logger.error("❌ MinerU Failed with return code %d", returncode)
+            raise RuntimeError(f"magic-pdf exited with {returncode}: " + "\n".join(tail))
+
+        # Locate the generated markdown
+        # MinerU creates a subdir named after the PDF stem; the layout varies by version.
+        md_files = sorted(doc_dir.rglob("*.md"), key=lambda path: path.stat().st_size, reverse=True)
+        if not md_files:
+            logger.error("MinerU output: %s", "\n".join(tail))
+            raise ValueError(f"MinerU finished but no Markdown file found in {doc_dir}")
+
+        # Pick the largest one if multiple (assuming implies content)
+        target_md = md_files[0]
+        (doc_dir / _COMPLETE_MARKER).write_text(os.path.relpath(target_md, doc_dir), encoding="utf-8")
+        logger.info("MinerU generation successful: %s", target_md)
+        return target_md
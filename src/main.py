@@ -3,29 +3,48 @@ from __future__ import annotations
 
 import argparse
 import os
+from typing import Iterable
 
 from .components.vector_store import VectorStore
 from .config import load_settings
 from .utils.logging_utils import setup_logging
 from .graph.builder import build_crag_graph
-from .ingestion.mineru_parser import MarkdownHierarchySplitter
+from .ingestion.mineru_parser import Chunk, MarkdownHierarchySplitter
 from .ingestion.pdf_loader import MinerULoader
 
 
-def _ingest_file(path: str) -> int:
+def _ingest_file(path: str, replace: bool = False) -> int:
     """Ingest a single file (MD or PDF) into ChromaDB.
 
     Args:
         path: Path to the source file.
+        replace: Replace the existing chunks of this source (same file name)
+            instead of adding to them.
 
     Returns:
         int: Number of chunks ingested.
+
+    Raises:
+        Exception: In replace mode, whatever made reading or writing fail
+            (the previous revision stays active).
     """
     logger = setup_logging(name="rail-crag.ingest")
     settings = load_settings(require_keys=False)
     
     # 1. Determine Loader
-    content = ""
+    splitter = MarkdownHierarchySplitter(
+        max_tokens=settings.chunk_max_tokens,
+        min_tokens=settings.chunk_min_tokens,
+        overlap_tokens=settings.chunk_overlap_tokens,
+    )
+    store = VectorStore(settings, logger=logger)
+    source_name = os.path.basename(path)
+
+    def write(chunks: Iterable[Chunk]) -> int:
+        if replace:
+            return store.replace_source(source_name, chunks)
+        return store.add_chunks(chunks, source_name=source_name)
+
     if path.lower().endswith(".pdf"):
         logger.info("Detected PDF file. Invoking MinerU loader...")
         try:
@@ -33,26 +52,66 @@ def _ingest_file(path: str) -> int:
             content = loader.parse_pdf(path)
         except Exception as exc:
             logger.exception("Failed to parse PDF with MinerU: %s", exc)
+            if replace:
+                raise
             return 0
+        count = write(splitter.iter_chunks(content))
     else:
-        # Default to Markdown text read
+        # Default to Markdown: stream lines straight into split & index
         try:
             with open(path, "r", encoding="utf-8") as handle:
-                content = handle.read()
+                count = write(splitter.iter_chunks(handle))
         except Exception as exc:
             logger.exception("Failed to read file: %s", exc)
+            if replace:
+                raise
             return 0
 
-    # 2. Split & Index
-    splitter = MarkdownHierarchySplitter()
-    store = VectorStore(settings, logger=logger)
-
-    chunks = splitter.parse(content)
-    if not chunks:
+    if not count:
         logger.warning("No chunks generated from file: %s", path)
-        return 0
-        
-    return store.add_chunks(chunks, source_name=os.path.basename(path))
+    return count
+
+
+def _delete_source(source_name: str) -> int:
+    """Delete all chunks of a source.
+
+    Args:
+        source_name: Source file name as stored in chunk metadata.
+
+    Returns:
+        int: Number of removed chunks.
+    """
+    logger = setup_logging(name="rail-crag.ingest")
+    store = VectorStore(load_settings(require_keys=False), logger=logger)
+    return store.delete_source(source_name)
+
+
+def _export_snapshot(path: str) -> int:
+    """Export the vector store into a snapshot file.
+
+    Args:
+        path: Output snapshot path.
+
+    Returns:
+        int: Number of exported chunks.
+    """
+    logger = setup_logging(name="rail-crag.snapshot")
+    store = VectorStore(load_settings(require_keys=False), logger=logger)
+    return store.export_snapshot(path)
+
+
+def _import_snapshot(path: str) -> int:
+    """Bulk-load a snapshot file into the vector store.
+
+    Args:
+        path: Snapshot path.
+
+    Returns:
+        int: Number of imported chunks.
+    """
+    logger = setup_logging(name="rail-crag.snapshot")
+    store = VectorStore(load_settings(require_keys=False), logger=logger)
+    return store.import_snapshot(path)
 
 
 def _chat_query(query: str) -> None:
@@ -79,8 +138,11 @@ def _chat_query(query: str) -> None:
 def main() -> None:
     """Main CLI entry point."""
     parser = argparse.ArgumentParser(description="Rail-CRAG CLI")
-    parser.add_argument("mode", choices=["ingest", "chat"], help="Operation mode")
-    parser.add_argument("--file", help="Path to markdown file for ingestion")
+    parser.add_argument(
+        "mode", choices=["ingest", "replace", "delete", "chat", "export", "import"], help="Operation mode"
+    )
+    parser.add_argument("--file", help="Path to markdown/PDF file for ingestion, or snapshot file for export/import")
+    parser.add_argument("--source", help="Source file name to delete")
     parser.add_argument("--query", help="Question to ask")
     args = parser.parse_args()
 
@@ -89,6 +151,29 @@ def main() -> None:
             raise ValueError("--file is required for ingest mode")
         count = _ingest_file(args.file)
         print(f"Successfully ingested {count} chunks from {args.file}")
+    elif args.mode == "replace":
+        if not args.file:
+            raise ValueError("--file is required for replace mode")
+        try:
+            count = _ingest_file(args.file, replace=True)
+        except Exception as exc:
+            raise SystemExit(f"Failed to replace {os.path.basename(args.file)}: {exc}") from exc
+        print(f"Replaced {os.path.basename(args.file)} with {count} chunks")
+    elif args.mode == "delete":
+        if not args.source:
+            raise ValueError("--source is required for delete mode")
+        count = _delete_source(args.source)
+        print(f"Deleted {count} chunks of {args.source}")
+    elif args.mode == "export":
+        if not args.file:
+            raise ValueError("--file is required for export mode")
+        count = _export_snapshot(args.file)
+        print(f"Exported {count} chunks to {args.file}")
+    elif args.mode == "import":
+        if not args.file:
+            raise ValueError("--file is required for import mode")
+        count = _import_snapshot(args.file)
+        print(f"Imported {count} chunks from {args.file}")
     elif args.mode == "chat":
         if not args.query:
             raise ValueError("--query is required for chat mode")
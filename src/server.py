@@ -2,22 +2,53 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict
-
-from fastapi import FastAPI, HTTPException
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
 from .components.vector_store import VectorStore
 from .config import load_settings
 from .graph.builder import build_crag_graph
+from .ingestion.bulk import BulkIngestor
+from .ingestion.jobs import IngestJobQueue
 from .ingestion.mineru_parser import MarkdownHierarchySplitter
 from .utils.logging_utils import setup_logging
+from .utils.metrics import METRICS
 
-app = FastAPI(title="Rail-CRAG API", version="1.0")
 logger = setup_logging(name="rail-crag.api")
 settings = load_settings(require_keys=False)
 vector_store = VectorStore(settings, logger=logger)
-graph = build_crag_graph()
+# Chat retrieves from the store the ingest endpoints write to.
+graph = build_crag_graph(vector_store)
+splitter_kwargs = {
+    "max_tokens": settings.chunk_max_tokens,
+    "min_tokens": settings.chunk_min_tokens,
+    "overlap_tokens": settings.chunk_overlap_tokens,
+}
+ingest_jobs = IngestJobQueue(
+    vector_store,
+    job_dir=os.path.join(settings.chroma_persist_dir, "ingest_jobs"),
+    splitter_kwargs=splitter_kwargs,
+    workers=settings.ingest_job_workers,
+    logger=logger,
+)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """Run the ingest job workers for the lifetime of the app."""
+    ingest_jobs.start()
+    yield
+    ingest_jobs.stop(timeout=5)
+
+
+app = FastAPI(title="Rail-CRAG API", version="1.0", lifespan=lifespan)
 
 
 class ChatRequest(BaseModel):
@@ -39,6 +70,12 @@ def health_check() -> Dict[str, str]:
     return {"status": "active", "system": "Rail-CRAG"}
 
 
+@app.get("/metrics")
+def metrics_endpoint() -> Dict[str, Any]:
+    """Return process metrics: request counters, latency percentiles and HTTP pool utilization."""
+    return METRICS.snapshot()
+
+
 @app.post("/chat")
 def chat_endpoint(req: ChatRequest) -> Dict[str, Any]:
     """Run CRAG pipeline for a question.
@@ -49,38 +86,166 @@ def chat_endpoint(req: ChatRequest) -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: Response payload.
     """
+    started = time.perf_counter()
     try:
         result = graph.invoke({"question": req.query})
+        METRICS.observe("chat", time.perf_counter() - started)
         return {
             "answer": result.get("final_answer", ""),
             "context_source": result.get("confidence", "unknown"),
             "steps": result.get("knowledge_strips", []) + result.get("search_results", []),
+            "context_tokens": result.get("context_tokens", {}),
+            "node_timings": result.get("node_timings", {}),
         }
     except Exception as exc:
+        METRICS.inc("chat.errors")
         logger.exception("Chat endpoint failed: %s", exc)
         raise HTTPException(status_code=500, detail="chat_failed") from exc
 
 
-@app.post("/ingest")
+@app.post("/ingest", status_code=202)
 def ingest_endpoint(req: IngestRequest) -> Dict[str, Any]:
-    """Ingest raw markdown from MinerU.
+    """Queue raw markdown from MinerU for background ingestion.
 
     Args:
         req: Ingest request.
 
     Returns:
-        Dict[str, Any]: Response payload.
+        Dict[str, Any]: Job id and status; poll ``/ingest/{job_id}`` for progress.
     """
     try:
-        splitter = MarkdownHierarchySplitter()
-        chunks = splitter.parse(req.markdown_content)
-        count = vector_store.add_chunks(chunks, source_name=req.source_name)
-        return {"status": "success", "chunks_added": count}
+        job_id = ingest_jobs.submit_text(req.source_name, req.markdown_content)
+        return {"status": "queued", "job_id": job_id}
     except Exception as exc:
         logger.exception("Ingest endpoint failed: %s", exc)
         raise HTTPException(status_code=500, detail="ingest_failed") from exc
 
 
+@app.post("/ingest/upload", status_code=202)
+async def ingest_upload_endpoint(request: Request, source_name: str = "api_upload") -> Dict[str, Any]:
+    """Queue a markdown file streamed as the raw request body.
+
+    The body is written to disk as it arrives, so large files never sit in
+    memory, e.g. ``curl --data-binary @std.md "/ingest/upload?source_name=std.md"``.
+
+    Args:
+        request: Incoming request (body is the markdown file).
+        source_name: Source filename.
+
+    Returns:
+        Dict[str, Any]: Job id and status.
+    """
+    # File and SQLite writes block, so keep them off the event loop.
+    job_id, handle = await run_in_threadpool(ingest_jobs.open_payload, source_name)
+    try:
+        try:
+            async for block in request.stream():
+                await run_in_threadpool(handle.write, block)
+        finally:
+            await run_in_threadpool(handle.close)
+    except Exception as exc:
+        await run_in_threadpool(ingest_jobs.fail, job_id, f"upload failed: {exc}")
+        logger.exception("Ingest upload failed: %s", exc)
+        raise HTTPException(status_code=500, detail="ingest_failed") from exc
+    await run_in_threadpool(ingest_jobs.enqueue, job_id)
+    return {"status": "queued", "job_id": job_id}
+
+
+@app.post("/ingest/bulk")
+async def ingest_bulk_endpoint(request: Request) -> Dict[str, Any]:
+    """Ingest a streamed NDJSON body of ``{source_name, markdown_content}`` records.
+
+    Records are parsed and upserted as they arrive, so the body is never
+    buffered as a whole. Invalid records are reported and skipped.
+
+    Args:
+        request: Incoming request (``application/x-ndjson`` body).
+
+    Returns:
+        Dict[str, Any]: Record count, per-source chunk counts and per-line errors.
+    """
+    bulk = BulkIngestor(vector_store, splitter_kwargs, source_lock=ingest_jobs.source_lock, logger=logger)
+    try:
+        async for block in request.stream():
+            # Embedding and upserts block, so keep them off the event loop.
+            await run_in_threadpool(bulk.feed, block)
+        return await run_in_threadpool(bulk.close)
+    except Exception as exc:
+        logger.exception("Bulk ingest failed after %d records: %s", bulk.records, exc)
+        raise HTTPException(status_code=500, detail="ingest_failed") from exc
+
+
+@app.delete("/sources/{source_name:path}")
+def delete_source_endpoint(source_name: str) -> Dict[str, Any]:
+    """Delete every chunk of a source.
+
+    Args:
+        source_name: Source file name.
+
+    Returns:
+        Dict[str, Any]: Number of removed chunks.
+    """
+    try:
+        with ingest_jobs.source_lock(source_name):
+            count = vector_store.delete_source(source_name)
+        return {"status": "success", "chunks_deleted": count}
+    except Exception as exc:
+        logger.exception("Delete of %s failed: %s", source_name, exc)
+        raise HTTPException(status_code=500, detail="delete_failed") from exc
+
+
+@app.put("/sources/{source_name:path}")
+async def replace_source_endpoint(source_name: str, request: Request) -> Dict[str, Any]:
+    """Replace a source with the markdown streamed as the raw request body.
+
+    Readers keep seeing the previous revision until the new one is fully written.
+
+    Args:
+        source_name: Source file name.
+        request: Incoming request (body is the new markdown revision).
+
+    Returns:
+        Dict[str, Any]: Number of chunks in the new revision.
+    """
+    # File writes block, so keep them off the event loop.
+    handle = await run_in_threadpool(tempfile.NamedTemporaryFile, suffix=".md", delete=False)
+
+    def replace() -> int:
+        splitter = MarkdownHierarchySplitter(**splitter_kwargs)
+        with ingest_jobs.source_lock(source_name), open(handle.name, "r", encoding="utf-8") as markdown:
+            return vector_store.replace_source(source_name, splitter.iter_chunks(markdown))
+
+    try:
+        try:
+            async for block in request.stream():
+                await run_in_threadpool(handle.write, block)
+        finally:
+            await run_in_threadpool(handle.close)
+        count = await run_in_threadpool(replace)
+        return {"status": "success", "chunks_added": count}
+    except Exception as exc:
+        logger.exception("Replace of %s failed: %s", source_name, exc)
+        raise HTTPException(status_code=500, detail="replace_failed") from exc
+    finally:
+        await run_in_threadpool(os.remove, handle.name)
+
+
+@app.get("/ingest/{job_id}")
+def ingest_status_endpoint(job_id: str) -> Dict[str, Any]:
+    """Report an ingest job's status and progress.
+
+    Args:
+        job_id: Job id returned by ``/ingest`` or ``/ingest/upload``.
+
+    Returns:
+        Dict[str, Any]: Job status, byte progress and chunks added so far.
+    """
+    job = ingest_jobs.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job_not_found")
+    return job
+
+
 def run() -> None:
     """Entrypoint for ASGI servers."""
     logging.getLogger(__name__).info("Rail-CRAG API ready")
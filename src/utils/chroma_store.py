@@ -1,16 +1,22 @@
 """ChromaDB storage utilities."""
 from __future__ import annotations
 
-import hashlib
 import logging
-import math
 from dataclasses import dataclass
-from typing import Callable, Iterable, List, Optional
+from itertools import islice
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple, TypeVar
 
 import chromadb
+import httpx
+import numpy as np
+import openai
 from chromadb.utils import embedding_functions
 from chromadb.api.models.Collection import Collection
 
+from .hashing import FNV_OFFSET, FNV_PRIME, fmix64
+
+T = TypeVar("T")
+
 
 @dataclass(frozen=True)
 class ChromaConfig:
@@ -26,22 +32,38 @@ class ChromaConfig:
 
 
 class SimpleHashEmbeddingFunction:
-    """Simple deterministic embedding function (no external dependencies).
+    """Deterministic character n-gram hashing embedding (no external dependencies).
 
     This is a placeholder embedding to allow local Chroma usage without
     additional models. Replace with a real embedding model in production.
 
+    Text is lower-cased, full-width folded and whitespace-collapsed, then every
+    character n-gram in ``ngram_range`` is hashed with a vectorized 64-bit
+    non-cryptographic hash. The hash picks both a bucket and a sign (signed
+    feature hashing), so Chinese text without whitespace still spreads over
+    the whole vector and bucket collisions cancel out instead of piling up.
+
     Args:
         dimensions: Vector dimensions.
+        ngram_range: Inclusive (min, max) character n-gram sizes.
     """
 
-    def __init__(self, dimensions: int = 128) -> None:
+    def __init__(self, dimensions: int = 256, ngram_range: Tuple[int, int] = (1, 3)) -> None:
         """Initialize the embedding function.
 
         Args:
             dimensions: Vector dimensions.
+            ngram_range: Inclusive (min, max) character n-gram sizes.
+
+        Raises:
+            ValueError: If dimensions or ngram_range are invalid.
         """
+        if dimensions <= 0:
+            raise ValueError("dimensions must be positive")
+        if ngram_range[0] < 1 or ngram_range[0] > ngram_range[1]:
+            raise ValueError("ngram_range must satisfy 1 <= min <= max")
         self._dimensions = dimensions
+        self._ngram_range = (int(ngram_range[0]), int(ngram_range[1]))
         # WARNING: Critical alert for Hash Embeddings
         logger = logging.getLogger(__name__)
         logger.error(
@@ -50,42 +72,42 @@ class SimpleHashEmbeddingFunction:
             "请在 .env 中配置有效的 Embeddings Provider 或 ModelScope 本地模型。"
         )
 
-    def __call__(self, input: List[str]) -> List[List[float]]:
+    def __call__(self, input: List[str]) -> List[np.ndarray]:
         """Embed input texts.
 
         Args:
             input: Input text list.
 
         Returns:
-            List[List[float]]: Embedding vectors.
+            List[np.ndarray]: Embedding vectors.
         """
-        return [self._embed_text(text) for text in input]
+        return list(self.embed_batch(input))
 
-    def embed_documents(self, input: List[str]) -> List[List[float]]:
+    def embed_documents(self, input: List[str]) -> List[np.ndarray]:
         """Embed documents for indexing.
 
         Args:
             input: Document texts.
 
         Returns:
-            List[List[float]]: Embedding vectors.
+            List[np.ndarray]: Embedding vectors.
         """
         return self.__call__(input)
 
-    def embed_query(self, input: object) -> List[float]:
+    def embed_query(self, input: object) -> List[np.ndarray]:
         """Embed a single query string.
 
         Args:
             input: Query text or list of query texts.
 
         Returns:
-            List[float]: Embedding vector.
+            List[np.ndarray]: Embedding vector.
         """
         if isinstance(input, list):
             query_text = " ".join(str(item) for item in input)
         else:
             query_text = str(input)
-        return [self._embed_text(query_text)]
+        return list(self.embed_batch([query_text]))
 
     def name(self) -> str:
         """Return embedding function name.
@@ -101,36 +123,111 @@ class SimpleHashEmbeddingFunction:
         Returns:
             dict: Configuration metadata.
         """
-        return {"dimensions": self._dimensions}
+        return {"dimensions": self._dimensions, "ngram_range": list(self._ngram_range)}
+
+    def embed_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed a batch of texts in one vectorized pass.
 
-    def _embed_text(self, text: str) -> List[float]:
-        """Embed a single text deterministically.
+        All texts are concatenated into a single code point array, so hashing
+        and bucket accumulation run as a handful of NumPy operations for the
+        whole batch rather than per token.
 
         Args:
-            text: Input text.
+            texts: Input texts.
 
         Returns:
-            List[float]: Embedding vector.
+            np.ndarray: Float32 matrix of shape (len(texts), dimensions) with
+            L2-normalized rows (all-zero rows for empty texts).
         """
-        vector = [0.0] * self._dimensions
-        for token in text.lower().split():
-            digest = hashlib.sha256(token.encode("utf-8")).digest()
-            idx = digest[0] % self._dimensions
-            vector[idx] += 1.0
-        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
-        return [v / norm for v in vector]
+        count = len(texts)
+        dims = self._dimensions
+        if count == 0:
+            return np.zeros((0, dims), dtype=np.float32)
+
+        lowered = [text.lower() for text in texts]
+        lengths = np.fromiter((len(text) for text in lowered), dtype=np.int64, count=count)
+        codes = np.frombuffer("".join(lowered).encode("utf-32-le"), dtype=np.uint32)
+        owners = np.repeat(np.arange(count, dtype=np.int64), lengths)
+        codes, owners = _fold_code_points(codes, owners)
+
+        total = codes.shape[0]
+        min_n, max_n = self._ngram_range
+        codes64 = codes.astype(np.uint64)
+        hashed = np.full(total, FNV_OFFSET, dtype=np.uint64)
+        indices: List[np.ndarray] = []
+        signs: List[np.ndarray] = []
+        # FNV-1a over code points, extended one character at a time so that the
+        # n-gram hashes of every size reuse the (n-1)-gram prefix.
+        for size in range(1, max_n + 1):
+            windows = total - size + 1
+            if windows <= 0:
+                break
+            hashed = hashed[:windows]
+            hashed ^= codes64[size - 1 : size - 1 + windows]
+            hashed *= FNV_PRIME
+            if size < min_n:
+                continue
+            mixed = fmix64(hashed)
+            # Lemire's multiply-shift maps the high 32 bits onto [0, dims)
+            # without a 64-bit modulo; the low bit picks the sign.
+            buckets = ((mixed >> np.uint64(32)) * np.uint64(dims)) >> np.uint64(32)
+            indices.append(owners[:windows] * dims + buckets.astype(np.int64))
+            sign = 1.0 - 2.0 * (mixed & np.uint64(1)).astype(np.float64)
+            # N-grams straddling two texts get zero weight.
+            sign[owners[:windows] != owners[size - 1 : size - 1 + windows]] = 0.0
+            signs.append(sign)
+
+        if indices:
+            flat = np.bincount(np.concatenate(indices), weights=np.concatenate(signs), minlength=count * dims)
+        else:
+            flat = np.zeros(count * dims, dtype=np.float64)
+        matrix = flat.reshape(count, dims)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0.0] = 1.0
+        return (matrix / norms).astype(np.float32)
+
+
+_WHITESPACE_CODES = np.array([0x09, 0x0A, 0x0B, 0x0C, 0x0D, 0x20, 0xA0, 0x3000], dtype=np.uint32)
+
+
+def _fold_code_points(codes: np.ndarray, owners: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Fold full-width ASCII and collapse whitespace runs.
+
+    Chinese standards mix full-width forms (e.g. "ＴＢ／Ｔ") with ASCII; both
+    should hash to the same n-grams. Whitespace runs collapse to one space so
+    layout differences in MinerU output do not change the features.
+
+    Args:
+        codes: uint32 code points of the concatenated (lower-cased) texts.
+        owners: Index of the text each code point belongs to.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Folded code points and their owners.
+    """
+    codes = codes.copy()
+    full_width = (codes >= 0xFF01) & (codes <= 0xFF5E)
+    codes[full_width] -= np.uint32(0xFEE0)
+    is_space = np.isin(codes, _WHITESPACE_CODES)
+    codes[is_space] = np.uint32(0x20)
+    repeated = np.zeros_like(is_space)
+    repeated[1:] = is_space[1:] & is_space[:-1] & (owners[1:] == owners[:-1])
+    keep = ~repeated
+    return codes[keep], owners[keep]
 
 
 def get_collection(
     config: ChromaConfig,
     logger: Optional[logging.Logger] = None,
     embedding_function: Optional[Callable[[List[str]], List[List[float]]]] = None,
+    metadata: Optional[dict] = None,
 ) -> Collection:
     """Get or create a Chroma collection.
 
     Args:
         config: Chroma configuration.
         logger: Optional logger.
+        embedding_function: Optional embedding function (hash embedding if omitted).
+        metadata: Optional collection metadata (e.g. ``{"hnsw:space": "cosine"}``).
 
     Returns:
         Collection: Chroma collection instance.
@@ -139,7 +236,11 @@ def get_collection(
     try:
         client = chromadb.PersistentClient(path=config.persist_dir)
         embedder = embedding_function or SimpleHashEmbeddingFunction()
-        collection = client.get_or_create_collection(name=config.collection_name, embedding_function=embedder)
+        collection = client.get_or_create_collection(
+            name=config.collection_name,
+            embedding_function=embedder,
+            metadata=metadata,
+        )
         return collection
     except Exception as exc:  # pragma: no cover - defensive
         log.exception("Failed to get Chroma collection: %s", exc)
@@ -177,18 +278,24 @@ def upsert_texts(
         raise
 
 
-def iter_batches(items: List[str], batch_size: int) -> Iterable[List[str]]:
+def iter_batches(items: Iterable[T], batch_size: int) -> Iterable[List[T]]:
     """Yield items in batches.
 
+    Works on lists and on lazy iterables (e.g. streamed chunks) alike.
+
     Args:
         items: Items to batch.
         batch_size: Batch size.
 
     Yields:
-        List[str]: Batched items.
+        List[T]: Batched items.
     """
-    for i in range(0, len(items), batch_size):
-        yield items[i : i + batch_size]
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
 
 
 def query_texts(
@@ -196,6 +303,7 @@ def query_texts(
     query: str,
     top_k: int,
     logger: Optional[logging.Logger] = None,
+    where: Optional[dict] = None,
 ) -> dict:
     """Query Chroma collection.
 
@@ -204,13 +312,41 @@ def query_texts(
         query: Query text.
         top_k: Number of results.
         logger: Optional logger.
+        where: Optional metadata filter.
 
     Returns:
         dict: Query results from Chroma.
     """
     log = logger or logging.getLogger(__name__)
     try:
-        return collection.query(query_texts=[query], n_results=top_k)
+        return collection.query(query_texts=[query], n_results=top_k, where=where)
+    except Exception as exc:
+        log.exception("Failed to query Chroma: %s", exc)
+        raise
+
+
+def query_embeddings(
+    collection: Collection,
+    embedding: Sequence[float],
+    top_k: int,
+    logger: Optional[logging.Logger] = None,
+    where: Optional[dict] = None,
+) -> dict:
+    """Query Chroma collection with a precomputed embedding.
+
+    Args:
+        collection: Chroma collection.
+        embedding: Query embedding.
+        top_k: Number of results.
+        logger: Optional logger.
+        where: Optional metadata filter.
+
+    Returns:
+        dict: Query results from Chroma.
+    """
+    log = logger or logging.getLogger(__name__)
+    try:
+        return collection.query(query_embeddings=[embedding], n_results=top_k, where=where)
     except Exception as exc:
         log.exception("Failed to query Chroma: %s", exc)
         raise
@@ -220,6 +356,11 @@ def get_openai_embedding_function(
     api_key: str,
     model_name: str,
     logger: Optional[logging.Logger] = None,
+    hash_dimensions: int = 256,
+    dimensions: Optional[int] = None,
+    http_client: Optional[httpx.Client] = None,
+    max_retries: int = 2,
+    base_url: Optional[str] = None,
 ) -> Callable[[List[str]], List[List[float]]]:
     """Create an OpenAI embedding function for Chroma.
 
@@ -227,6 +368,12 @@ def get_openai_embedding_function(
         api_key: OpenAI API key.
         model_name: Embedding model name.
         logger: Optional logger.
+        hash_dimensions: Dimensions of the hash embedding used without a key.
+        dimensions: Output dimensions requested from the embedding API
+            (``text-embedding-3`` models only; None keeps the model default).
+        http_client: Shared HTTP client (None lets the OpenAI SDK create its own).
+        max_retries: Retries of retryable embedding API responses.
+        base_url: OpenAI-compatible API base URL (None uses OpenAI's default).
 
     Returns:
         Callable[[List[str]], List[List[float]]]: Embedding function.
@@ -234,5 +381,13 @@ def get_openai_embedding_function(
     log = logger or logging.getLogger(__name__)
     if not api_key:
         log.warning("OPENAI_API_KEY not set; using SimpleHashEmbeddingFunction")
-        return SimpleHashEmbeddingFunction()
-    return embedding_functions.OpenAIEmbeddingFunction(api_key=api_key, model_name=model_name)
+        return SimpleHashEmbeddingFunction(dimensions=hash_dimensions)
+    function = embedding_functions.OpenAIEmbeddingFunction(
+        api_key=api_key, model_name=model_name, api_base=base_url, dimensions=dimensions
+    )
+    if http_client is not None:
+        # Chroma builds a private OpenAI client; swap in one on the shared pool.
+        function.client = openai.OpenAI(
+            api_key=api_key, base_url=base_url, http_client=http_client, max_retries=max_retries
+        )
+    return function
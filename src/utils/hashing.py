@@ -0,0 +1,44 @@
+"""Vectorized non-cryptographic hashing helpers (NumPy)."""
+from __future__ import annotations
+
+import numpy as np
+
+FNV_OFFSET = np.uint64(0xCBF29CE484222325)
+FNV_PRIME = np.uint64(0x100000001B3)
+
+
+def fmix64(values: np.ndarray) -> np.ndarray:
+    """Apply the MurmurHash3 64-bit finalizer element-wise.
+
+    Args:
+        values: uint64 array.
+
+    Returns:
+        np.ndarray: Mixed uint64 array.
+    """
+    values = values ^ (values >> np.uint64(33))
+    values = values * np.uint64(0xFF51AFD7ED558CCD)
+    values = values ^ (values >> np.uint64(33))
+    values = values * np.uint64(0xC4CEB9FE1A85EC53)
+    return values ^ (values >> np.uint64(33))
+
+
+def hash_char_ngrams(codes: np.ndarray, size: int) -> np.ndarray:
+    """Hash every character n-gram of a code point array.
+
+    Args:
+        codes: Code points (any unsigned integer dtype).
+        size: N-gram size.
+
+    Returns:
+        np.ndarray: One mixed uint64 hash per n-gram (empty if too short).
+    """
+    windows = codes.shape[0] - size + 1
+    if windows <= 0:
+        return np.zeros(0, dtype=np.uint64)
+    codes64 = codes.astype(np.uint64)
+    hashed = np.full(windows, FNV_OFFSET, dtype=np.uint64)
+    for offset in range(size):
+        hashed ^= codes64[offset : offset + windows]
+        hashed *= FNV_PRIME
+    return fmix64(hashed)
@@ -0,0 +1,210 @@
+"""Hedged requests with adaptive timeouts for latency-critical upstream calls."""
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Optional
+
+from ..config import Settings
+from .metrics import METRICS, Metrics, percentile
+
+
+class HedgePolicy:
+    """Fire a duplicate call when the first one is slower than usual.
+
+    Latencies of completed attempts are kept in a rolling window
+    (``llm.<name>`` in the metrics registry). Once ``min_samples`` are
+    known, a call that has not returned after the window's ``quantile``
+    latency gets a second, identical attempt and the first response wins.
+    The overall wait is bounded by an adaptive timeout: the window's p99
+    times ``timeout_factor``, clamped to ``[timeout_floor, timeout_ceiling]``.
+    A losing or timed-out attempt cannot be cancelled and finishes in the
+    background; its result is discarded.
+
+    Reported metrics: ``hedge.<name>.calls``, ``.hedged``, ``.hedge_wins``,
+    ``.timeouts`` and ``.saved_seconds`` (how much later the primary attempt
+    finished than the winning hedge).
+
+    Args:
+        name: Operation name used in metrics.
+        enabled: When False, ``call`` runs the function directly.
+        quantile: Latency percentile after which a hedge is fired.
+        min_samples: Samples required before hedging and adaptive timeouts start.
+        timeout_factor: Multiplier of the p99 latency for the timeout.
+        timeout_floor: Lower bound of the adaptive timeout in seconds.
+        timeout_ceiling: Upper bound (and cold-start value) of the timeout in seconds.
+        max_workers: Threads running attempts.
+        metrics: Registry to record into.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        enabled: bool = True,
+        quantile: float = 95.0,
+        min_samples: int = 20,
+        timeout_factor: float = 3.0,
+        timeout_floor: float = 2.0,
+        timeout_ceiling: float = 60.0,
+        max_workers: int = 32,
+        metrics: Metrics = METRICS,
+    ) -> None:
+        """Initialize the policy.
+
+        Args:
+            name: Operation name used in metrics.
+            enabled: When False, ``call`` runs the function directly.
+            quantile: Latency percentile after which a hedge is fired.
+            min_samples: Samples required before hedging and adaptive timeouts start.
+            timeout_factor: Multiplier of the p99 latency for the timeout.
+            timeout_floor: Lower bound of the adaptive timeout in seconds.
+            timeout_ceiling: Upper bound (and cold-start value) of the timeout in seconds.
+            max_workers: Threads running attempts.
+            metrics: Registry to record into.
+        """
+        self.name = name
+        self.enabled = enabled
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.timeout_factor = timeout_factor
+        self.timeout_floor = timeout_floor
+        self.timeout_ceiling = timeout_ceiling
+        self._metrics = metrics
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._max_workers = max_workers
+
+    def hedge_delay(self) -> Optional[float]:
+        """Return the delay after which a hedge is fired (None while warming up)."""
+        samples = self._metrics.samples(f"llm.{self.name}")
+        if len(samples) < self.min_samples:
+            return None
+        return percentile(samples, self.quantile)
+
+    def timeout(self) -> float:
+        """Return the current adaptive timeout in seconds."""
+        samples = self._metrics.samples(f"llm.{self.name}")
+        if len(samples) < self.min_samples:
+            return self.timeout_ceiling
+        adaptive = percentile(samples, 99) * self.timeout_factor
+        return min(self.timeout_ceiling, max(self.timeout_floor, adaptive))
+
+    def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run ``fn`` with hedging and an adaptive timeout.
+
+        Args:
+            fn: Upstream call (must be safe to issue twice).
+            *args: Positional arguments.
+            **kwargs: Keyword arguments.
+
+        Returns:
+            Any: Result of the first successful attempt.
+
+        Raises:
+            TimeoutError: If no attempt finished within the adaptive timeout.
+            Exception: The last attempt's error if every attempt failed.
+        """
+        if not self.enabled:
+            return fn(*args, **kwargs)
+        self._metrics.inc(f"hedge.{self.name}.calls")
+        started = time.perf_counter()
+        deadline = started + self.timeout()
+        delay = self.hedge_delay()
+        primary = self._submit(fn, args, kwargs)
+        pending = {primary}
+        if delay is not None:
+            wait(pending, timeout=min(delay, max(0.0, deadline - time.perf_counter())))
+            if not primary.done() and time.perf_counter() < deadline:
+                self._metrics.inc(f"hedge.{self.name}.hedged")
+                pending.add(self._submit(fn, args, kwargs))
+        error: Optional[BaseException] = None
+        while pending:
+            remaining = max(0.0, deadline - time.perf_counter())
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        self._record_win(primary, future)
+                    return future.result()
+                error = future.exception()
+        if error is not None and not pending:
+            raise error
+        self._metrics.inc(f"hedge.{self.name}.timeouts")
+        raise TimeoutError(f"{self.name} call exceeded {deadline - started:.2f}s")
+
+    def _submit(self, fn: Callable[..., Any], args: tuple, kwargs: dict) -> Future:
+        """Start one attempt, recording its latency when it succeeds.
+
+        Args:
+            fn: Upstream call.
+            args: Positional arguments.
+            kwargs: Keyword arguments.
+
+        Returns:
+            Future: The attempt, resolving to ``fn``'s result.
+        """
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix=f"hedge-{self.name}"
+                )
+
+        def attempt() -> Any:
+            started = time.perf_counter()
+            result = fn(*args, **kwargs)
+            finished = time.perf_counter()
+            self._metrics.observe(f"llm.{self.name}", finished - started)
+            return result, finished
+
+        future: Future = Future()
+        inner = self._pool.submit(attempt)
+
+        def settle(source: Future) -> None:
+            if source.exception() is not None:
+                future.set_exception(source.exception())
+            else:
+                result, finished = source.result()
+                future.finished = finished  # type: ignore[attr-defined]
+                future.set_result(result)
+
+        inner.add_done_callback(settle)
+        return future
+
+    def _record_win(self, primary: Future, hedge: Future) -> None:
+        """Count a hedge win and, once the primary finishes, the time it saved.
+
+        Args:
+            primary: First attempt (still running).
+            hedge: Winning duplicate attempt.
+        """
+        self._metrics.inc(f"hedge.{self.name}.hedge_wins")
+
+        def saved(future: Future) -> None:
+            if future.exception() is None:
+                self._metrics.inc(f"hedge.{self.name}.saved_seconds", max(0.0, future.finished - hedge.finished))
+
+        primary.add_done_callback(saved)
+
+
+def hedge_policy(name: str, settings: Settings) -> HedgePolicy:
+    """Build a hedge policy from settings.
+
+    Args:
+        name: Operation name used in metrics.
+        settings: Project settings.
+
+    Returns:
+        HedgePolicy: Policy (disabled unless ``settings.llm_hedging``).
+    """
+    return HedgePolicy(
+        name,
+        enabled=settings.llm_hedging,
+        quantile=settings.hedge_quantile,
+        min_samples=settings.hedge_min_samples,
+        timeout_factor=settings.adaptive_timeout_factor,
+        timeout_floor=settings.adaptive_timeout_floor,
+        timeout_ceiling=settings.http_timeout,
+    )
@@ -0,0 +1,138 @@
+"""Shared, instrumented HTTP client for OpenAI-backed components."""
+from __future__ import annotations
+
+import importlib.util
+import logging
+import threading
+import time
+from typing import Dict, Tuple
+
+import httpx
+
+from ..config import Settings
+from .metrics import METRICS, Metrics
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedTransport(httpx.HTTPTransport):
+    """``httpx.HTTPTransport`` that records request metrics.
+
+    Records ``http.requests``, ``http.errors`` (transport failures and 5xx),
+    ``http.status.<code>`` counters and the ``http.request`` latency (time to
+    response headers). Pool utilization is exposed through ``pool_stats``.
+
+    Args:
+        metrics: Registry to record into.
+        **kwargs: ``httpx.HTTPTransport`` arguments.
+    """
+
+    def __init__(self, metrics: Metrics = METRICS, **kwargs) -> None:
+        """Initialize the transport.
+
+        Args:
+            metrics: Registry to record into.
+            **kwargs: ``httpx.HTTPTransport`` arguments.
+        """
+        super().__init__(**kwargs)
+        self._metrics = metrics
+        self._inflight = 0
+        self._inflight_lock = threading.Lock()
+        self._max_connections = kwargs.get("limits", httpx.Limits()).max_connections
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request, recording latency and outcome.
+
+        Args:
+            request: Outgoing request.
+
+        Returns:
+            httpx.Response: Response.
+        """
+        with self._inflight_lock:
+            self._inflight += 1
+        started = time.perf_counter()
+        try:
+            response = super().handle_request(request)
+        except Exception:
+            self._metrics.inc("http.errors")
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight -= 1
+            self._metrics.inc("http.requests")
+            self._metrics.observe("http.request", time.perf_counter() - started)
+        self._metrics.inc(f"http.status.{response.status_code}")
+        if response.status_code >= 500:
+            self._metrics.inc("http.errors")
+        return response
+
+    def pool_stats(self) -> Dict[str, float]:
+        """Return connection pool utilization.
+
+        Returns:
+            Dict[str, float]: In-flight requests, open/idle connections and
+            the share of ``max_connections`` in use.
+        """
+        connections = list(self._pool.connections)
+        idle = sum(1 for connection in connections if connection.is_idle())
+        active = len(connections) - idle
+        return {
+            "inflight": self._inflight,
+            "connections": len(connections),
+            "idle": idle,
+            "active": active,
+            "max_connections": self._max_connections,
+            "utilization": active / self._max_connections if self._max_connections else 0.0,
+        }
+
+
+_clients: Dict[Tuple, httpx.Client] = {}
+_clients_lock = threading.Lock()
+
+
+def shared_http_client(settings: Settings) -> httpx.Client:
+    """Return the process-wide HTTP client for the settings' transport options.
+
+    Every OpenAI client (evaluator, rewriter, generator, embeddings) built
+    from the same settings shares this client, so they share one keep-alive
+    pool and one TLS session per host. HTTP/2 is used when requested and the
+    ``h2`` package is installed.
+
+    Args:
+        settings: Project settings.
+
+    Returns:
+        httpx.Client: Shared client.
+    """
+    http2 = settings.http2 and importlib.util.find_spec("h2") is not None
+    key = (
+        settings.http_max_connections,
+        settings.http_max_keepalive,
+        settings.http_keepalive_expiry,
+        settings.http_timeout,
+        settings.http_connect_timeout,
+        settings.http_retries,
+        http2,
+    )
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            if settings.http2 and not http2:
+                logger.info("HTTP/2 requested but the h2 package is not installed; using HTTP/1.1")
+            transport = InstrumentedTransport(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=settings.http_max_connections,
+                    max_keepalive_connections=settings.http_max_keepalive,
+                    keepalive_expiry=settings.http_keepalive_expiry,
+                ),
+                retries=settings.http_retries,
+            )
+            client = httpx.Client(
+                transport=transport,
+                timeout=httpx.Timeout(settings.http_timeout, connect=settings.http_connect_timeout),
+            )
+            METRICS.register_gauge("http.pool", transport.pool_stats)
+            _clients[key] = client
+        return client
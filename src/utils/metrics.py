@@ -0,0 +1,136 @@
+"""In-process metrics registry (counters, gauges and latency samples)."""
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Sequence
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """Return the q-th percentile (nearest rank) of samples.
+
+    Args:
+        samples: Values.
+        q: Percentile in [0, 100].
+
+    Returns:
+        float: Percentile value (0.0 for no samples).
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Metrics:
+    """Thread-safe registry exported by the ``/metrics`` endpoint.
+
+    Counters only go up; gauges are callables evaluated at snapshot time;
+    latency observations keep a count, a sum and the most recent
+    ``window`` samples for percentiles.
+
+    Args:
+        window: Recent samples kept per observation.
+    """
+
+    def __init__(self, window: int = 2048) -> None:
+        """Initialize an empty registry.
+
+        Args:
+            window: Recent samples kept per observation.
+        """
+        self._window = window
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, Callable[[], Any]] = {}
+        self._observations: Dict[str, Dict[str, Any]] = {}
+
+    def inc(self, name: str, value: float = 1.0) -> None:
+        """Increase a counter.
+
+        Args:
+            name: Counter name.
+            value: Increment.
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0.0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        """Record a latency (or other) sample.
+
+        Args:
+            name: Observation name.
+            value: Sample value (seconds for latencies).
+        """
+        with self._lock:
+            entry = self._observations.get(name)
+            if entry is None:
+                entry = {"count": 0, "sum": 0.0, "samples": deque(maxlen=self._window)}
+                self._observations[name] = entry
+            entry["count"] += 1
+            entry["sum"] += value
+            entry["samples"].append(value)
+
+    def samples(self, name: str) -> list:
+        """Return the recent samples of an observation.
+
+        Args:
+            name: Observation name.
+
+        Returns:
+            list: Samples, oldest first.
+        """
+        with self._lock:
+            entry = self._observations.get(name)
+            return list(entry["samples"]) if entry else []
+
+    def register_gauge(self, name: str, read: Callable[[], Any]) -> None:
+        """Register (or replace) a gauge.
+
+        Args:
+            name: Gauge name.
+            read: Callable returning the current value (a number or a dict).
+        """
+        with self._lock:
+            self._gauges[name] = read
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return all metrics as a JSON-serializable dict.
+
+        Returns:
+            Dict[str, Any]: ``counters``, ``gauges`` and ``latency`` sections.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            observations = {
+                name: (entry["count"], entry["sum"], list(entry["samples"]))
+                for name, entry in self._observations.items()
+            }
+        latency: Dict[str, Dict[str, float]] = {}
+        for name, (count, total, samples) in observations.items():
+            latency[name] = {
+                "count": count,
+                "mean": total / count if count else 0.0,
+                "p50": percentile(samples, 50),
+                "p95": percentile(samples, 95),
+                "p99": percentile(samples, 99),
+            }
+        values: Dict[str, Any] = {}
+        for name, read in gauges.items():
+            try:
+                values[name] = read()
+            except Exception as exc:
+                values[name] = f"error: {exc}"
+        return {"counters": counters, "gauges": values, "latency": latency}
+
+    def reset(self) -> None:
+        """Drop counters and observations (gauges stay registered)."""
+        with self._lock:
+            self._counters.clear()
+            self._observations.clear()
+
+
+METRICS = Metrics()
@@ -0,0 +1,308 @@
+"""Quantized in-memory vector index with float re-ranking support."""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+QUANTIZATION_MODES = ("none", "float16", "int8")
+
+
+def quantize(vectors: np.ndarray, mode: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Quantize row vectors.
+
+    int8 uses symmetric per-vector scaling (``row ≈ codes * scale``); float16
+    stores the rows as-is with unit scales.
+
+    Args:
+        vectors: Float matrix of shape (n, dim).
+        mode: "float16" or "int8".
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (codes, float32 per-row scales).
+
+    Raises:
+        ValueError: If the mode is unsupported.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if mode == "float16":
+        return vectors.astype(np.float16), np.ones(vectors.shape[0], dtype=np.float32)
+    if mode == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0.0] = 1.0
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    raise ValueError(f"Unsupported quantization mode: {mode}")
+
+
+def dequantize(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """Reconstruct float32 vectors from codes and scales.
+
+    Args:
+        codes: Quantized codes.
+        scales: Per-row scales.
+
+    Returns:
+        np.ndarray: Float32 matrix.
+    """
+    return codes.astype(np.float32) * scales[:, None]
+
+
+class QuantizedVectorIndex:
+    """Brute-force inner-product index over quantized vectors.
+
+    Codes, scales and ids are kept in memory and persisted as append-only
+    files (``<prefix>.codes``, ``<prefix>.scales``, ``<prefix>.ids`` plus a
+    ``<prefix>.dim`` header), so adds of new ids never rewrite the whole
+    index; re-adding an existing id replaces its vector. The
+    query stays in float32 (asymmetric scoring), and callers re-rank the
+    returned candidates with the original float vectors. ``refresh``
+    reloads the files when another instance or process changed them.
+
+    Args:
+        path_prefix: File prefix for persistence (None keeps it in memory).
+        mode: "float16" or "int8".
+        logger: Optional logger.
+    """
+
+    _SCORE_BLOCK = 65536
+
+    def __init__(self, path_prefix: Optional[str], mode: str, logger: Optional[logging.Logger] = None) -> None:
+        """Initialize and load any persisted vectors.
+
+        Args:
+            path_prefix: File prefix for persistence (None keeps it in memory).
+            mode: "float16" or "int8".
+            logger: Optional logger.
+
+        Raises:
+            ValueError: If the mode is unsupported.
+        """
+        if mode not in ("float16", "int8"):
+            raise ValueError(f"Unsupported quantization mode: {mode}")
+        self._prefix = path_prefix
+        self._mode = mode
+        self._dtype = np.float16 if mode == "float16" else np.int8
+        self._logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._dim = 0
+        # Capacity-doubling buffers; only the first ``len(self._ids)`` rows are live.
+        self._codes = np.zeros((0, 0), dtype=self._dtype)
+        self._scales = np.zeros(0, dtype=np.float32)
+        # (size, mtime) of the ids file as of the last load or write by this instance.
+        self._disk_state: Optional[Tuple[int, int]] = None
+        self._load()
+
+    @property
+    def count(self) -> int:
+        """Return the number of indexed vectors."""
+        return len(self._ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the in-memory size of the live codes and scales in bytes."""
+        size = len(self._ids)
+        return int(size * self._dim * np.dtype(self._dtype).itemsize + size * 4)
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        """Quantize and append vectors, replacing those of ids already indexed.
+
+        Args:
+            ids: Vector ids.
+            vectors: Float matrix aligned with ``ids``.
+
+        Raises:
+            ValueError: If the vector dimension does not match the index.
+        """
+        if not len(ids):
+            return
+        codes, scales = quantize(vectors, self._mode)
+        with self._lock:
+            if self._dim and codes.shape[1] != self._dim:
+                raise ValueError(f"Vector dimension {codes.shape[1]} does not match index dimension {self._dim}")
+            self._dim = codes.shape[1]
+            # The last vector of an id wins, as with a Chroma upsert.
+            latest = {chunk_id: position for position, chunk_id in enumerate(ids)}
+            fresh: List[int] = []
+            replaced = False
+            for chunk_id, position in latest.items():
+                row = self._rows.get(chunk_id)
+                if row is None:
+                    fresh.append(position)
+                    continue
+                self._codes[row] = codes[position]
+                self._scales[row] = scales[position]
+                replaced = True
+            new_ids = [ids[position] for position in fresh]
+            self._append_rows(codes[fresh], scales[fresh])
+            self._rows.update((chunk_id, len(self._ids) + offset) for offset, chunk_id in enumerate(new_ids))
+            self._ids.extend(new_ids)
+            if replaced:
+                self._persist_rewrite()
+            else:
+                self._persist_append(new_ids, codes[fresh], scales[fresh])
+
+    def remove(self, ids: Iterable[str]) -> None:
+        """Remove vectors and compact the persisted files.
+
+        Args:
+            ids: Vector ids to remove.
+        """
+        doomed = set(ids)
+        with self._lock:
+            keep = np.array([chunk_id not in doomed for chunk_id in self._ids], dtype=bool)
+            if keep.all():
+                return
+            size = len(self._ids)
+            self._ids = [chunk_id for chunk_id, kept in zip(self._ids, keep) if kept]
+            self._rows = {chunk_id: row for row, chunk_id in enumerate(self._ids)}
+            self._codes = self._codes[:size][keep]
+            self._scales = self._scales[:size][keep]
+            self._persist_rewrite()
+
+    def clear(self) -> None:
+        """Remove all vectors and their persisted files."""
+        with self._lock:
+            self._ids = []
+            self._rows = {}
+            self._dim = 0
+            self._codes = np.zeros((0, 0), dtype=self._dtype)
+            self._scales = np.zeros(0, dtype=np.float32)
+            self._persist_rewrite()
+
+    def refresh(self) -> bool:
+        """Reload the persisted vectors if another writer changed them.
+
+        Returns:
+            bool: True if the index was reloaded.
+        """
+        if not self._prefix:
+            return False
+        with self._lock:
+            if self._read_disk_state() == self._disk_state:
+                return False
+            self._ids = []
+            self._rows = {}
+            self._dim = 0
+            self._codes = np.zeros((0, 0), dtype=self._dtype)
+            self._scales = np.zeros(0, dtype=np.float32)
+            self._load()
+            return True
+
+    def search(self, query: np.ndarray, top_n: int) -> List[Tuple[str, float]]:
+        """Return the ``top_n`` ids by approximate inner product.
+
+        Args:
+            query: Float query vector.
+            top_n: Number of candidates.
+
+        Returns:
+            List[Tuple[str, float]]: (id, approximate score), best first.
+        """
+        with self._lock:
+            size = len(self._ids)
+            if not size or top_n <= 0:
+                return []
+            query = np.asarray(query, dtype=np.float32)
+            scores = np.empty(size, dtype=np.float32)
+            # Score in blocks so the float32 upcast never materializes the whole index.
+            for start in range(0, size, self._SCORE_BLOCK):
+                stop = min(size, start + self._SCORE_BLOCK)
+                scores[start:stop] = (self._codes[start:stop].astype(np.float32) @ query) * self._scales[start:stop]
+            top_n = min(top_n, size)
+            candidates = np.argpartition(-scores, top_n - 1)[:top_n]
+            ordered = candidates[np.argsort(-scores[candidates])]
+            return [(self._ids[row], float(scores[row])) for row in ordered]
+
+    def _append_rows(self, codes: np.ndarray, scales: np.ndarray) -> None:
+        """Append rows to the in-memory buffers, growing them geometrically."""
+        size = len(self._ids)
+        needed = size + codes.shape[0]
+        if self._codes.shape[0] < needed or self._codes.shape[1] != self._dim:
+            capacity = max(needed, 2 * self._codes.shape[0], 1024)
+            grown = np.zeros((capacity, self._dim), dtype=self._dtype)
+            grown[:size] = self._codes[:size].reshape(size, self._dim)
+            grown_scales = np.zeros(capacity, dtype=np.float32)
+            grown_scales[:size] = self._scales[:size]
+            self._codes, self._scales = grown, grown_scales
+        self._codes[size:needed] = codes
+        self._scales[size:needed] = scales
+
+    def _paths(self) -> Tuple[str, str, str, str]:
+        """Return the codes, scales, ids and dimension file paths."""
+        prefix = self._prefix
+        return f"{prefix}.codes", f"{prefix}.scales", f"{prefix}.ids", f"{prefix}.dim"
+
+    def _read_disk_state(self) -> Optional[Tuple[int, int]]:
+        """Return (size, mtime_ns) of the persisted ids file, or None if absent."""
+        try:
+            stat = os.stat(self._paths()[2])
+        except FileNotFoundError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _load(self) -> None:
+        """Load persisted vectors if present."""
+        if not self._prefix:
+            return
+        codes_path, scales_path, ids_path, dim_path = self._paths()
+        self._disk_state = self._read_disk_state()
+        if not os.path.exists(dim_path):
+            return
+        try:
+            with open(dim_path, "r", encoding="utf-8") as handle:
+                dim = int(handle.read().strip())
+            with open(ids_path, "r", encoding="utf-8") as handle:
+                ids = [line.rstrip("\n") for line in handle if line.strip()]
+            scales = np.fromfile(scales_path, dtype=np.float32)
+            codes = np.fromfile(codes_path, dtype=self._dtype)
+            # Ids are written last, so a torn batch is truncated to the ids that made it.
+            size = min(len(ids), scales.shape[0], codes.shape[0] // dim if dim else 0)
+            ids = ids[:size]
+            # Files written before re-adds replaced vectors may repeat an id; keep its last row.
+            last = {chunk_id: row for row, chunk_id in enumerate(ids)}
+            keep = sorted(last.values())
+            self._dim = dim
+            self._append_rows(codes[: size * dim].reshape(size, dim)[keep], scales[:size][keep])
+            self._ids = [ids[row] for row in keep]
+            self._rows = {chunk_id: row for row, chunk_id in enumerate(self._ids)}
+            if len(keep) < size:
+                self._persist_rewrite()
+            self._logger.info("Loaded %d %s vectors from %s", len(keep), self._mode, self._prefix)
+        except Exception as exc:
+            self._logger.exception("Failed to load quantized index %s: %s", self._prefix, exc)
+            raise
+
+    def _persist_append(self, ids: Sequence[str], codes: np.ndarray, scales: np.ndarray) -> None:
+        """Append new vectors to the persisted files (ids last)."""
+        if not self._prefix:
+            return
+        codes_path, scales_path, ids_path, dim_path = self._paths()
+        if not os.path.exists(dim_path):
+            with open(dim_path, "w", encoding="utf-8") as handle:
+                handle.write(str(self._dim))
+        with open(codes_path, "ab") as handle:
+            handle.write(np.ascontiguousarray(codes).tobytes())
+        with open(scales_path, "ab") as handle:
+            handle.write(np.ascontiguousarray(scales).tobytes())
+        with open(ids_path, "a", encoding="utf-8") as handle:
+            handle.writelines(f"{chunk_id}\n" for chunk_id in ids)
+        self._disk_state = self._read_disk_state()
+
+    def _persist_rewrite(self) -> None:
+        """Rewrite the persisted files from memory."""
+        if not self._prefix:
+            return
+        for path in self._paths():
+            if os.path.exists(path):
+                os.remove(path)
+        size = len(self._ids)
+        if size:
+            self._persist_append(self._ids, self._codes[:size], self._scales[:size])
+        else:
+            self._disk_state = None
@@ -0,0 +1,171 @@
+"""Two-tier (memory + SQLite) TTL cache for web search results."""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+SearchResults = List[Dict[str, Any]]
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query for cache lookup.
+
+    Applies NFKC (full-width to half-width), lowercases and collapses
+    whitespace, so trivially different rewrites share one entry.
+
+    Args:
+        query: Search query.
+
+    Returns:
+        str: Normalized query.
+    """
+    return " ".join(unicodedata.normalize("NFKC", query).lower().split())
+
+
+class SearchCache:
+    """TTL cache of search results keyed by normalized query and ``top_k``.
+
+    Entries are kept in an in-memory LRU and in a SQLite table, so they
+    survive restarts and are shared by processes using the same file. An entry
+    is fresh for ``ttl`` seconds; for another ``stale_ttl`` seconds it may
+    still be served while the caller refreshes it (stale-while-revalidate).
+
+    Args:
+        path: SQLite file path (None keeps the cache in memory only).
+        ttl: Seconds an entry is fresh.
+        stale_ttl: Extra seconds an expired entry may be served while refreshing.
+        max_entries: Entries kept in the in-memory tier.
+        clock: Time source (seconds).
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = 3600.0,
+        stale_ttl: float = 86400.0,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Open (and create) the cache.
+
+        Args:
+            path: SQLite file path (None keeps the cache in memory only).
+            ttl: Seconds an entry is fresh.
+            stale_ttl: Extra seconds an expired entry may be served while refreshing.
+            max_entries: Entries kept in the in-memory tier.
+            clock: Time source (seconds).
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._max_entries = max(1, max_entries)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[float, SearchResults]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.executescript(
+                """
+                PRAGMA journal_mode = WAL;
+                PRAGMA synchronous = NORMAL;
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    fetched_at REAL NOT NULL,
+                    results TEXT NOT NULL
+                );
+                """
+            )
+
+    @staticmethod
+    def key(query: str, top_k: int) -> str:
+        """Return the cache key of a query.
+
+        Args:
+            query: Search query.
+            top_k: Number of results requested.
+
+        Returns:
+            str: Cache key.
+        """
+        return f"{top_k}:{normalize_query(query)}"
+
+    def get(self, key: str) -> Tuple[Optional[SearchResults], bool]:
+        """Look up an entry.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            Tuple[Optional[SearchResults], bool]: Results (None on a miss or
+            when the entry is past its stale window) and whether they are
+            stale and should be refreshed.
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+        if entry is None and self._conn is not None:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT fetched_at, results FROM search_cache WHERE cache_key = ?", (key,)
+                ).fetchone()
+            if row is not None:
+                entry = (row[0], json.loads(row[1]))
+                self._remember(key, entry)
+        if entry is None:
+            return None, False
+        age = self._clock() - entry[0]
+        if age < self.ttl:
+            return entry[1], False
+        if age < self.ttl + self.stale_ttl:
+            return entry[1], True
+        return None, False
+
+    def put(self, key: str, results: SearchResults) -> None:
+        """Store results fetched now.
+
+        Args:
+            key: Cache key.
+            results: Search results (JSON-serializable dicts).
+        """
+        entry = (self._clock(), results)
+        self._remember(key, entry)
+        if self._conn is not None:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO search_cache (cache_key, fetched_at, results) VALUES (?, ?, ?)",
+                    (key, entry[0], json.dumps(results, ensure_ascii=False)),
+                )
+
+    def purge(self) -> int:
+        """Drop entries past their stale window from disk and memory.
+
+        Returns:
+            int: Number of disk entries removed.
+        """
+        cutoff = self._clock() - self.ttl - self.stale_ttl
+        with self._lock:
+            for key in [key for key, (fetched_at, _) in self._memory.items() if fetched_at < cutoff]:
+                del self._memory[key]
+            if self._conn is None:
+                return 0
+            with self._conn:
+                return self._conn.execute("DELETE FROM search_cache WHERE fetched_at < ?", (cutoff,)).rowcount
+
+    def _remember(self, key: str, entry: Tuple[float, SearchResults]) -> None:
+        """Insert into the in-memory LRU, evicting the oldest entry if full.
+
+        Args:
+            key: Cache key.
+            entry: (fetched_at, results).
+        """
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self._max_entries:
+                self._memory.popitem(last=False)
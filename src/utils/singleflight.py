@@ -0,0 +1,96 @@
+"""Single-flight deduplication of identical concurrent calls."""
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from .metrics import METRICS, Metrics
+
+
+class _Call:
+    """An in-flight call that followers wait on."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Share one execution among concurrent calls with the same key.
+
+    The first caller for a key (the leader) runs the function; callers
+    arriving while it runs wait and receive the same result or exception.
+    Nothing is cached: once the leader returns, the next call runs again.
+    Calls and shared calls are counted as ``singleflight.<name>.calls`` and
+    ``singleflight.<name>.shared``; the dedup rate is a gauge.
+
+    Args:
+        name: Metric name of the wrapped operation.
+        enabled: When False, ``do`` just calls the function.
+        metrics: Registry to record into.
+    """
+
+    def __init__(self, name: str, enabled: bool = True, metrics: Metrics = METRICS) -> None:
+        """Initialize the group.
+
+        Args:
+            name: Metric name of the wrapped operation.
+            enabled: When False, ``do`` just calls the function.
+            metrics: Registry to record into.
+        """
+        self.name = name
+        self.enabled = enabled
+        self._metrics = metrics
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._counts = {"calls": 0, "shared": 0}
+        metrics.register_gauge(f"singleflight.{name}.dedup_rate", self.dedup_rate)
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run ``fn(*args, **kwargs)`` once per key among concurrent callers.
+
+        Args:
+            key: Identity of the call (e.g. the prompt inputs).
+            fn: Function to run.
+            *args: Positional arguments.
+            **kwargs: Keyword arguments.
+
+        Returns:
+            Any: The function's result (shared with concurrent callers).
+
+        Raises:
+            BaseException: Whatever the leader's call raised.
+        """
+        if not self.enabled:
+            return fn(*args, **kwargs)
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            self._counts["calls"] += 1
+            if not leader:
+                self._counts["shared"] += 1
+        self._metrics.inc(f"singleflight.{self.name}.calls")
+        if not leader:
+            self._metrics.inc(f"singleflight.{self.name}.shared")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def dedup_rate(self) -> float:
+        """Return the share of calls that joined an in-flight call."""
+        with self._lock:
+            return self._counts["shared"] / self._counts["calls"] if self._counts["calls"] else 0.0
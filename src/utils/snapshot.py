@@ -0,0 +1,219 @@
+"""Versioned, checksummed columnar snapshot files for Chroma collections.
+
+Layout (little-endian)::
+
+    MAGIC
+    row group blocks: zlib-compressed columns, back to back
+    footer JSON (collections, row groups, column offsets/lengths/sha256)
+    footer length (u64) | footer sha256 (32 bytes) | MAGIC
+
+Each row group stores ``ids``, ``documents`` and ``metadatas`` as JSON arrays
+and ``embeddings`` as a raw float32 matrix, so export and import both stream
+one row group at a time and never call an embedding API.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+import time
+import zlib
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+
+import numpy as np
+from chromadb.api.models.Collection import Collection
+
+MAGIC = b"RCSNAP\r\n"
+FORMAT_VERSION = 1
+_TRAILER = struct.Struct("<Q32s")
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot is malformed, corrupted or incompatible."""
+
+
+def _write_block(handle: BinaryIO, payload: bytes) -> Dict[str, Any]:
+    """Compress and write one column block.
+
+    Args:
+        handle: Output file.
+        payload: Raw column bytes.
+
+    Returns:
+        Dict[str, Any]: Block descriptor (offset, length, sha256).
+    """
+    compressed = zlib.compress(payload, 6)
+    offset = handle.tell()
+    handle.write(compressed)
+    return {"offset": offset, "length": len(compressed), "sha256": hashlib.sha256(compressed).hexdigest()}
+
+
+def _read_block(handle: BinaryIO, block: Dict[str, Any]) -> bytes:
+    """Read, verify and decompress one column block.
+
+    Args:
+        handle: Snapshot file.
+        block: Block descriptor.
+
+    Returns:
+        bytes: Raw column bytes.
+
+    Raises:
+        SnapshotError: If the checksum does not match.
+    """
+    handle.seek(block["offset"])
+    compressed = handle.read(block["length"])
+    if hashlib.sha256(compressed).hexdigest() != block["sha256"]:
+        raise SnapshotError(f"Checksum mismatch in block at offset {block['offset']}")
+    return zlib.decompress(compressed)
+
+
+def write_snapshot(
+    path: str,
+    collections: Dict[str, Collection],
+    info: Optional[Dict[str, Any]] = None,
+    batch_size: int = 1000,
+) -> Dict[str, Any]:
+    """Export collections into a single snapshot file.
+
+    The file is written to ``<path>.tmp`` and atomically renamed.
+
+    Args:
+        path: Output path.
+        collections: Role name (e.g. "chunks") -> Chroma collection.
+        info: Extra metadata stored in the footer (e.g. embedding identity).
+        batch_size: Rows per row group.
+
+    Returns:
+        Dict[str, Any]: The footer that was written.
+    """
+    tmp_path = f"{path}.tmp"
+    footer: Dict[str, Any] = {
+        "format_version": FORMAT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "info": info or {},
+        "collections": [],
+    }
+    with open(tmp_path, "wb") as handle:
+        handle.write(MAGIC)
+        for role, collection in collections.items():
+            entry: Dict[str, Any] = {
+                "role": role,
+                "name": collection.name,
+                "metadata": collection.metadata or {},
+                "count": 0,
+                "dimension": 0,
+                "row_groups": [],
+            }
+            offset = 0
+            while True:
+                page = collection.get(
+                    include=["embeddings", "documents", "metadatas"], limit=batch_size, offset=offset
+                )
+                ids = list(page["ids"])
+                if not ids:
+                    break
+                embeddings = np.asarray(page["embeddings"], dtype="<f4")
+                entry["dimension"] = int(embeddings.shape[1])
+                entry["row_groups"].append(
+                    {
+                        "rows": len(ids),
+                        "ids": _write_block(handle, json.dumps(ids, ensure_ascii=False).encode("utf-8")),
+                        "documents": _write_block(
+                            handle, json.dumps(list(page["documents"]), ensure_ascii=False).encode("utf-8")
+                        ),
+                        "metadatas": _write_block(
+                            handle, json.dumps(list(page["metadatas"]), ensure_ascii=False).encode("utf-8")
+                        ),
+                        "embeddings": _write_block(handle, np.ascontiguousarray(embeddings).tobytes()),
+                    }
+                )
+                entry["count"] += len(ids)
+                offset += len(ids)
+            footer["collections"].append(entry)
+        footer_bytes = json.dumps(footer, ensure_ascii=False).encode("utf-8")
+        handle.write(footer_bytes)
+        handle.write(_TRAILER.pack(len(footer_bytes), hashlib.sha256(footer_bytes).digest()))
+        handle.write(MAGIC)
+    os.replace(tmp_path, path)
+    return footer
+
+
+def read_snapshot_footer(path: str) -> Dict[str, Any]:
+    """Read and verify a snapshot footer.
+
+    Args:
+        path: Snapshot path.
+
+    Returns:
+        Dict[str, Any]: Footer with collections and row group descriptors.
+
+    Raises:
+        SnapshotError: If the file is not a valid snapshot of a supported version.
+    """
+    with open(path, "rb") as handle:
+        if handle.read(len(MAGIC)) != MAGIC:
+            raise SnapshotError(f"{path} is not a Rail-CRAG snapshot")
+        handle.seek(-(len(MAGIC) + _TRAILER.size), os.SEEK_END)
+        footer_length, footer_sha = _TRAILER.unpack(handle.read(_TRAILER.size))
+        if handle.read(len(MAGIC)) != MAGIC:
+            raise SnapshotError(f"{path} is truncated")
+        handle.seek(-(len(MAGIC) + _TRAILER.size + footer_length), os.SEEK_END)
+        footer_bytes = handle.read(footer_length)
+    if hashlib.sha256(footer_bytes).digest() != footer_sha:
+        raise SnapshotError(f"{path} footer checksum mismatch")
+    footer = json.loads(footer_bytes.decode("utf-8"))
+    if footer.get("format_version") != FORMAT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot version: {footer.get('format_version')}")
+    return footer
+
+
+def verify_snapshot(path: str, footer: Dict[str, Any]) -> None:
+    """Check every column block against its checksum without decoding it.
+
+    Importers call this before writing anything, so a corrupt block cannot
+    leave a partial import behind.
+
+    Args:
+        path: Snapshot path.
+        footer: Footer returned by ``read_snapshot_footer``.
+
+    Raises:
+        SnapshotError: If a block is truncated or its checksum does not match.
+    """
+    columns = ("ids", "documents", "metadatas", "embeddings")
+    with open(path, "rb") as handle:
+        for entry in footer["collections"]:
+            for group in entry["row_groups"]:
+                for column in columns:
+                    block = group[column]
+                    handle.seek(block["offset"])
+                    compressed = handle.read(block["length"])
+                    if len(compressed) != block["length"]:
+                        raise SnapshotError(f"Truncated block at offset {block['offset']}")
+                    if hashlib.sha256(compressed).hexdigest() != block["sha256"]:
+                        raise SnapshotError(f"Checksum mismatch in block at offset {block['offset']}")
+
+
+def iter_snapshot_rows(path: str, collection_entry: Dict[str, Any]) -> Iterator[Dict[str, List[Any]]]:
+    """Yield the row groups of one collection in a snapshot.
+
+    Args:
+        path: Snapshot path.
+        collection_entry: Collection entry from the footer.
+
+    Yields:
+        Dict[str, List[Any]]: ``ids``, ``documents``, ``metadatas`` and
+        ``embeddings`` (float32 matrix) of one row group.
+    """
+    dimension = collection_entry["dimension"]
+    with open(path, "rb") as handle:
+        for group in collection_entry["row_groups"]:
+            embeddings = np.frombuffer(_read_block(handle, group["embeddings"]), dtype="<f4")
+            yield {
+                "ids": json.loads(_read_block(handle, group["ids"])),
+                "documents": json.loads(_read_block(handle, group["documents"])),
+                "metadatas": json.loads(_read_block(handle, group["metadatas"])),
+                "embeddings": embeddings.reshape(group["rows"], dimension),
+            }
@@ -0,0 +1,372 @@
+"""SQLite index from source names to chunk ids and source versions."""
+from __future__ import annotations
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple
+
+
+class SourceIndex:
+    """Maps each source to its chunk ids so sources can be deleted or replaced
+    without scanning the collection.
+
+    Tables:
+
+    - ``source_chunks``: chunk id -> (source, version) for stored chunks.
+    - ``source_alternates``: (source, chunk id) for chunks that list the source
+      in ``alternate_sources`` (its near-duplicates collapsed into them).
+    - ``source_duplicates``: collapsed chunk id -> (source, version, canonical
+      chunk id) for chunks collapsed into another source's chunk, so a stale
+      collapsed chunk can release its canonical one.
+    - ``source_versions``: the active version of a source and, while a
+      replace is in flight, the pending one with the replacing process
+      (``host:pid``) and its last heartbeat.
+
+    Args:
+        path: SQLite file path (``":memory:"`` for a throwaway index).
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+        """Open (and create) the index.
+
+        Args:
+            path: SQLite file path.
+        """
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS source_chunks (
+                chunk_id TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                version INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS source_chunks_source ON source_chunks (source, version);
+            CREATE TABLE IF NOT EXISTS source_alternates (
+                source TEXT NOT NULL,
+                chunk_id TEXT NOT NULL,
+                PRIMARY KEY (source, chunk_id)
+            );
+            CREATE INDEX IF NOT EXISTS source_alternates_chunk ON source_alternates (chunk_id);
+            CREATE TABLE IF NOT EXISTS source_duplicates (
+                chunk_id TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                version INTEGER NOT NULL DEFAULT 0,
+                canonical_id TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS source_duplicates_canonical ON source_duplicates (source, canonical_id);
+            CREATE TABLE IF NOT EXISTS source_versions (
+                source TEXT PRIMARY KEY,
+                active_version INTEGER NOT NULL,
+                pending_version INTEGER,
+                owner TEXT,
+                heartbeat REAL
+            );
+            -- Searches read the pending rows on every query; keep that lookup off a table scan.
+            CREATE INDEX IF NOT EXISTS source_versions_pending ON source_versions (source)
+                WHERE pending_version IS NOT NULL;
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(source_versions)")}
+        with self._conn:
+            # Indexes created before replace leases were recorded.
+            for column, kind in (("owner", "TEXT"), ("heartbeat", "REAL")):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE source_versions ADD COLUMN {column} {kind}")
+
+    def count(self) -> int:
+        """Return the number of indexed chunks."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM source_chunks").fetchone()[0]
+
+    def add(self, entries: Iterable[Tuple[str, str, int]]) -> None:
+        """Record (or move) chunks.
+
+        Args:
+            entries: (chunk_id, source, version) triples.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO source_chunks (chunk_id, source, version) VALUES (?, ?, ?)", list(entries)
+            )
+
+    def remove(self, chunk_ids: Iterable[str]) -> None:
+        """Forget chunks, their alternate-source entries and the duplicates collapsed into them.
+
+        Args:
+            chunk_ids: Chunk ids.
+        """
+        ids = [(chunk_id,) for chunk_id in chunk_ids]
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM source_chunks WHERE chunk_id = ?", ids)
+            self._conn.executemany("DELETE FROM source_alternates WHERE chunk_id = ?", ids)
+            self._conn.executemany("DELETE FROM source_duplicates WHERE canonical_id = ?", ids)
+
+    def chunk_ids(self, source: str, exclude_version: Optional[int] = None) -> List[str]:
+        """Return the chunk ids of a source.
+
+        Args:
+            source: Source name.
+            exclude_version: Skip chunks of this version.
+
+        Returns:
+            List[str]: Chunk ids.
+        """
+        with self._lock:
+            if exclude_version is None:
+                rows = self._conn.execute("SELECT chunk_id FROM source_chunks WHERE source = ?", (source,))
+            else:
+                rows = self._conn.execute(
+                    "SELECT chunk_id FROM source_chunks WHERE source = ? AND version != ?", (source, exclude_version)
+                )
+            return [row[0] for row in rows.fetchall()]
+
+    def add_alternates(self, entries: Iterable[Tuple[str, str]]) -> None:
+        """Record chunks that list a source in ``alternate_sources``.
+
+        Args:
+            entries: (source, chunk_id) pairs.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO source_alternates (source, chunk_id) VALUES (?, ?)", list(entries)
+            )
+
+    def alternate_chunk_ids(self, source: str) -> List[str]:
+        """Return ids of chunks that list a source in ``alternate_sources``.
+
+        Args:
+            source: Source name.
+
+        Returns:
+            List[str]: Chunk ids.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT chunk_id FROM source_alternates WHERE source = ?", (source,))
+            return [row[0] for row in rows.fetchall()]
+
+    def remove_alternates(self, source: str, chunk_ids: Iterable[str]) -> None:
+        """Forget alternate-source entries of a source.
+
+        Args:
+            source: Source name.
+            chunk_ids: Chunk ids.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM source_alternates WHERE source = ? AND chunk_id = ?",
+                [(source, chunk_id) for chunk_id in chunk_ids],
+            )
+
+    def add_duplicates(self, entries: Iterable[Tuple[str, str, int, str]]) -> None:
+        """Record chunks collapsed into another source's chunk.
+
+        Args:
+            entries: (chunk_id, source, version, canonical_id) tuples.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO source_duplicates (chunk_id, source, version, canonical_id) "
+                "VALUES (?, ?, ?, ?)",
+                list(entries),
+            )
+
+    def pop_duplicates(self, chunk_ids: Iterable[str]) -> List[Tuple[str, str]]:
+        """Forget collapsed chunks and return what they were collapsed into.
+
+        Args:
+            chunk_ids: Collapsed chunk ids (unknown ids are ignored).
+
+        Returns:
+            List[Tuple[str, str]]: Distinct (source, canonical_id) pairs.
+        """
+        ids = [(chunk_id,) for chunk_id in chunk_ids]
+        pairs = set()
+        with self._lock, self._conn:
+            for (chunk_id,) in ids:
+                row = self._conn.execute(
+                    "SELECT source, canonical_id FROM source_duplicates WHERE chunk_id = ?", (chunk_id,)
+                ).fetchone()
+                if row is not None:
+                    pairs.add((row[0], row[1]))
+            self._conn.executemany("DELETE FROM source_duplicates WHERE chunk_id = ?", ids)
+        return sorted(pairs)
+
+    def has_duplicates(self, source: str, canonical_id: str) -> bool:
+        """Return whether a source still has chunks collapsed into a canonical chunk.
+
+        Args:
+            source: Source name.
+            canonical_id: Canonical chunk id.
+
+        Returns:
+            bool: True if at least one collapsed chunk remains.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM source_duplicates WHERE source = ? AND canonical_id = ? LIMIT 1", (source, canonical_id)
+            ).fetchone()
+        return row is not None
+
+    def remove_duplicates(self, source: str, exclude_version: Optional[int] = None) -> None:
+        """Forget the collapsed chunks of a source.
+
+        Args:
+            source: Source name.
+            exclude_version: Keep collapsed chunks of this version.
+        """
+        with self._lock, self._conn:
+            if exclude_version is None:
+                self._conn.execute("DELETE FROM source_duplicates WHERE source = ?", (source,))
+            else:
+                self._conn.execute(
+                    "DELETE FROM source_duplicates WHERE source = ? AND version != ?", (source, exclude_version)
+                )
+
+    def active_version(self, source: str) -> int:
+        """Return the version readers should see for a source (0 if never replaced).
+
+        Args:
+            source: Source name.
+
+        Returns:
+            int: Active version.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT active_version FROM source_versions WHERE source = ?", (source,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def begin_replace(self, source: str) -> Tuple[int, int]:
+        """Reserve a new version for a source and mark the replace as pending.
+
+        The calling process is recorded as the owner, with a heartbeat that
+        ``heartbeat`` refreshes while the replace runs.
+
+        Args:
+            source: Source name.
+
+        Returns:
+            Tuple[int, int]: (active version, new version).
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT active_version FROM source_versions WHERE source = ?", (source,)
+            ).fetchone()
+            active = row[0] if row else 0
+            newest = self._conn.execute(
+                "SELECT COALESCE(MAX(version), 0) FROM source_chunks WHERE source = ?", (source,)
+            ).fetchone()[0]
+            version = max(active, newest) + 1
+            self._conn.execute(
+                "INSERT OR REPLACE INTO source_versions "
+                "(source, active_version, pending_version, owner, heartbeat) VALUES (?, ?, ?, ?, ?)",
+                (source, active, version, _process_id(), time.time()),
+            )
+        return active, version
+
+    def heartbeat(self, source: str) -> None:
+        """Refresh the lease of a replace owned by this process.
+
+        Args:
+            source: Source name.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE source_versions SET heartbeat = ? WHERE source = ? AND pending_version IS NOT NULL",
+                (time.time(), source),
+            )
+
+    def activate(self, source: str, version: int) -> None:
+        """Make a version the active one (the pending marker stays until ``finish_replace``).
+
+        Args:
+            source: Source name.
+            version: Version to activate.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE source_versions SET active_version = ? WHERE source = ?", (version, source))
+
+    def finish_replace(self, source: str) -> None:
+        """Clear the pending marker of a source.
+
+        Args:
+            source: Source name.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE source_versions SET pending_version = NULL, owner = NULL, heartbeat = NULL WHERE source = ?",
+                (source,),
+            )
+
+    def pending(self) -> List[Tuple[str, int]]:
+        """Return sources whose replace has not finished (in flight or interrupted).
+
+        Readers hide every version of these sources except the active one.
+
+        Returns:
+            List[Tuple[str, int]]: (source, active version) pairs.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, active_version FROM source_versions WHERE pending_version IS NOT NULL"
+            )
+            return [(row[0], row[1]) for row in rows.fetchall()]
+
+    def abandoned(self, lease: float) -> List[Tuple[str, int]]:
+        """Return pending replaces whose owner died or stopped heart-beating.
+
+        A replace is abandoned when its owner is a process on this host that
+        no longer exists, or when its heartbeat is older than ``lease``
+        seconds (owners on other hosts cannot be probed). Replaces of live
+        processes, including this one, are left alone.
+
+        Args:
+            lease: Seconds without a heartbeat after which a replace is abandoned.
+
+        Returns:
+            List[Tuple[str, int]]: (source, active version) pairs.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, active_version, owner, heartbeat FROM source_versions "
+                "WHERE pending_version IS NOT NULL"
+            ).fetchall()
+        now = time.time()
+        return [
+            (source, active)
+            for source, active, owner, beat in rows
+            if beat is None or now - beat > lease or not _owner_alive(owner)
+        ]
+
+
+def _process_id() -> str:
+    """Return this process as ``host:pid``."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _owner_alive(owner: Optional[str]) -> bool:
+    """Return whether a replace owner may still be running.
+
+    Args:
+        owner: ``host:pid`` recorded by ``begin_replace``.
+
+    Returns:
+        bool: False only for a process on this host that no longer exists.
+    """
+    host, _, pid = (owner or "").rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
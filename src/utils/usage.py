@@ -0,0 +1,92 @@
+"""Per-task accounting of LLM calls and tokens."""
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional
+
+from .metrics import METRICS, Metrics
+
+_CURRENT: ContextVar[Optional["UsageTally"]] = ContextVar("llm_usage", default=None)
+
+
+@dataclass
+class UsageTally:
+    """LLM calls and tokens recorded while a tally is active.
+
+    Args:
+        calls: Completed LLM calls.
+        prompt_tokens: Prompt tokens reported by the API.
+        completion_tokens: Completion tokens reported by the API.
+    """
+
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @property
+    def total_tokens(self) -> int:
+        """Return prompt plus completion tokens."""
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, prompt_tokens: int, completion_tokens: int) -> None:
+        """Count one call.
+
+        Args:
+            prompt_tokens: Prompt tokens of the call.
+            completion_tokens: Completion tokens of the call.
+        """
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+
+@contextmanager
+def track_usage() -> Iterator[UsageTally]:
+    """Collect the LLM usage of the current task.
+
+    Calls recorded in this context, and in threads started with a copy of
+    it (``contextvars.copy_context``), are added to the yielded tally.
+
+    Yields:
+        UsageTally: Tally filled while the block runs.
+    """
+    tally = UsageTally()
+    token = _CURRENT.set(tally)
+    try:
+        yield tally
+    finally:
+        _CURRENT.reset(token)
+
+
+def record_usage(name: str, response: Any, metrics: Metrics = METRICS) -> None:
+    """Record one LLM call and the token usage its response reports.
+
+    Understands OpenAI responses (``usage.prompt_tokens``) and LangChain
+    messages (``usage_metadata["input_tokens"]``); responses without usage
+    count as a call with zero tokens.
+
+    Args:
+        name: Calling component, used in metric names.
+        response: API response or chat message.
+        metrics: Registry to record into.
+    """
+    prompt_tokens = completion_tokens = 0
+    usage = getattr(response, "usage", None)
+    metadata = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    elif metadata:
+        prompt_tokens = metadata.get("input_tokens", 0) or 0
+        completion_tokens = metadata.get("output_tokens", 0) or 0
+    metrics.inc(f"llm.{name}.calls")
+    metrics.inc(f"llm.{name}.prompt_tokens", prompt_tokens)
+    metrics.inc(f"llm.{name}.completion_tokens", completion_tokens)
+    tally = _CURRENT.get()
+    if tally is not None:
+        tally.add(prompt_tokens, completion_tokens)
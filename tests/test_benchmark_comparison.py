@@ -0,0 +1,56 @@
+"""Tests for the dataset-driven CRAG vs Standard RAG benchmark."""
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.evaluation.benchmark_comparison import BenchmarkRunner, parquet_available, summarize, write_results
+from src.evaluation.stub_server import start_stub_server
+from src.ingestion.mineru_parser import MarkdownHierarchySplitter
+
+
+def test_parallel_benchmark_records_timings_and_usage(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """Runs against the stand-in APIs attribute LLM calls and tokens to each question."""
+    stub = start_stub_server()
+    try:
+        monkeypatch.setenv("OPENAI_API_KEY", "stub")
+        monkeypatch.setenv("OPENAI_BASE_URL", f"{stub.base_url}/v1")
+        monkeypatch.setenv("TAVILY_API_KEY", "stub")
+        monkeypatch.setenv("TAVILY_BASE_URL", stub.base_url)
+        monkeypatch.setenv("CHROMA_PERSIST_DIR", str(tmp_path / "chroma"))
+        runner = BenchmarkRunner()
+        with open("data/sample_standard.md", encoding="utf-8") as handle:
+            runner._vector_store.add_chunks(MarkdownHierarchySplitter().parse(handle.read()), source_name="sample.md")
+
+        questions = [f"标准轨距是多少？({i})" for i in range(4)]
+        df = runner.compare(questions, parallelism=4)
+    finally:
+        stub.shutdown()
+        stub.server_close()
+
+    assert list(df["question"]) == [q for q in questions for _ in range(2)]
+    assert list(df["method"]) == ["Standard RAG", "CRAG"] * 4
+    standard, crag = df[df["method"] == "Standard RAG"], df[df["method"] == "CRAG"]
+    assert (standard["llm_calls"] == 1).all()
+    assert (crag["llm_calls"] > 1).all()
+    assert (df["total_tokens"] == df["prompt_tokens"] + df["completion_tokens"]).all()
+    assert (crag["total_tokens"] > standard["total_tokens"].max()).all()
+    assert crag[["node.retrieve", "node.evaluate", "node.generate"]].notna().all().all()
+    assert (df["latency"] >= df.filter(like="node.").sum(axis=1) * 0.9).all()
+    assert list(summarize(df)["questions"]) == [4, 4]
+
+
+def test_write_results_formats(tmp_path: Path) -> None:
+    """JSONL and CSV are written as asked; Parquet without an engine is an error, not a CSV."""
+    df = pd.DataFrame([{"question": "轨距？", "method": "CRAG", "latency": 0.5, "node.generate": 0.2}])
+    assert pd.read_json(write_results(df, str(tmp_path / "r.jsonl")), lines=True)["latency"][0] == 0.5
+    assert pd.read_csv(write_results(df, str(tmp_path / "r.csv")))["node.generate"][0] == 0.2
+    target = str(tmp_path / "out" / "r.parquet")
+    if parquet_available():
+        assert pd.read_parquet(write_results(df, target))["question"][0] == "轨距？"
+    else:
+        with pytest.raises(ImportError, match="pyarrow"):
+            write_results(df, target)
+        assert not (tmp_path / "out" / "r.csv").exists()
@@ -0,0 +1,45 @@
+"""Regression gate for the CPU hot path micro-benchmarks."""
+from __future__ import annotations
+
+from src.evaluation.benchmark_hotpaths import (
+    SIZES,
+    HotPathResult,
+    find_regressions,
+    hot_path_cases,
+    load_baseline,
+    run_benchmarks,
+    synthetic_standard,
+)
+from src.ingestion.mineru_parser import MarkdownHierarchySplitter
+
+
+def test_synthetic_standard_is_deterministic_and_structured() -> None:
+    """The same seed gives the same document, with headings, clauses and a table."""
+    document = synthetic_standard(30, seed=1)
+    assert document == synthetic_standard(30, seed=1) != synthetic_standard(30, seed=2)
+    assert document.startswith("# ") and "\n## 2 " in document and "\n### 1.1 " in document
+    assert "| 项目 | 一般值 | 困难值 | 依据 |" in document
+    paths = {chunk.metadata["path"] for chunk in MarkdownHierarchySplitter().parse(document)}
+    assert len(paths) > 5
+
+
+def test_baseline_covers_every_case() -> None:
+    """Every benchmark case at every size has a stored baseline."""
+    baseline = load_baseline()
+    for size in SIZES:
+        for name, _, _ in hot_path_cases(size):
+            assert baseline.get(name, 0) > 0, name
+
+
+def test_find_regressions_applies_the_tolerance() -> None:
+    """Only cases slower than baseline beyond the tolerance are reported; new cases pass."""
+    results = [HotPathResult("a", 1, 1, 0.7), HotPathResult("b", 1, 1, 0.8), HotPathResult("new", 1, 1, 1.0)]
+    regressions = find_regressions(results, {"a": 1.0, "b": 1.0}, tolerance=0.25)
+    assert [regression.name for regression in regressions] == ["a"]
+    assert regressions[0].ratio == 0.7
+
+
+def test_small_documents_do_not_regress() -> None:
+    """Quick run of the small cases against the stored baseline (loose tolerance for noisy hosts)."""
+    _, results = run_benchmarks(["small"], min_time=0.05, rounds=3, runs=3)
+    assert find_regressions(results, load_baseline(), tolerance=0.5) == []
@@ -0,0 +1,50 @@
+"""Tests for NDJSON bulk ingestion."""
+from __future__ import annotations
+
+import json
+
+from src.components.vector_store import VectorStore
+from src.config import load_settings
+from src.ingestion.bulk import BulkIngestor
+
+
+def test_bulk_ingest_handles_split_blocks_and_bad_records(tmp_path, monkeypatch) -> None:
+    """Records split across blocks are reassembled; bad lines are reported."""
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+    monkeypatch.setenv("CHROMA_PERSIST_DIR", str(tmp_path / "chroma"))
+    store = VectorStore(load_settings(), logger=None)
+    records = [
+        {"source_name": "a.md", "markdown_content": "# 1 总则\n路基面宽度应根据铁路等级确定。\n## 1.1 范围\n适用于客货共线铁路。"},
+        {"source_name": "b.md", "markdown_content": "# 2 接触网\n接触网动态接触力应满足受电弓要求。"},
+    ]
+    body = (json.dumps(records[0], ensure_ascii=False) + "\n{not json}\n\n" + json.dumps(records[1], ensure_ascii=False))
+    data = body.encode("utf-8")
+
+    bulk = BulkIngestor(store)
+    for start in range(0, len(data), 7):
+        bulk.feed(data[start : start + 7])
+    report = bulk.close()
+
+    assert report["sources"] == {"a.md": 2, "b.md": 1}
+    assert report["chunks_added"] == 3
+    assert report["records"] == 2
+    assert report["status"] == "partial"
+    assert [error["line"] for error in report["errors"]] == [2]
+
+
+def test_bulk_ingest_reports_failed_upserts(tmp_path, monkeypatch) -> None:
+    """A record whose chunks cannot be upserted is an error, not a zero-chunk success."""
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+    monkeypatch.setenv("CHROMA_PERSIST_DIR", str(tmp_path / "chroma"))
+    store = VectorStore(load_settings(), logger=None)
+
+    def broken_embed(texts):
+        raise RuntimeError("embedding service down")
+
+    monkeypatch.setattr(store, "_embed", broken_embed)
+    bulk = BulkIngestor(store)
+    bulk.feed(json.dumps({"source_name": "a.md", "markdown_content": "# 1 总则\n路基面宽度。"}, ensure_ascii=False).encode())
+    report = bulk.close()
+
+    assert report["sources"] == {}
+    assert report["errors"] == [{"line": 1, "source_name": "a.md", "error": "embedding service down"}]
@@ -0,0 +1,42 @@
+"""Tests for the token-aware ContextPacker."""
+from __future__ import annotations
+
+from src.components.context import ContextItem, ContextPacker, get_token_counter
+from src.utils.tokens import estimate_tokens
+
+
+def test_pack_orders_by_score_dedupes_and_keeps_headers() -> None:
+    """Higher scores come first, overlapping strips are dropped, headers are kept."""
+    items = [
+        ContextItem("路基填料分为A、B、C组。", score=0.2, source="https://example.com", path="填料"),
+        ContextItem("路基面宽度不应小于7.7m。", score=0.9, source="TB10001.md", path="3 路基 > 3.2 宽度"),
+        ContextItem("路基面宽度不应小于7.7m", score=0.5, source="https://example.org"),
+        ContextItem("   ", score=1.0),
+    ]
+    packed = ContextPacker().pack(items)
+    assert packed.text == (
+        "[TB10001.md | 3 路基 > 3.2 宽度]\n路基面宽度不应小于7.7m。\n\n[https://example.com | 填料]\n路基填料分为A、B、C组。"
+    )
+    assert packed.duplicates == 1
+    assert packed.tokens_used == estimate_tokens(packed.text)
+    assert packed.tokens_dropped == 0
+
+
+def test_pack_respects_budget_and_reports_dropped_tokens() -> None:
+    """Items that do not fit are skipped; a smaller later item may still fill the gap."""
+    items = [
+        ContextItem("甲" * 10, score=0.9),
+        ContextItem("乙" * 30, score=0.8),
+        ContextItem("丙" * 5, score=0.1),
+    ]
+    packed = ContextPacker(max_tokens=20).pack(items)
+    assert [item.content for item in packed.items] == ["甲" * 10, "丙" * 5]
+    assert packed.tokens_used <= 20
+    assert packed.dropped == 1
+    assert packed.tokens_dropped == 30 + estimate_tokens("\n\n")
+
+
+def test_token_counter_works_offline() -> None:
+    """The counter uses tiktoken when its encoding loads and the heuristic otherwise."""
+    counter = get_token_counter("gpt-4o")
+    assert counter("路基面宽度") > 0
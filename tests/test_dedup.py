@@ -0,0 +1,32 @@
+"""Tests for MinHash LSH near-duplicate detection."""
+from __future__ import annotations
+
+from src.ingestion.dedup import NearDuplicateIndex, merge_alternate_sources
+
+SCOPE = (
+    "本标准规定了铁路机车车辆限界的基本要求、检测方法和判定规则。"
+    "本标准适用于标准轨距铁路新造和大修后的机车车辆，其他轨距铁路可参照执行。"
+)
+
+
+def test_near_duplicate_is_found_and_distinct_text_is_not() -> None:
+    """Boilerplate with a small edit matches; unrelated text does not."""
+    index = NearDuplicateIndex(threshold=0.7)
+    index.add("canonical", index.signature(SCOPE))
+    edited = SCOPE.replace("大修后", "大修以后")
+    assert index.find_duplicate(index.signature(edited)) == "canonical"
+    assert index.find_duplicate(index.signature("接触网吊柱安装位置应按照设计图纸进行校核。")) is None
+
+
+def test_removed_chunks_are_forgotten() -> None:
+    """Removing a canonical chunk removes it from LSH lookups."""
+    index = NearDuplicateIndex()
+    index.add("canonical", index.signature(SCOPE))
+    index.remove(["canonical"])
+    assert index.find_duplicate(index.signature(SCOPE)) is None
+
+
+def test_merge_alternate_sources_skips_canonical_and_repeats() -> None:
+    """Alternate sources are de-duplicated and exclude the canonical source."""
+    merged = merge_alternate_sources("b.md", ["a.md", "c.md", "b.md", "c.md"], canonical_source="a.md")
+    assert merged == "b.md; c.md"
@@ -0,0 +1,33 @@
+"""Tests for SimpleHashEmbeddingFunction."""
+from __future__ import annotations
+
+import numpy as np
+
+from src.utils.chroma_store import SimpleHashEmbeddingFunction
+
+
+def test_hash_embedding_batch_shape_and_norm() -> None:
+    """Batch output is one normalized float32 matrix; empty text stays zero."""
+    embedder = SimpleHashEmbeddingFunction(dimensions=64)
+    matrix = embedder.embed_batch(["路基面宽度", "TB 10621 高速铁路设计规范", ""])
+    assert matrix.shape == (3, 64)
+    assert matrix.dtype == np.float32
+    assert np.allclose(np.linalg.norm(matrix[:2], axis=1), 1.0, atol=1e-5)
+    assert not matrix[2].any()
+
+
+def test_hash_embedding_is_batch_independent_and_cjk_aware() -> None:
+    """Embeddings do not depend on batch neighbours and separate CJK texts."""
+    embedder = SimpleHashEmbeddingFunction(dimensions=256)
+    texts = ["路基面宽度应根据铁路等级确定", "路基宽度", "接触网动态接触力"]
+    batch = embedder.embed_batch(texts)
+    single = np.vstack([embedder.embed_batch([text]) for text in texts])
+    assert np.allclose(batch, single)
+    assert float(batch[1] @ batch[0]) > float(batch[1] @ batch[2])
+
+
+def test_hash_embedding_folds_full_width_forms() -> None:
+    """Full-width and ASCII spellings of an identifier embed identically."""
+    embedder = SimpleHashEmbeddingFunction(dimensions=128)
+    full, ascii_ = embedder.embed_batch(["ＴＢ／Ｔ　１０６２１", "tb/t  10621"])
+    assert np.allclose(full, ascii_)
@@ -0,0 +1,19 @@
+"""Tests for the retrieval evaluator's local scoring."""
+from __future__ import annotations
+
+from dataclasses import replace
+
+from src.components.evaluator import RetrievalEvaluator
+from src.config import load_settings
+
+
+def test_lexical_scores_rank_unspaced_chinese_by_term_coverage() -> None:
+    """Web snippets are ranked by how many query bigrams and words they contain."""
+    evaluator = RetrievalEvaluator(replace(load_settings(require_keys=False), openai_api_key=""))
+    scores = evaluator.lexical_scores(
+        "高速铁路路基面宽度 TB 10001",
+        ["高速铁路路基面宽度应符合TB 10001规定。", "普通铁路路基宽度。", "隧道衬砌厚度要求。"],
+    )
+    assert scores[0].score == 1.0
+    assert -1.0 < scores[1].score < scores[0].score
+    assert scores[2].score == -1.0
@@ -0,0 +1,61 @@
+"""Tests for hedged LLM calls with adaptive timeouts."""
+from __future__ import annotations
+
+import itertools
+import time
+
+import pytest
+
+from src.utils.hedging import HedgePolicy
+from src.utils.metrics import Metrics
+
+
+def _warm(policy: HedgePolicy, seconds: float = 0.01) -> None:
+    for _ in range(policy.min_samples):
+        policy.call(time.sleep, seconds)
+
+
+def test_slow_call_is_hedged_and_the_fast_duplicate_wins() -> None:
+    """Past the observed p95 a duplicate is fired; its answer is returned first."""
+    metrics = Metrics()
+    policy = HedgePolicy("test", min_samples=10, timeout_floor=0.5, timeout_ceiling=5, metrics=metrics)
+    assert policy.hedge_delay() is None
+    _warm(policy)
+    assert 0.005 < policy.hedge_delay() < 0.2
+
+    attempts = itertools.count()
+
+    def flaky() -> str:
+        if next(attempts) == 0:
+            time.sleep(0.6)
+            return "slow"
+        return "fast"
+
+    started = time.perf_counter()
+    assert policy.call(flaky) == "fast"
+    assert time.perf_counter() - started < 0.4
+    time.sleep(0.7)
+    counters = metrics.snapshot()["counters"]
+    assert counters["hedge.test.hedged"] == 1
+    assert counters["hedge.test.hedge_wins"] == 1
+    assert counters["hedge.test.saved_seconds"] > 0.3
+
+
+def test_adaptive_timeout_bounds_the_wait() -> None:
+    """Once warmed up, calls far above the usual latency time out."""
+    policy = HedgePolicy("timeouts", min_samples=10, timeout_floor=0.2, timeout_ceiling=5, metrics=Metrics())
+    assert policy.timeout() == 5
+    _warm(policy)
+    assert policy.timeout() == pytest.approx(0.2)
+    started = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        policy.call(time.sleep, 1.0)
+    assert time.perf_counter() - started < 0.6
+
+
+def test_disabled_policy_calls_directly() -> None:
+    """With hedging off the function runs in the caller's thread, once."""
+    metrics = Metrics()
+    policy = HedgePolicy("off", enabled=False, metrics=metrics)
+    assert policy.call(lambda value: value * 2, 21) == 42
+    assert metrics.snapshot()["counters"] == {}
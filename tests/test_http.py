@@ -0,0 +1,63 @@
+"""Tests for the shared, instrumented HTTP client."""
+from __future__ import annotations
+
+import threading
+from dataclasses import replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.components.evaluator import RetrievalEvaluator
+from src.components.generator import AnswerGenerator
+from src.components.rewriter import QueryRewriter
+from src.config import load_settings
+from src.utils.http import shared_http_client
+from src.utils.metrics import METRICS
+
+
+class _Ok(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def test_components_share_one_client() -> None:
+    """Evaluator, rewriter, generator and embeddings use the same pooled client."""
+    settings = replace(load_settings(), openai_api_key="sk-test", http_max_connections=7)
+    client = shared_http_client(settings)
+    assert shared_http_client(replace(settings, gen_model="other")) is client
+    assert shared_http_client(replace(settings, http_max_connections=8)) is not client
+    assert RetrievalEvaluator(settings)._llm.http_client is client
+    assert QueryRewriter(settings)._client._client is client
+    assert AnswerGenerator(settings)._client._client is client
+
+
+def test_transport_records_requests_and_pool_utilization() -> None:
+    """Requests are counted and timed; keep-alive leaves one idle pooled connection."""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Ok)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    try:
+        client = shared_http_client(replace(load_settings(), http_max_connections=9))
+        before = METRICS.snapshot()["counters"].get("http.requests", 0)
+        for _ in range(3):
+            assert client.get(f"http://127.0.0.1:{httpd.server_address[1]}/").text == "ok"
+        snapshot = METRICS.snapshot()
+        assert snapshot["counters"]["http.requests"] - before == 3
+        assert snapshot["latency"]["http.request"]["count"] >= 3
+        pool = client._transport.pool_stats()
+        assert pool == {
+            "inflight": 0,
+            "connections": 1,
+            "idle": 1,
+            "active": 0,
+            "max_connections": 9,
+            "utilization": 0.0,
+        }
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
@@ -0,0 +1,151 @@
+"""Tests for multi-file markdown ingestion."""
+from __future__ import annotations
+
+from dataclasses import replace
+
+import pytest
+
+from src.components.vector_store import VectorStore
+from src.config import load_settings
+from src.ingestion.ingest_mineru import IngestConfig, ingest_markdown
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_ingest_reports_chunks_and_per_file_failures(tmp_path, monkeypatch, workers: int) -> None:
+    """Every readable file is ingested and a broken file is reported, not fatal."""
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+    monkeypatch.setenv("CHROMA_PERSIST_DIR", str(tmp_path / "chroma"))
+    monkeypatch.setenv("CHUNK_MIN_TOKENS", "0")
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for i in range(4):
+        (docs / f"std_{i}.md").write_text(
+            f"# {i} 总则\n第{i}号标准适用于路基设计。\n## {i}.1 范围\n第{i}号标准规定了接触网第{i}类要求。\n",
+            encoding="utf-8",
+        )
+    (docs / "broken.md").write_bytes(b"# 1 \xff\xfe\n")
+
+    report = ingest_markdown(
+        IngestConfig(input_glob=str(docs / "*.md"), collection_name=f"ingest_{workers}", workers=workers, batch_size=1)
+    )
+
+    assert report.files == 5
+    assert report.chunks == 8
+    assert list(report.failures) == [str(docs / "broken.md")]
+    assert "UnicodeDecodeError" in report.failures[str(docs / "broken.md")]
+
+
+def test_incremental_ingest_only_touches_changed_chunks(tmp_path, monkeypatch) -> None:
+    """Unchanged files are skipped; changed and removed files are diffed by chunk."""
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+    monkeypatch.setenv("CHROMA_PERSIST_DIR", str(tmp_path / "chroma"))
+    monkeypatch.setenv("CHUNK_MIN_TOKENS", "0")
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    first = docs / "a.md"
+    second = docs / "b.md"
+    first.write_text("# 1 总则\n路基面宽度应根据铁路等级确定。\n## 1.1 范围\n本标准适用于客货共线铁路。\n", encoding="utf-8")
+    second.write_text("# 2 接触网\n接触网动态接触力应满足受电弓要求。\n", encoding="utf-8")
+    config = IngestConfig(input_glob=str(docs / "*.md"), collection_name="incremental")
+
+    assert ingest_markdown(config).chunks == 3
+    again = ingest_markdown(config)
+    assert (again.chunks, again.skipped, again.deleted) == (0, 2, 0)
+
+    first.write_text("# 1 总则\n路基面宽度应根据铁路等级确定。\n## 1.1 范围\n本标准适用于高速铁路桥梁支座设计。\n", encoding="utf-8")
+    changed = ingest_markdown(config)
+    assert (changed.chunks, changed.skipped, changed.deleted) == (1, 1, 1)
+
+    second.unlink()
+    removed = ingest_markdown(config)
+    assert (removed.chunks, removed.skipped, removed.deleted) == (0, 1, 1)
+    store = VectorStore(replace(load_settings(), collection_name="incremental"), logger=None)
+    assert [doc.content for doc in store.search("高速铁路桥梁支座", 5)] == [
+        "本标准适用于高速铁路桥梁支座设计。",
+        "路基面宽度应根据铁路等级确定。",
+    ]
+
+
+def test_failed_upsert_is_reported_and_retried(tmp_path, monkeypatch) -> None:
+    """A file whose chunks fail to upsert is a failure and is not recorded as ingested."""
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+    monkeypatch.setenv("CHROMA_PERSIST_DIR", str(tmp_path / "chroma"))
+    monkeypatch.setenv("CHUNK_MIN_TOKENS", "0")
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.md").write_text("# 1 总则\n路基面宽度应根据铁路等级确定。\n", encoding="utf-8")
+    config = IngestConfig(input_glob=str(docs / "*.md"), collection_name="retry")
+
+    def broken_embed(self, texts):
+        raise RuntimeError("embedding service down")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(VectorStore, "_embed", broken_embed)
+        failed = ingest_markdown(config)
+    assert failed.chunks == 0
+    assert "embedding service down" in failed.failures[str(docs / "a.md")]
+
+    retried = ingest_markdown(config)
+    assert (retried.chunks, retried.skipped, retried.failures) == (1, 0, {})
+
+
+def test_forced_ingest_reupserts_and_still_deletes_stale_chunks(tmp_path, monkeypatch) -> None:
+    """Force restores chunks missing from the store and still removes chunks a file dropped."""
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+    monkeypatch.setenv("CHROMA_PERSIST_DIR", str(tmp_path / "chroma"))
+    monkeypatch.setenv("CHUNK_MIN_TOKENS", "0")
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    source = docs / "a.md"
+    source.write_text("# 1 总则\n路基面宽度应根据铁路等级确定。\n## 1.1 范围\n本标准适用于客货共线铁路。\n", encoding="utf-8")
+    config = IngestConfig(input_glob=str(docs / "*.md"), collection_name="forced")
+    assert ingest_markdown(config).chunks == 2
+    store = VectorStore(replace(load_settings(), collection_name="forced"), logger=None)
+    store.delete_chunks([store.search("客货共线铁路", 1)[0].doc_id])
+
+    forced = replace(config, force=True)
+    again = ingest_markdown(forced)
+    assert (again.chunks, again.skipped, again.deleted) == (1, 0, 0)
+
+    source.write_text("# 1 总则\n路基面宽度应根据铁路等级确定。\n", encoding="utf-8")
+    changed = ingest_markdown(forced)
+    assert (changed.chunks, changed.deleted) == (0, 1)
+    store = VectorStore(replace(load_settings(), collection_name="forced"), logger=None)
+    assert [doc.content for doc in store.search("客货共线铁路", 5)] == ["路基面宽度应根据铁路等级确定。"]
+
+
+def test_sync_releases_sections_shared_with_removed_or_changed_files(tmp_path, monkeypatch) -> None:
+    """A section collapsed across files goes away once no file still contains it."""
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+    monkeypatch.setenv("CHROMA_PERSIST_DIR", str(tmp_path / "chroma"))
+    monkeypatch.setenv("CHUNK_MIN_TOKENS", "0")
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    shared = "# 9 通用\n路基填料应分层压实并检测压实系数。\n"
+    first = docs / "a.md"
+    second = docs / "b.md"
+    first.write_text(shared + "# 1 总则\n本标准适用于客货共线铁路。\n", encoding="utf-8")
+    second.write_text(shared + "# 2 接触网\n接触网动态接触力应满足受电弓要求。\n", encoding="utf-8")
+    config = IngestConfig(input_glob=str(docs / "*.md"), collection_name="shared")
+    store = VectorStore(replace(load_settings(), collection_name="shared"), logger=None)
+
+    assert ingest_markdown(config).chunks == 3
+    first.unlink()
+    ingest_markdown(config)
+    assert len(store.search("路基填料压实", 5)) == 2
+    second.unlink()
+    ingest_markdown(config)
+    assert store.search("路基填料压实", 5) == []
+
+    own = {first: "# 1 总则\n本标准适用于客货共线铁路。\n", second: "# 2 接触网\n接触网动态接触力应满足受电弓要求。\n"}
+    for path, text in own.items():
+        path.write_text(shared + text, encoding="utf-8")
+    ingest_markdown(config)
+    [kept] = [doc for doc in store.search("路基填料压实", 5) if doc.content == "路基填料应分层压实并检测压实系数。"]
+    owner = docs / kept.metadata["source"]
+    [collapsed] = [path for path in own if path != owner]
+    collapsed.write_text(own[collapsed], encoding="utf-8")
+    ingest_markdown(config)
+    owner.unlink()
+    ingest_markdown(config)
+    assert [doc.content for doc in store.search("路基填料压实", 5)] == [own[collapsed].split("\n")[1]]
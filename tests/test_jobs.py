@@ -0,0 +1,85 @@
+"""Tests for background ingestion jobs."""
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from src.components.vector_store import VectorStore
+from src.config import load_settings
+from src.ingestion.jobs import IngestJobQueue
+
+MARKDOWN = "# 1 总则\n路基面宽度应根据铁路等级确定。\n## 1.1 范围\n本标准适用于客货共线铁路。\n"
+
+
+@pytest.fixture()
+def store(tmp_path, monkeypatch) -> VectorStore:
+    """Create a VectorStore backed by a temporary Chroma directory."""
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+    monkeypatch.setenv("CHROMA_PERSIST_DIR", str(tmp_path / "chroma"))
+    return VectorStore(load_settings(), logger=None)
+
+
+def _wait(jobs: IngestJobQueue, job_id: str, timeout: float = 10.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = jobs.jobs.get(job_id)
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_job_runs_in_background_with_progress(store: VectorStore, tmp_path) -> None:
+    """A submitted job returns at once and reports its result when done."""
+    jobs = IngestJobQueue(store, str(tmp_path / "jobs"), batch_size=1)
+    jobs.start()
+    try:
+        job_id = jobs.submit_text("std.md", MARKDOWN)
+        job = _wait(jobs, job_id)
+    finally:
+        jobs.stop()
+    assert job["status"] == "succeeded"
+    assert job["chunks_added"] == 2
+    assert job["bytes_processed"] == job["bytes_total"] == len(MARKDOWN.encode("utf-8"))
+    assert job["progress"] == 1.0
+    assert len(store.search("路基面宽度", 2)) == 2
+
+
+def test_unfinished_jobs_survive_a_restart(store: VectorStore, tmp_path) -> None:
+    """Queued jobs are picked up by the next process; broken uploads fail."""
+    first = IngestJobQueue(store, str(tmp_path / "jobs"))
+    queued = first.submit_text("std.md", MARKDOWN)
+    receiving, handle = first.open_payload("partial.md")
+    handle.write(b"# 1 ")
+    handle.close()
+
+    second = IngestJobQueue(store, str(tmp_path / "jobs"))
+    second.start()
+    try:
+        assert _wait(second, queued)["chunks_added"] == 2
+    finally:
+        second.stop()
+    failed = second.jobs.get(receiving)
+    assert failed["status"] == "failed"
+    assert failed["error"] == "upload interrupted"
+
+
+def test_failed_upsert_fails_the_job_and_keeps_the_payload(store: VectorStore, tmp_path, monkeypatch) -> None:
+    """An embedding or upsert error is a failed job, not an empty success."""
+
+    def broken_embed(texts):
+        raise RuntimeError("embedding service down")
+
+    monkeypatch.setattr(store, "_embed", broken_embed)
+    jobs = IngestJobQueue(store, str(tmp_path / "jobs"))
+    jobs.start()
+    try:
+        job_id = jobs.submit_text("std.md", MARKDOWN)
+        job = _wait(jobs, job_id)
+    finally:
+        jobs.stop()
+    assert job["status"] == "failed"
+    assert "embedding service down" in job["error"]
+    with open(jobs.jobs.payload_path(job_id), encoding="utf-8") as handle:
+        assert handle.read() == MARKDOWN
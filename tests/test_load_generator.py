@@ -0,0 +1,86 @@
+"""Tests for the API load generator."""
+from __future__ import annotations
+
+import csv
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from src.evaluation.load_generator import LoadTester, load_questions
+
+
+class _ChatStandIn(BaseHTTPRequestHandler):
+    """Answers ``POST /chat`` after 0.1s; questions starting with "fail" get a 500."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        query = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["query"]
+        time.sleep(0.1)
+        status = 500 if query.startswith("fail") else 200
+        body = {"answer": query, "context_source": "correct", "node_timings": {"retrieve": 0.02, "generate": 0.08}}
+        payload = json.dumps(body if status == 200 else {"detail": "chat_failed"}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def api() -> Iterator[str]:
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _ChatStandIn)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_closed_loop_reports_throughput_errors_and_nodes(api: str, tmp_path: Path) -> None:
+    """Four clients finish eight 0.1s requests in about two rounds."""
+    report = LoadTester(api).run_closed(["q1", "q2", "q3", "fail"], concurrency=4, requests=8)
+    summary = report.summary()
+    assert summary["requests"] == 8 and summary["errors"] == 2
+    assert summary["error_rate"] == 0.25
+    assert 0.2 <= summary["duration"] < 0.6
+    assert summary["throughput"] == pytest.approx(6 / summary["duration"])
+    assert 0.1 <= summary["latency"]["p50"] <= summary["latency"]["p99"] < 0.4
+    assert summary["nodes"]["generate"]["count"] == 6
+    assert summary["nodes"]["generate"]["p95"] == 0.08
+
+    report.write_json(str(tmp_path / "out" / "load.json"))
+    report.write_csv(str(tmp_path / "out" / "load.csv"))
+    saved = json.loads((tmp_path / "out" / "load.json").read_text(encoding="utf-8"))
+    assert saved["summary"]["errors"] == 2 and len(saved["records"]) == 8
+    with open(tmp_path / "out" / "load.csv", encoding="utf-8") as handle:
+        rows = list(csv.DictReader(handle))
+    assert len(rows) == 8 and rows[0]["node.generate"] == "0.08"
+
+
+def test_open_loop_keeps_the_arrival_rate(api: str) -> None:
+    """Arrivals are not held back by slow responses."""
+    report = LoadTester(api).run_open(["q"], rate=50, requests=10, arrival="uniform")
+    summary = report.summary()
+    assert summary["requests"] == 10 and summary["errors"] == 0
+    # 10 arrivals 20ms apart overlap 0.1s responses: done in ~0.28s, not ~1s.
+    assert 0.25 <= summary["duration"] < 0.6
+
+
+def test_load_questions_formats(tmp_path: Path) -> None:
+    """JSONL, CSV and plain-text corpora are supported."""
+    (tmp_path / "q.jsonl").write_text('{"question": "路基宽度？"}\n\n{"query": "轨距？"}\n', encoding="utf-8")
+    (tmp_path / "q.csv").write_text("id,question\n1,路基宽度？\n2,轨距？\n", encoding="utf-8")
+    (tmp_path / "q.txt").write_text("路基宽度？\n\n轨距？\n", encoding="utf-8")
+    for name in ("q.jsonl", "q.csv", "q.txt"):
+        assert load_questions(str(tmp_path / name)) == ["路基宽度？", "轨距？"]
+    (tmp_path / "bad.jsonl").write_text('{"text": "x"}\n', encoding="utf-8")
+    with pytest.raises(ValueError, match="bad.jsonl:1"):
+        load_questions(str(tmp_path / "bad.jsonl"))
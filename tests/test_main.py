@@ -0,0 +1,36 @@
+"""Tests for the command line entry point."""
+from __future__ import annotations
+
+import sys
+
+import pytest
+
+from src.components.vector_store import VectorStore
+from src.config import load_settings
+from src.main import main
+
+
+def _run(monkeypatch: pytest.MonkeyPatch, *args: str) -> None:
+    monkeypatch.setattr(sys, "argv", ["src.main", *args])
+    main()
+
+
+def test_replace_mode_swaps_the_source_revision(tmp_path, monkeypatch, capsys) -> None:
+    """``replace --file`` writes the new revision and drops the old one; failures exit non-zero."""
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+    monkeypatch.setenv("CHROMA_PERSIST_DIR", str(tmp_path / "chroma"))
+    monkeypatch.setenv("CHUNK_MIN_TOKENS", "0")
+    source = tmp_path / "std.md"
+    source.write_text("# 1 宽度\n路基面宽度不应小于7.5m。\n", encoding="utf-8")
+    _run(monkeypatch, "ingest", "--file", str(source))
+
+    source.write_text("# 1 宽度\n路基面宽度不应小于7.7m。\n# 2 坡度\n路肩坡度应为4%。\n", encoding="utf-8")
+    _run(monkeypatch, "replace", "--file", str(source))
+    assert "Replaced std.md with 2 chunks" in capsys.readouterr().out
+    store = VectorStore(load_settings(), logger=None)
+    assert sorted(doc.content for doc in store.search("路基面宽度", 5)) == ["路基面宽度不应小于7.7m。", "路肩坡度应为4%。"]
+
+    with pytest.raises(SystemExit) as exc_info:
+        _run(monkeypatch, "replace", "--file", str(tmp_path / "missing.md"))
+    assert exc_info.value.code != 0
+    assert len(store.search("路基面宽度", 5)) == 2
@@ -0,0 +1,82 @@
+"""Tests for MinerULoader using a stub magic-pdf on PATH."""
+from __future__ import annotations
+
+import os
+import stat
+import sys
+import textwrap
+
+import pytest
+
+from src.ingestion.pdf_loader import MinerULoader
+
+STUB = textwrap.dedent(
+    """\
+    #!{python}
+    import os, sys, time
+    args = dict(zip(sys.argv[1::2], sys.argv[2::2]))
+    with open(os.environ["STUB_CALLS"], "a") as calls:
+        calls.write(args["-p"] + "\\n")
+    body = open(args["-p"], encoding="utf-8").read()
+    for i in range(1000):
+        print("progress", i)
+    if "SLOW" in body:
+        time.sleep(30)
+    if "FAIL" in body:
+        print("boom", file=sys.stderr)
+        sys.exit(3)
+    stem = os.path.splitext(os.path.basename(args["-p"]))[0]
+    out = os.path.join(args["-o"], stem, "auto")
+    os.makedirs(out)
+    with open(os.path.join(out, stem + ".md"), "w", encoding="utf-8") as handle:
+        handle.write("# 1 总则\\n" + body)
+    """
+)
+
+
+@pytest.fixture()
+def loader(tmp_path, monkeypatch) -> MinerULoader:
+    """Put a stub magic-pdf on PATH and return a loader using it."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "magic-pdf"
+    script.write_text(STUB.format(python=sys.executable), encoding="utf-8")
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("STUB_CALLS", str(tmp_path / "calls.txt"))
+    return MinerULoader(output_dir=str(tmp_path / "out"), timeout=5, workers=2)
+
+
+def _calls(tmp_path) -> int:
+    path = tmp_path / "calls.txt"
+    return len(path.read_text().splitlines()) if path.exists() else 0
+
+
+def test_parse_pdf_reuses_content_addressed_output(loader: MinerULoader, tmp_path) -> None:
+    """The same PDF content is converted once, even under another name."""
+    pdf = tmp_path / "a.pdf"
+    pdf.write_text("路基面宽度不应小于7.7m。", encoding="utf-8")
+    copy = tmp_path / "b.pdf"
+    copy.write_bytes(pdf.read_bytes())
+
+    assert loader.parse_pdf(str(pdf)) == "# 1 总则\n路基面宽度不应小于7.7m。"
+    assert loader.parse_pdf(str(copy)) == "# 1 总则\n路基面宽度不应小于7.7m。"
+    assert _calls(tmp_path) == 1
+
+
+def test_parse_pdfs_reports_failures_and_timeouts(loader: MinerULoader, tmp_path) -> None:
+    """A failing or hanging PDF does not stop the rest of the batch."""
+    paths = []
+    for name, body in [("ok", "正文"), ("bad", "FAIL"), ("slow", "SLOW"), ("ok2", "正文二")]:
+        path = tmp_path / f"{name}.pdf"
+        path.write_text(body, encoding="utf-8")
+        paths.append(str(path))
+    loader.timeout = 1
+
+    results = loader.parse_pdfs(paths)
+
+    assert [r.pdf_path for r in results] == paths
+    assert results[0].error is None and results[3].error is None
+    assert "exited with 3" in results[1].error and "boom" in results[1].error
+    assert "timed out" in results[2].error
+    assert loader.parse_pdfs(paths[:1])[0].cached
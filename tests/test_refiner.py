@@ -0,0 +1,50 @@
+"""Tests for batched, token-capped knowledge refinement."""
+from __future__ import annotations
+
+from typing import List
+
+from src.components.evaluator import EvaluationResult
+from src.components.refiner import KnowledgeRefiner
+
+
+class _KeywordEvaluator:
+    """Scores strips containing "路基" as relevant and records each batch."""
+
+    def __init__(self) -> None:
+        self.batches: List[List[str]] = []
+
+    def score_strips(self, query: str, documents: List[str]) -> List[EvaluationResult]:
+        self.batches.append(documents)
+        return [EvaluationResult(score=0.9 if "路基" in doc else -0.9, rationale="") for doc in documents]
+
+
+def test_refine_many_scores_all_strips_in_one_batch() -> None:
+    """Strips of every document are scored together and recomposed per document."""
+    evaluator = _KeywordEvaluator()
+    refiner = KnowledgeRefiner(evaluator)
+    documents = ["路基宽度7.7m。广告文字！路基填料A组。", "无关内容。", "Subgrade width. 路基压实。"]
+    refined = refiner.refine_many("路基", documents, cjk_sentences=True)
+    assert refined == ["路基宽度7.7m。\n路基填料A组。", "", "路基压实。"]
+    assert len(evaluator.batches) == 1
+    assert len(evaluator.batches[0]) == 6
+
+
+def test_internal_documents_split_only_at_whitespace() -> None:
+    """Without cjk_sentences, unspaced Chinese sentences stay one strip."""
+    evaluator = _KeywordEvaluator()
+    refiner = KnowledgeRefiner(evaluator)
+    assert refiner.refine_many("路基", ["路基宽度7.7m。广告文字！ 路基填料A组。"]) == ["路基宽度7.7m。广告文字！\n路基填料A组。"]
+    assert evaluator.batches == [["路基宽度7.7m。广告文字！", "路基填料A组。"]]
+
+
+def test_refine_many_caps_tokens_per_document() -> None:
+    """Over budget, the best strips are kept in document order."""
+
+    class _Ranked(_KeywordEvaluator):
+        def score_strips(self, query: str, documents: List[str]) -> List[EvaluationResult]:
+            return [EvaluationResult(score=float(doc.count("路基")), rationale="") for doc in documents]
+
+    refiner = KnowledgeRefiner(_Ranked())
+    document = "路基一。路基路基路基二。路基路基三。"
+    assert refiner.refine_many("路基", [document], max_tokens=14, cjk_sentences=True) == ["路基路基路基二。\n路基路基三。"]
+    assert refiner.refine_many("路基", [document], cjk_sentences=True)[0].count("\n") == 2
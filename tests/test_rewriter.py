@@ -0,0 +1,75 @@
+"""Tests for the keyword extractor and the tiered QueryRewriter."""
+from __future__ import annotations
+
+from dataclasses import replace
+from types import SimpleNamespace
+from typing import List
+
+from src.components.keywords import KeywordExtractor
+from src.components.rewriter import QueryRewriter
+from src.config import load_settings
+
+CORPUS = [
+    "路基面宽度应符合设计要求。",
+    "路基填料分为A、B、C组，路基压实应满足要求。",
+    "无砟轨道结构应进行应力计算，轨道结构应满足强度要求。",
+] * 4
+
+
+class _FakeCompletions:
+    """Records prompts and answers like the chat completions API."""
+
+    def __init__(self) -> None:
+        self.calls: List[str] = []
+
+    def create(self, messages, **kwargs):
+        self.calls.append(messages[-1]["content"])
+        message = SimpleNamespace(content="A: 路基, 填料")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def test_extractor_takes_identifiers_and_rare_phrases() -> None:
+    """Standard numbers and clauses come first; corpus-rare phrases outrank common ones."""
+    extractor = KeywordExtractor().fit(CORPUS)
+    result = extractor.extract("ＴＢ 10001 - 2016第 3.2.1 条路基面宽度是多少？")
+    assert result.keywords == ["TB 10001-2016", "第3.2.1条", "路基面宽度"]
+    assert result.confident
+
+    result = extractor.extract("无砟轨道的应力如何计算")
+    assert result.keywords == ["无砟轨道", "应力", "计算"]
+    assert result.query == "无砟轨道, 应力, 计算"
+
+
+def test_extractor_is_unsure_without_clear_keywords() -> None:
+    """Nothing usable, an unsegmented run, or a near-tie at the cut defers to the LLM."""
+    extractor = KeywordExtractor().fit(CORPUS)
+    assert not extractor.extract("？？").confident
+    assert not extractor.extract("请问高速铁路路基填料压实标准").confident
+    assert not KeywordExtractor().extract("路基, 轨道, 桥梁, 隧道").confident
+
+
+def test_sampled_statistics_remember_the_corpus_size(tmp_path) -> None:
+    """Statistics counted over a sample keep the collection size they stand for."""
+    extractor = KeywordExtractor().fit(CORPUS[:3])
+    assert extractor.corpus_size == 3
+    extractor.corpus_size = 120
+    extractor.save(str(tmp_path / "keywords.json"))
+    loaded = KeywordExtractor.load(str(tmp_path / "keywords.json"))
+    assert (loaded.documents, loaded.corpus_size) == (3, 120)
+    assert loaded.idf("路基") == extractor.idf("路基")
+
+
+def test_rewriter_uses_fast_path_then_llm_and_caches() -> None:
+    """Confident questions skip the LLM; unsure ones call it once and are cached."""
+    settings = replace(load_settings(), openai_api_key="sk-test", rewrite_fast_path=True, rewrite_cache_size=8)
+    rewriter = QueryRewriter(settings, keywords=KeywordExtractor().fit(CORPUS))
+    completions = _FakeCompletions()
+    rewriter._client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    assert rewriter.rewrite("TB 10001 路基面宽度") == "TB 10001, 路基面宽度"
+    assert completions.calls == []
+
+    question = "请问高速铁路路基填料压实标准"
+    assert rewriter.rewrite(question) == "路基, 填料"
+    assert rewriter.rewrite(f"  {question} ") == "路基, 填料"
+    assert len(completions.calls) == 1
@@ -0,0 +1,136 @@
+"""Tests for WebSearcher against a local stand-in for the Tavily API."""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, List
+
+import pytest
+
+from src.components.search import WebSearcher, split_queries
+from src.utils.search_cache import SearchCache
+
+
+class _TavilyStandIn(BaseHTTPRequestHandler):
+    """Answers ``POST /search`` with one result per requested slot."""
+
+    protocol_version = "HTTP/1.1"
+    queries: List[str] = []
+    peers: List[int] = []
+    delay = 0.0
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.delay)
+        self.queries.append(body["query"])
+        self.peers.append(self.client_address[1])
+        query = body["query"]
+        results = [
+            {"url": f"https://example.com/{query}/{i}", "title": query, "content": f"{query} #{i}"}
+            for i in range(body.get("max_results", 5))
+        ]
+        payload = json.dumps({"query": query, "results": results}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture()
+def server() -> Iterator[str]:
+    """Run the stand-in on a free port and yield its base URL."""
+    _TavilyStandIn.queries = []
+    _TavilyStandIn.peers = []
+    _TavilyStandIn.delay = 0.0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _TavilyStandIn)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_search_is_cached_in_memory_and_on_disk(server: str, tmp_path) -> None:
+    """Normalized repeats hit the cache; a new searcher on the same file does too."""
+    path = str(tmp_path / "search.sqlite3")
+    searcher = WebSearcher("key", base_url=server, cache=SearchCache(path))
+    first = searcher.search("TB 10001  路基", top_k=2)
+    assert first == ["TB 10001  路基 #0", "TB 10001  路基 #1"]
+    assert searcher.search(" tb 10001 路基 ", top_k=2) == first
+    assert len(_TavilyStandIn.queries) == 1
+    searcher.search("TB 10001 路基", top_k=3)
+    assert len(_TavilyStandIn.queries) == 2
+
+    restarted = WebSearcher("key", base_url=server, cache=SearchCache(path))
+    assert restarted.search("tb 10001 路基", top_k=2) == first
+    assert len(_TavilyStandIn.queries) == 2
+
+
+def test_pooled_client_reuses_connection(server: str) -> None:
+    """Uncached searches share one keep-alive connection."""
+    searcher = WebSearcher("key", base_url=server)
+    for query in ("a", "b", "c"):
+        searcher.search(query, top_k=1)
+    assert len(_TavilyStandIn.queries) == 3
+    assert len(set(_TavilyStandIn.peers)) == 1
+
+
+def test_stale_entry_is_served_and_refreshed(server: str) -> None:
+    """Past the TTL the old result is returned at once and refetched in the background."""
+    now = [1000.0]
+    cache = SearchCache(ttl=10, stale_ttl=100, clock=lambda: now[0])
+    searcher = WebSearcher("key", base_url=server, cache=cache)
+    searcher.search("bridge", top_k=1)
+    now[0] += 50
+    assert searcher.search("bridge", top_k=1) == ["bridge #0"]
+    key = SearchCache.key("bridge", 1)
+    deadline = time.time() + 5
+    while cache.get(key)[1] and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(_TavilyStandIn.queries) == 2
+    assert cache.get(key) == ([{"url": "https://example.com/bridge/0", "title": "bridge", "content": "bridge #0",
+                                "score": None}], False)
+
+    now[0] += 1000
+    searcher.search("bridge", top_k=1)
+    assert len(_TavilyStandIn.queries) == 3
+
+
+def test_split_queries() -> None:
+    """Rewrites split on ASCII and full-width commas; blanks and repeats are dropped."""
+    assert split_queries("TB 10001，路基宽度, 填料 ,tb 10001,") == ["TB 10001", "路基宽度", "填料"]
+    assert split_queries("  ") == []
+
+
+def test_search_many_runs_concurrently(server: str) -> None:
+    """Three keyword queries cost about one round-trip, not three."""
+    _TavilyStandIn.delay = 0.3
+    searcher = WebSearcher("key", base_url=server)
+    started = time.perf_counter()
+    results = searcher.search_many(["a", "b", "c"], top_k=1)
+    assert time.perf_counter() - started < 0.75
+    assert sorted(_TavilyStandIn.queries) == ["a", "b", "c"]
+    assert [result["content"] for result in results] == ["a #0", "b #0", "c #0"]
+
+
+def test_search_many_dedupes_by_url_and_content() -> None:
+    """Merged results are interleaved by rank and drop repeated URLs or snippets."""
+    cache = SearchCache()
+    cache.put(SearchCache.key("a", 3), [
+        {"url": "u1", "title": "", "content": "路基 宽度", "score": None},
+        {"url": "u2", "title": "", "content": "only a", "score": None},
+    ])
+    cache.put(SearchCache.key("b", 3), [
+        {"url": "u1", "title": "", "content": "other text", "score": None},
+        {"url": "u3", "title": "", "content": "路基  宽度", "score": None},
+        {"url": "u4", "title": "", "content": "only b", "score": None},
+    ])
+    searcher = WebSearcher("key", base_url="http://127.0.0.1:9", cache=cache)
+    merged = searcher.search_many(["a", "b"], top_k=3)
+    assert [result["url"] for result in merged] == ["u1", "u2", "u4"]
@@ -0,0 +1,75 @@
+"""Tests for single-flight deduplication of concurrent LLM calls."""
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from types import SimpleNamespace
+
+import pytest
+
+from src.components.generator import AnswerGenerator
+from src.config import load_settings
+from src.utils.metrics import Metrics
+from src.utils.singleflight import SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_execution() -> None:
+    """Followers get the leader's result; distinct keys and later calls run again."""
+    metrics = Metrics()
+    flight = SingleFlight("test", metrics=metrics)
+    calls = []
+    gate = threading.Event()
+
+    def slow(value: str) -> str:
+        calls.append(value)
+        gate.wait(5)
+        return value.upper()
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        futures = [pool.submit(flight.do, "q", slow, "q") for _ in range(5)]
+        other = pool.submit(flight.do, "r", slow, "r")
+        time.sleep(0.2)
+        gate.set()
+        assert [future.result() for future in futures] == ["Q"] * 5
+        assert other.result() == "R"
+    assert sorted(calls) == ["q", "r"]
+    assert flight.do("q", slow, "q") == "Q"
+    counters = metrics.snapshot()["counters"]
+    assert counters["singleflight.test.calls"] == 7
+    assert counters["singleflight.test.shared"] == 4
+    assert flight.dedup_rate() == pytest.approx(4 / 7)
+
+
+def test_leader_error_reaches_followers() -> None:
+    """An exception raised by the shared call is raised in every waiting caller."""
+    flight = SingleFlight("errors", metrics=Metrics())
+
+    def fail() -> None:
+        time.sleep(0.2)
+        raise RuntimeError("upstream 500")
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(flight.do, "k", fail) for _ in range(3)]
+        for future in futures:
+            with pytest.raises(RuntimeError, match="upstream 500"):
+                future.result()
+
+
+def test_generator_dedupes_identical_questions() -> None:
+    """Simultaneous identical generate calls hit the chat API once."""
+    settings = replace(load_settings(), openai_api_key="sk-test", single_flight=True)
+    generator = AnswerGenerator(settings)
+    created = []
+
+    def create(**kwargs):
+        created.append(kwargs)
+        time.sleep(0.2)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="7.7m"))])
+
+    generator._client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        answers = list(pool.map(lambda _: generator.generate("路基面宽度?", "ctx"), range(4)))
+    assert answers == ["7.7m"] * 4
+    assert len(created) == 1
@@ -0,0 +1,66 @@
+"""Tests for snapshot export/import."""
+from __future__ import annotations
+
+import pytest
+
+from src.components.vector_store import VectorStore
+from src.config import load_settings
+from src.ingestion.mineru_parser import MarkdownHierarchySplitter
+from src.utils.snapshot import SnapshotError, read_snapshot_footer
+
+
+def _store(path, monkeypatch) -> VectorStore:
+    """Create a hash-embedding VectorStore under ``path``."""
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+    monkeypatch.setenv("CHROMA_PERSIST_DIR", str(path))
+    return VectorStore(load_settings(), logger=None)
+
+
+def test_snapshot_round_trip(tmp_path, monkeypatch) -> None:
+    """A fresh store serves the same results after importing a snapshot."""
+    source = _store(tmp_path / "a", monkeypatch)
+    md = "# 1 路基\n路基面宽度不应小于7.7m。\n# 2 接触网\n接触网动态接触力应满足受电弓要求。\n"
+    source.add_chunks(MarkdownHierarchySplitter().parse(md), source_name="std.md")
+    snapshot = tmp_path / "index.rcsnap"
+    assert source.export_snapshot(str(snapshot)) == 2
+
+    target = _store(tmp_path / "b", monkeypatch)
+    assert target.import_snapshot(str(snapshot)) == 2
+    expected = [doc.doc_id for doc in source.search("路基面宽度", 2)]
+    assert [doc.doc_id for doc in target.search("路基面宽度", 2)] == expected
+    assert [doc.doc_id for doc in target.search("路基面宽度", 2, mode="hierarchical")][0] == expected[0]
+
+
+def test_corrupted_snapshot_is_rejected(tmp_path, monkeypatch) -> None:
+    """Flipping a byte inside a column block fails the checksum."""
+    store = _store(tmp_path / "a", monkeypatch)
+    store.add_chunks(MarkdownHierarchySplitter().parse("# 1 总则\n本标准适用于路基设计。\n"), source_name="s.md")
+    snapshot = tmp_path / "index.rcsnap"
+    store.export_snapshot(str(snapshot))
+    block = read_snapshot_footer(str(snapshot))["collections"][0]["row_groups"][0]["documents"]
+
+    data = bytearray(snapshot.read_bytes())
+    data[block["offset"]] ^= 0xFF
+    snapshot.write_bytes(bytes(data))
+    with pytest.raises(SnapshotError):
+        _store(tmp_path / "b", monkeypatch).import_snapshot(str(snapshot))
+
+
+def test_corrupt_late_block_imports_nothing(tmp_path, monkeypatch) -> None:
+    """A bad block after valid ones is caught before any row is written."""
+    store = _store(tmp_path / "a", monkeypatch)
+    store.add_chunks(MarkdownHierarchySplitter().parse("# 1 总则\n本标准适用于路基设计。\n"), source_name="s.md")
+    snapshot = tmp_path / "index.rcsnap"
+    store.export_snapshot(str(snapshot))
+    collections = read_snapshot_footer(str(snapshot))["collections"]
+    block = collections[-1]["row_groups"][-1]["embeddings"]
+    assert block["offset"] > collections[0]["row_groups"][0]["embeddings"]["offset"]
+
+    data = bytearray(snapshot.read_bytes())
+    data[block["offset"]] ^= 0xFF
+    snapshot.write_bytes(bytes(data))
+    target = _store(tmp_path / "b", monkeypatch)
+    with pytest.raises(SnapshotError):
+        target.import_snapshot(str(snapshot))
+    assert target.count() == 0
+    assert target.search("路基设计", 1) == []
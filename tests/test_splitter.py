@@ -1,7 +1,10 @@
 """Tests for MarkdownHierarchySplitter."""
 from __future__ import annotations
 
-from src.ingestion.mineru_parser import MarkdownHierarchySplitter
+import io
+
+from src.ingestion.mineru_parser import MarkdownHierarchySplitter, section_path
+from src.utils.tokens import estimate_tokens
 
 
 def test_markdown_hierarchy_splitter_basic() -> None:
@@ -12,3 +15,48 @@ def test_markdown_hierarchy_splitter_basic() -> None:
     assert len(chunks) == 2
     assert chunks[0].metadata["path"] == "1 总则"
     assert chunks[1].metadata["path"] == "1 总则 > 1.1 范围"
+
+
+def test_section_path_truncates_to_depth() -> None:
+    """Section paths keep only the leading heading levels."""
+    path = "1 总则 > 1.1 范围 > 1.1.1 细则"
+    assert section_path(path, 1) == "1 总则"
+    assert section_path(path, 2) == "1 总则 > 1.1 范围"
+    assert section_path(path, 5) == path
+    assert section_path("", 2) == ""
+
+
+def test_iter_chunks_streams_lines_lazily() -> None:
+    """Streaming yields the same chunks as parse, before the input is exhausted."""
+    md = "# 1 总则\n正文A\n## 1.1 范围\n正文B\n## 1.2 术语\n正文C\n"
+    splitter = MarkdownHierarchySplitter()
+    expected = [(c.content, c.metadata) for c in splitter.parse(md)]
+    assert [(c.content, c.metadata) for c in splitter.iter_chunks(io.StringIO(md))] == expected
+
+    consumed = []
+
+    def lines():
+        for line in md.splitlines(keepends=True):
+            consumed.append(line)
+            yield line
+
+    first = next(splitter.iter_chunks(lines()))
+    assert first.metadata["path"] == "1 总则"
+    assert len(consumed) < len(md.splitlines())
+
+
+def test_token_budget_splits_large_and_merges_small_sections() -> None:
+    """Oversized sections are split with overlap; tiny siblings share their parent path."""
+    rows = "\n".join(f"| {i} | 轨距 1435mm 允许偏差 |" for i in range(40))
+    md = f"# 2 路基\n## 2.1 宽度\n短句A\n## 2.2 坡度\n短句B\n## 2.3 表格\n{rows}\n"
+    splitter = MarkdownHierarchySplitter(max_tokens=120, min_tokens=20, overlap_tokens=15)
+    chunks = splitter.parse(md)
+
+    assert chunks[0].metadata["path"] == "2 路基"
+    assert chunks[0].content == "2.1 宽度\n短句A\n\n2.2 坡度\n短句B"
+    table = [c for c in chunks if c.metadata["path"] == "2 路基 > 2.3 表格"]
+    assert len(table) > 1
+    assert all(estimate_tokens(c.content) <= 120 for c in table)
+    # Consecutive pieces overlap by the trailing row, and no row is lost.
+    assert table[0].content.splitlines()[-1] == table[1].content.splitlines()[0]
+    assert set(rows.splitlines()) == {line for c in table for line in c.content.splitlines()}
@@ -0,0 +1,111 @@
+"""Tests for the local OpenAI/Tavily stand-in server."""
+from __future__ import annotations
+
+import json
+import time
+import urllib.error
+import urllib.request
+from dataclasses import replace
+from typing import Iterator
+
+import pytest
+
+from src.components.evaluator import RetrievalEvaluator
+from src.components.generator import AnswerGenerator
+from src.components.rewriter import QueryRewriter
+from src.components.search import WebSearcher
+from src.config import load_settings
+from src.evaluation.stub_server import LatencyProfile, StubConfig, StubServer, start_stub_server
+from src.utils.chroma_store import get_openai_embedding_function
+from src.utils.http import shared_http_client
+
+
+@pytest.fixture
+def stub() -> Iterator[StubServer]:
+    server = start_stub_server()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _post(url: str, payload: dict) -> tuple[int, dict]:
+    request = urllib.request.Request(url, json.dumps(payload).encode("utf-8"), {"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read())
+
+
+def test_components_run_against_the_stub(stub: StubServer) -> None:
+    """Every OpenAI and Tavily call site works offline through the base URLs."""
+    settings = replace(
+        load_settings(),
+        openai_api_key="stub",
+        openai_base_url=f"{stub.base_url}/v1",
+        rewrite_fast_path=False,
+        rewrite_cache_size=0,
+    )
+    results = RetrievalEvaluator(settings).score_documents(
+        "路基面宽度", ["单线路基面宽度不应小于7.7m。", "隧道衬砌厚度要求。"]
+    )
+    assert results[0].score == 1.0 and results[1].score == -1.0
+    assert results[0].rationale.startswith("query term coverage")
+    strips = RetrievalEvaluator(settings).score_strips("路基面宽度", ["路基面宽度7.7m。", "隧道衬砌。", "路基。"])
+    assert [strip.score for strip in strips] == [1.0, -1.0, -0.5]
+    assert QueryRewriter(settings).rewrite("高速铁路路基面宽度有哪些要求？") == "高速铁路路基面宽度, 要求"
+    answer = AnswerGenerator(settings).generate("路基面宽度是多少？", "隧道衬砌。路基面宽度为7.7m。")
+    assert answer == "According to the context: 路基面宽度为7.7m。"
+    embed = get_openai_embedding_function(
+        "stub", "text-embedding-3-large", dimensions=64, http_client=shared_http_client(settings),
+        base_url=settings.openai_base_url,
+    )
+    vectors = embed(["路基", "路基"])
+    assert len(vectors) == 2 and len(vectors[0]) == 64
+    assert list(vectors[0]) == pytest.approx(list(vectors[1]))
+    hits = WebSearcher("stub", base_url=stub.base_url).search_results("路基面宽度", top_k=3)
+    assert [hit["url"] for hit in hits] == [hits[0]["url"][:-1] + str(i) for i in range(3)]
+    assert stub.stats["chat"]["requests"] == 5 and stub.stats["search"]["requests"] == 1
+
+
+def test_latency_and_errors_are_reproducible() -> None:
+    """Failures follow the seed and configured rate; latency follows the profile."""
+    config = StubConfig(
+        latency={"search": LatencyProfile.parse("uniform:0.05,0.1")},
+        error_rate={"chat": 0.5},
+        error_status=503,
+        seed=7,
+    )
+
+    def run() -> list[int]:
+        server = start_stub_server(config)
+        try:
+            return [
+                _post(f"{server.base_url}/v1/chat/completions", {"messages": [{"role": "user", "content": f"q{i}"}]})[0]
+                for i in range(40)
+            ]
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    first = run()
+    assert first == run()
+    assert set(first) == {200, 503} and 10 < first.count(503) < 30
+
+    server = start_stub_server(config)
+    try:
+        started = time.perf_counter()
+        status, body = _post(f"{server.base_url}/search", {"query": "路基", "max_results": 2})
+        assert 0.05 <= time.perf_counter() - started < 0.5
+        assert status == 200 and len(body["results"]) == 2
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_latency_spec_parsing() -> None:
+    """Bare numbers are fixed latencies; bad specs are rejected."""
+    assert LatencyProfile.parse("0.2") == LatencyProfile("fixed", (0.2,))
+    assert LatencyProfile.parse("lognormal:0.8,0.4").params == (0.8, 0.4)
+    with pytest.raises(ValueError):
+        LatencyProfile.parse("uniform:1")
@@ -0,0 +1,187 @@
+"""Tests for VectorStore using the offline hash embedding."""
+from __future__ import annotations
+
+import pytest
+
+from src.components.vector_store import VectorStore
+from src.config import load_settings
+from src.ingestion.mineru_parser import MarkdownHierarchySplitter
+
+
+@pytest.fixture()
+def store(tmp_path, monkeypatch) -> VectorStore:
+    """Create a VectorStore backed by a temporary Chroma directory."""
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+    monkeypatch.setenv("CHROMA_PERSIST_DIR", str(tmp_path / "chroma"))
+    monkeypatch.setenv("SECTION_DEPTH", "1")
+    monkeypatch.setenv("SECTION_K", "1")
+    return VectorStore(load_settings(), logger=None)
+
+
+def test_hierarchical_search_stays_inside_top_section(store: VectorStore) -> None:
+    """Hierarchical mode only returns chunks from the best-matching section."""
+    md = (
+        "# 1 路基\n路基面宽度应根据铁路等级确定。\n## 1.1 宽度\n路基面宽度不应小于7.7m。\n"
+        "# 2 接触网\n接触网动态接触力应满足受电弓要求。\n## 2.1 吊柱\n接触网吊柱安装位置应校核。\n"
+    )
+    chunks = MarkdownHierarchySplitter().parse(md)
+    assert store.add_chunks(chunks, source_name="std.md") == 4
+
+    flat = store.search("路基面宽度", 4, mode="flat")
+    hierarchical = store.search("路基面宽度", 4, mode="hierarchical")
+    assert len(flat) == 4
+    assert hierarchical
+    assert {doc.metadata["section"] for doc in hierarchical} == {"1 路基"}
+
+
+def test_near_duplicate_chunks_collapse_into_canonical(store: VectorStore) -> None:
+    """Repeated boilerplate is stored once with alternate sources."""
+    md = "# 1 范围\n本标准规定了路基面宽度的设计要求，适用于客货共线铁路的新建和改建工程。\n"
+    assert store.add_chunks(MarkdownHierarchySplitter().parse(md), source_name="a.md") == 1
+    assert store.add_chunks(MarkdownHierarchySplitter().parse(md), source_name="b.md") == 0
+
+    docs = store.search("路基面宽度", 5, mode="flat")
+    assert len(docs) == 1
+    assert docs[0].metadata["source"] == "a.md"
+    assert docs[0].metadata["alternate_sources"] == "b.md"
+
+
+def test_quantized_search_matches_float_search(tmp_path, monkeypatch) -> None:
+    """int8 search with float re-ranking returns the same top hits as Chroma."""
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+    monkeypatch.setenv("CHROMA_PERSIST_DIR", str(tmp_path / "chroma"))
+    monkeypatch.setenv("EMBEDDING_QUANTIZATION", "int8")
+    store = VectorStore(load_settings(), logger=None)
+    md = "".join(f"# {i} 条款\n第{i}条 路基面宽度与线间距要求，编号{i * 7919}。\n" for i in range(30))
+    store.add_chunks(MarkdownHierarchySplitter().parse(md), source_name="std.md")
+
+    quantized = [doc.doc_id for doc in store.search("第12条 路基面宽度", 3)]
+    monkeypatch.setenv("EMBEDDING_QUANTIZATION", "none")
+    reference = [doc.doc_id for doc in VectorStore(load_settings(), logger=None).search("第12条 路基面宽度", 3)]
+    assert quantized == reference
+
+
+def test_quantized_readd_replaces_vectors(tmp_path, monkeypatch) -> None:
+    """Re-upserting chunks keeps one quantized vector per id, in memory and on disk."""
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+    monkeypatch.setenv("CHROMA_PERSIST_DIR", str(tmp_path / "chroma"))
+    monkeypatch.setenv("EMBEDDING_QUANTIZATION", "int8")
+    monkeypatch.setenv("DEDUP_NEAR_DUPLICATES", "false")
+    md = "# 1 总则\n路基面宽度应根据铁路等级确定。\n# 2 接触网\n接触网动态接触力应满足受电弓要求。\n"
+    store = VectorStore(load_settings(), logger=None)
+    store.add_chunks(MarkdownHierarchySplitter().parse(md), source_name="std.md")
+    store.add_chunks(MarkdownHierarchySplitter().parse(md), source_name="std.md")
+
+    assert store._quantized.count == 2
+    assert [doc.content for doc in store.search("路基面宽度", 2)][0] == "路基面宽度应根据铁路等级确定。"
+    assert VectorStore(load_settings(), logger=None)._quantized.count == 2
+
+
+def test_delete_source_hands_shared_chunks_to_alternates(store: VectorStore) -> None:
+    """Deleting a source keeps chunks other sources collapsed into."""
+    shared = "# 1 范围\n本标准规定了路基面宽度的设计要求，适用于客货共线铁路的新建和改建工程。\n"
+    store.add_chunks(MarkdownHierarchySplitter().parse(shared + "# 2 接触网\n接触网吊柱安装位置应校核。\n"), "a.md")
+    store.add_chunks(MarkdownHierarchySplitter().parse(shared), "b.md")
+
+    assert store.delete_source("a.md") == 2
+    docs = store.search("路基面宽度", 5, mode="flat")
+    assert [(doc.metadata["source"], doc.metadata["alternate_sources"]) for doc in docs] == [("b.md", "")]
+    assert store.delete_source("b.md") == 1
+    assert store.search("路基面宽度", 5) == []
+
+
+def test_replace_source_is_atomic_for_readers(store: VectorStore) -> None:
+    """Readers see the old revision until the switch, then only the new one."""
+    store.add_chunks(MarkdownHierarchySplitter().parse("# 1 宽度\n路基面宽度不应小于7.5m。\n"), "std.md")
+    seen_during = []
+
+    def revision():
+        yield from MarkdownHierarchySplitter().parse("# 1 宽度\n路基面宽度不应小于7.7m。\n")
+        seen_during.extend(doc.content for doc in store.search("路基面宽度", 5, mode="flat"))
+        yield from MarkdownHierarchySplitter().parse("# 2 坡度\n路肩坡度应为4%。\n")
+
+    assert store.replace_source("std.md", revision(), batch_size=1) == 2
+    assert seen_during == ["路基面宽度不应小于7.5m。"]
+    assert sorted(doc.content for doc in store.search("路基面宽度", 5, mode="flat")) == [
+        "路基面宽度不应小于7.7m。",
+        "路肩坡度应为4%。",
+    ]
+
+    def broken():
+        yield from MarkdownHierarchySplitter().parse("# 3 新条款\n新的条款内容。\n")
+        raise RuntimeError("upload cut off")
+
+    with pytest.raises(RuntimeError):
+        store.replace_source("std.md", broken(), batch_size=1)
+    assert len(store.search("路基面宽度", 5, mode="flat")) == 2
+
+
+def test_replace_visibility_is_shared_through_the_source_index(store: VectorStore) -> None:
+    """Another store on the same directory (e.g. another API worker) also sees only one revision."""
+    store.add_chunks(MarkdownHierarchySplitter().parse("# 1 宽度\n路基面宽度不应小于7.5m。\n"), "std.md")
+    reader = VectorStore(load_settings(), logger=None)
+    seen_during = []
+
+    def revision():
+        yield from MarkdownHierarchySplitter().parse("# 1 宽度\n路基面宽度不应小于7.7m。\n")
+        seen_during.extend(doc.content for doc in reader.search("路基面宽度", 5, mode="flat"))
+        seen_during.extend(doc.content for doc in reader.search("路基面宽度", 5, mode="hierarchical"))
+        yield from MarkdownHierarchySplitter().parse("# 2 坡度\n路肩坡度应为4%。\n")
+
+    store.replace_source("std.md", revision(), batch_size=1)
+    assert seen_during == ["路基面宽度不应小于7.5m。"] * 2
+
+
+def test_iter_documents_samples_large_collections(store: VectorStore) -> None:
+    """A capped scan reads evenly spaced pages instead of the whole collection."""
+    md = "".join(f"# {i} 条款\n第{i}条 规定编号{i * 7919}。\n" for i in range(40))
+    store.add_chunks(MarkdownHierarchySplitter().parse(md), source_name="std.md")
+    assert len(list(store.iter_documents(batch_size=7))) == 40
+    sample = list(store.iter_documents(batch_size=5, max_documents=10))
+    assert len(sample) == 10
+    assert len(set(sample)) == 10
+
+
+def test_opening_a_store_mid_replace_keeps_the_new_revision(store: VectorStore) -> None:
+    """A store opened while another replace runs leaves it alone; a dead owner's replace is rolled back."""
+    store.add_chunks(MarkdownHierarchySplitter().parse("# 1 宽度\n路基面宽度不应小于7.5m。\n"), "std.md")
+    md = "".join(f"# {i} 条款\n第{i}条 路基面宽度要求{i}。\n" for i in range(4))
+
+    def revision():
+        for index, chunk in enumerate(MarkdownHierarchySplitter().parse(md)):
+            if index == 2:
+                VectorStore(load_settings(), logger=None)
+            yield chunk
+
+    assert store.replace_source("std.md", revision(), batch_size=1) == 4
+    assert len(store.search("路基面宽度", 10)) == 4
+
+    _, version = store._sources.begin_replace("std.md")
+    store._sources._conn.execute(
+        "UPDATE source_versions SET owner = ?, heartbeat = 0 WHERE source = ?", ("elsewhere:1", "std.md")
+    )
+    store._sources._conn.commit()
+    assert store._sources.abandoned(lease=600) == [("std.md", version - 1)]
+    VectorStore(load_settings(), logger=None)
+    assert store._sources.pending() == []
+
+
+def test_quantized_reader_sees_chunks_written_by_another_store(tmp_path, monkeypatch) -> None:
+    """A second store picks up quantized vectors persisted by a writer, and uses Chroma while out of sync."""
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+    monkeypatch.setenv("CHROMA_PERSIST_DIR", str(tmp_path / "chroma"))
+    monkeypatch.setenv("EMBEDDING_QUANTIZATION", "int8")
+    writer = VectorStore(load_settings(), logger=None)
+    writer.add_chunks(MarkdownHierarchySplitter().parse("# 1 总则\n本标准适用于隧道设计。\n"), "seed.md")
+    reader = VectorStore(load_settings(), logger=None)
+    assert [doc.content for doc in reader.search("路基面宽度", 1)] == ["本标准适用于隧道设计。"]
+
+    writer.add_chunks(MarkdownHierarchySplitter().parse("# 1 宽度\n路基面宽度不应小于7.7m。\n"), "std.md")
+    assert reader.search("路基面宽度", 1)[0].content == "路基面宽度不应小于7.7m。"
+    assert reader._quantized.count == 2
+
+    monkeypatch.setenv("EMBEDDING_QUANTIZATION", "none")
+    VectorStore(load_settings(), logger=None).add_chunks(
+        MarkdownHierarchySplitter().parse("# 2 坡度\n路肩坡度应为4%。\n"), "slope.md"
+    )
+    assert reader.search("路肩坡度", 1)[0].content == "路肩坡度应为4%。"